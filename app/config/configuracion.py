@@ -11,14 +11,94 @@ class Configuracion:
     MODELO_TEXTO: str = os.getenv("MODELO_TEXTO", "gpt-4o-mini")
     MODELO_IMAGEN: str = os.getenv("MODELO_IMAGEN", "gpt-image-1")
     MODELO_VIDEO: str = os.getenv("MODELO_VIDEO", "sora-2")
+    MAX_HILOS_MEDIOS: int = int(os.getenv("MAX_HILOS_MEDIOS", "5"))
+    TIMEOUT_VIDEO_SEG: float = float(os.getenv("TIMEOUT_VIDEO_SEG", "900"))
+    SORA_POLL_MIN_SEG: float = float(os.getenv("SORA_POLL_MIN_SEG", "2"))
+    SORA_POLL_MAX_SEG: float = float(os.getenv("SORA_POLL_MAX_SEG", "20"))
+    OPENAI_MAX_CONEXIONES: int = int(os.getenv("OPENAI_MAX_CONEXIONES", "50"))
+    OPENAI_MAX_KEEPALIVE: int = int(os.getenv("OPENAI_MAX_KEEPALIVE", "20"))
     
-    # Base de datos
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./contenido.db")
+    # Argon2: costo del hash (cambiarlo re-hashea al usuario en su próximo login)
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", "3"))
+    ARGON2_MEMORY_KIB: int = int(os.getenv("ARGON2_MEMORY_KIB", "65536"))
+    ARGON2_PARALELISMO: int = int(os.getenv("ARGON2_PARALELISMO", "4"))
+    # Pool propio para hashear: así un pico de logins no deja sin hilos al resto
+    HASH_MAX_HILOS: int = int(os.getenv("HASH_MAX_HILOS", "2"))
+    HASH_MAX_EN_COLA: int = int(os.getenv("HASH_MAX_EN_COLA", "32"))
+
+    # Autenticación: usuarios ya resueltos en memoria (por worker)
+    AUTH_CACHE_TTL_SEG: int = int(os.getenv("AUTH_CACHE_TTL_SEG", "60"))
+    AUTH_CACHE_MAX_ENTRADAS: int = int(os.getenv("AUTH_CACHE_MAX_ENTRADAS", "10000"))
+    # Emails (separados por coma) que pueden ver /metricas. Vacío = nadie.
+    METRICAS_ADMINS: list = [e.strip().lower() for e in os.getenv("METRICAS_ADMINS", "").split(",") if e.strip()]
+
+    # Pool HTTP compartido por los adaptadores de plataformas
+    HTTP_MAX_CONEXIONES: int = int(os.getenv("HTTP_MAX_CONEXIONES", "100"))
+    HTTP_MAX_KEEPALIVE: int = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+    HTTP_MAX_POR_HOST: int = int(os.getenv("HTTP_MAX_POR_HOST", "10"))
+    HTTP_TIMEOUT_SEG: float = float(os.getenv("HTTP_TIMEOUT_SEG", "60"))
+    
+    # Publicación (/publicar)
+    PUBLICAR_MAX_HILOS: int = int(os.getenv("PUBLICAR_MAX_HILOS", "20"))
+    PUBLICAR_TIMEOUT_RED_SEG: float = float(os.getenv("PUBLICAR_TIMEOUT_RED_SEG", "60"))
+    PUBLICAR_TIMEOUT_TIKTOK_SEG: float = float(os.getenv("PUBLICAR_TIMEOUT_TIKTOK_SEG", "180"))
+    PUBLICAR_TIMEOUT_TOTAL_SEG: float = float(os.getenv("PUBLICAR_TIMEOUT_TOTAL_SEG", "200"))
+    # Desde este tamaño el archivo a publicar se mapea (mmap) en vez de cargarse en memoria
+    MEDIOS_UMBRAL_MMAP_MB: int = int(os.getenv("MEDIOS_UMBRAL_MMAP_MB", "8"))
+    
+    # Cachés locales
+    CACHE_DIR: str = os.getenv("CACHE_DIR", "cache")
+    CACHE_TEXTO_TTL_SEG: float = float(os.getenv("CACHE_TEXTO_TTL_SEG", "86400"))
+    CACHE_TEXTO_MAX_ENTRADAS: int = int(os.getenv("CACHE_TEXTO_MAX_ENTRADAS", "1000"))
+    # 'memoria' (solo este proceso) o 'sqlite' (archivo compartido entre workers)
+    CACHE_RESULTADOS_BACKEND: str = os.getenv("CACHE_RESULTADOS_BACKEND", "sqlite")
+    CACHE_RESULTADOS_TTL_SEG: float = float(os.getenv("CACHE_RESULTADOS_TTL_SEG", "21600"))
+    CACHE_RESULTADOS_MAX_ENTRADAS: int = int(os.getenv("CACHE_RESULTADOS_MAX_ENTRADAS", "500"))
+    CACHE_RESULTADOS_MAX_MB: int = int(os.getenv("CACHE_RESULTADOS_MAX_MB", "50"))
+    # Redes conectadas por usuario (/tokens/estado); guardar_token la invalida.
+    # 'sqlite' para que la invalidación llegue a todos los workers de la máquina.
+    CACHE_TOKENS_BACKEND: str = os.getenv("CACHE_TOKENS_BACKEND", "sqlite")
+    CACHE_TOKENS_TTL_SEG: float = float(os.getenv("CACHE_TOKENS_TTL_SEG", "600"))
+    CACHE_TOKENS_MAX_ENTRADAS: int = int(os.getenv("CACHE_TOKENS_MAX_ENTRADAS", "10000"))
+    # Verifiers PKCE entre /tiktok/conectar y el callback (cualquier worker puede recibirlo)
+    VERIFIERS_BACKEND: str = os.getenv("VERIFIERS_BACKEND", "sqlite")
+    VERIFIERS_TTL_SEG: float = float(os.getenv("VERIFIERS_TTL_SEG", "600"))
+    VERIFIERS_MAX_ENTRADAS: int = int(os.getenv("VERIFIERS_MAX_ENTRADAS", "10000"))
+    # Dentro de outputs/ para que el frontend las siga viendo por /outputs
+    CACHE_IMAGENES_DIR: str = os.getenv("CACHE_IMAGENES_DIR", "outputs/cache_imagenes")
+    CACHE_IMAGENES_MAX_MB: int = int(os.getenv("CACHE_IMAGENES_MAX_MB", "500"))
+    
+    # 'desarrollo' | 'produccion'. Sin definir cuenta como producción:
+    # DATABASE_URL es obligatoria salvo ENTORNO=desarrollo explícito.
+    ENTORNO: str = os.getenv("ENTORNO", "").lower()
+
+    # Base de datos (sin DATABASE_URL, solo con ENTORNO=desarrollo se usa SQLite local)
+    DATABASE_URL: str = os.getenv("DATABASE_URL")
+    BD_POOL_TAMANO: int = int(os.getenv("BD_POOL_TAMANO", "10"))
+    BD_POOL_MAX_OVERFLOW: int = int(os.getenv("BD_POOL_MAX_OVERFLOW", "20"))
+    BD_POOL_TIMEOUT_SEG: float = float(os.getenv("BD_POOL_TIMEOUT_SEG", "10"))
+    BD_POOL_RECICLAR_SEG: int = int(os.getenv("BD_POOL_RECICLAR_SEG", "1800"))
+    BD_POOL_PRE_PING: bool = os.getenv("BD_POOL_PRE_PING", "true").lower() == "true"
+    BD_STATEMENT_TIMEOUT_MS: int = int(os.getenv("BD_STATEMENT_TIMEOUT_MS", "30000"))
+    # Driver de las sesiones async sobre Postgres: asyncpg o psycopg (v3)
+    BD_DRIVER_ASYNC_PG: str = os.getenv("BD_DRIVER_ASYNC_PG", "asyncpg")
+
+    # Respuestas de la IA más grandes que esto se guardan comprimidas (0 = nunca)
+    MENSAJES_COMPRIMIR_DESDE_KB: int = int(os.getenv("MENSAJES_COMPRIMIR_DESDE_KB", "32"))
+
+    # Monitor del event loop: lag medido cada INTERVALO, pila capturada si se bloquea más de UMBRAL
+    MONITOR_BUCLE_ACTIVO: bool = os.getenv("MONITOR_BUCLE_ACTIVO", "true").lower() == "true"
+    MONITOR_BUCLE_INTERVALO_MS: float = float(os.getenv("MONITOR_BUCLE_INTERVALO_MS", "100"))
+    MONITOR_BUCLE_UMBRAL_MS: float = float(os.getenv("MONITOR_BUCLE_UMBRAL_MS", "250"))
+    # Las pilas muestran rutas y código interno: por defecto solo van al log, no a /metricas/bucle
+    MONITOR_BUCLE_EXPONER_PILAS: bool = os.getenv("MONITOR_BUCLE_EXPONER_PILAS", "false").lower() == "true"
     
     # TikTok
     TIKTOK_CLIENT_KEY: str = os.getenv("TIKTOK_CLIENT_KEY")
     TIKTOK_CLIENT_SECRET: str = os.getenv("TIKTOK_CLIENT_SECRET")
     TIKTOK_REDIRECT_URI: str = os.getenv("TIKTOK_REDIRECT_URI")
+    TIKTOK_CHUNK_MB: int = int(os.getenv("TIKTOK_CHUNK_MB", "10"))
+    TIKTOK_REINTENTOS_CHUNK: int = int(os.getenv("TIKTOK_REINTENTOS_CHUNK", "3"))
     
     # Facebook
     FACEBOOK_PAGE_ID: str = os.getenv("FACEBOOK_PAGE_ID")
@@ -27,6 +107,10 @@ class Configuracion:
     # Instagram (usa mismas credenciales de Facebook)
     INSTAGRAM_APP_ID: str = os.getenv("INSTAGRAM_APP_ID")
     INSTAGRAM_PAGE_ACCESS_TOKEN: str = os.getenv("INSTAGRAM_PAGE_ACCESS_TOKEN")
+    # Espera del contenedor: backoff exponencial entre POLL_MIN y POLL_MAX, con techo total
+    INSTAGRAM_POLL_MIN_SEG: float = float(os.getenv("INSTAGRAM_POLL_MIN_SEG", "0.5"))
+    INSTAGRAM_POLL_MAX_SEG: float = float(os.getenv("INSTAGRAM_POLL_MAX_SEG", "5"))
+    INSTAGRAM_ESPERA_MAX_SEG: float = float(os.getenv("INSTAGRAM_ESPERA_MAX_SEG", "60"))
 
     # LinkedIn
     ZAPIER_LINKEDIN_WEBHOOK: str = os.getenv("ZAPIER_LINKEDIN_WEBHOOK")
@@ -35,11 +119,29 @@ class Configuracion:
     # WhatsApp
     WHAPI_TOKEN: str = os.getenv("WHAPI_TOKEN")
 
+    # Hosting de medios (URL pública para Instagram / LinkedIn): "imgbb" | "s3" | "local"
+    HOSTING_BACKEND: str = os.getenv("HOSTING_BACKEND", "imgbb")
+    HOSTING_EXPIRACION_SEG: int = int(os.getenv("HOSTING_EXPIRACION_SEG", "600"))
+    HOSTING_MARGEN_SEG: int = int(os.getenv("HOSTING_MARGEN_SEG", "120"))
+    HOSTING_TTL_SEG: int = int(os.getenv("HOSTING_TTL_SEG", "86400"))
+    # Caché huella -> URL pública: 'memoria' o 'sqlite' (compartida entre workers)
+    HOSTING_CACHE_BACKEND: str = os.getenv("HOSTING_CACHE_BACKEND", "sqlite")
+    HOSTING_CACHE_MAX: int = int(os.getenv("HOSTING_CACHE_MAX", "1000"))
+    HOSTING_LOCAL_DIR: str = os.getenv("HOSTING_LOCAL_DIR", "outputs/hosting")
+    URL_PUBLICA_BASE: str = os.getenv("URL_PUBLICA_BASE", "http://localhost:8000")
+
     #AWS S3
     AWS_REGION: str = os.getenv("AWS_REGION")
     AWS_ACCESS_KEY_ID: str = os.getenv("AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY: str = os.getenv("AWS_SECRET_ACCESS_KEY")
     AWS_S3_BUCKET_NAME: str = os.getenv("AWS_S3_BUCKET_NAME")
+    # Vacío = AWS real; p. ej. http://localhost:9000 para MinIO / moto server
+    AWS_S3_ENDPOINT_URL: str = os.getenv("AWS_S3_ENDPOINT_URL", "")
+    AWS_S3_MAX_CONEXIONES: int = int(os.getenv("AWS_S3_MAX_CONEXIONES", "20"))
+    AWS_S3_MULTIPART_UMBRAL_MB: int = int(os.getenv("AWS_S3_MULTIPART_UMBRAL_MB", "8"))
+    AWS_S3_PARTE_MB: int = int(os.getenv("AWS_S3_PARTE_MB", "8"))
+    AWS_S3_HILOS_POR_ARCHIVO: int = int(os.getenv("AWS_S3_HILOS_POR_ARCHIVO", "4"))
+    AWS_S3_HILOS_LOTE: int = int(os.getenv("AWS_S3_HILOS_LOTE", "8"))
     
     def validar(self):
         if not self.OPENAI_API_KEY:
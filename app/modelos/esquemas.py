@@ -21,6 +21,8 @@ class SolicitudGenerarContenido(BaseModel):
     contenido: str = Field(..., min_length=10, description="Contenido base")
     target_networks: List[str] = Field(..., description="Redes sociales objetivo")
     user_id: str = Field(default="api-user", description="ID del usuario")
+    asincrono: bool = Field(default=False, description="Si es True, responde un job_id y genera en segundo plano")
+    no_cache: bool = Field(default=False, description="Si es True, ignora la caché de texto y vuelve a llamar al modelo")
     
     class Config:
         json_schema_extra = {
@@ -1,5 +1,6 @@
 # app/modelos/tablas.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, JSON, LargeBinary, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.config.bd import Base
@@ -56,6 +57,9 @@ class Chat(Base):
     usuario = relationship("Usuario", back_populates="chats")
     mensajes = relationship("Mensaje", back_populates="chat", cascade="all, delete-orphan")
 
+    # Barra lateral paginada: chats de un usuario del más nuevo al más viejo
+    __table_args__ = (Index("ix_chats_usuario_fecha", "usuario_id", "fecha_creacion"),)
+
 
 # ==========================================
 # 4. MENSAJES (El historial real tipo ChatGPT)
@@ -70,6 +74,11 @@ class Mensaje(Base):
     rol = Column(String(20), nullable=False) 
     
     contenido = Column(Text, nullable=False) # El texto largo
+
+    # Respuesta de la IA como JSON nativo (JSONB en Postgres, JSON en SQLite).
+    # Si es grande se guarda comprimida con zlib en 'datos_zlib' y 'datos' queda vacío.
+    datos = Column(JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql"), nullable=True)
+    datos_zlib = Column(LargeBinary, nullable=True)
     
     # Metadatos opcionales
     redes_objetivo = Column(String(200), nullable=True) # "tiktok, facebook"
@@ -77,4 +86,45 @@ class Mensaje(Base):
     
     fecha = Column(DateTime, default=datetime.now)
 
-    chat = relationship("Chat", back_populates="mensajes")
\ No newline at end of file
+    chat = relationship("Chat", back_populates="mensajes")
+
+    # Mensajes de un chat en orden, paginados por id
+    __table_args__ = (Index("ix_mensajes_chat_id_id", "chat_id", "id"),)
+
+# ==========================================
+# 5. TRABAJOS DE GENERACIÓN (Modo asíncrono de /generar)
+# ==========================================
+# En SQLite la crea crear_tablas_locales(); en Postgres hay que crearla a mano:
+#   CREATE TABLE trabajos_generacion (
+#       id VARCHAR(36) PRIMARY KEY,
+#       usuario_id INTEGER REFERENCES usuarios (id),
+#       chat_id INTEGER REFERENCES chats (id),
+#       estado VARCHAR(20) NOT NULL,
+#       redes_objetivo VARCHAR(200),
+#       estado_redes TEXT,
+#       resultado TEXT,
+#       error TEXT,
+#       fecha_creacion TIMESTAMP WITHOUT TIME ZONE,
+#       fecha_actualizacion TIMESTAMP WITHOUT TIME ZONE
+#   );
+#   CREATE INDEX ix_trabajos_generacion_usuario_id ON trabajos_generacion (usuario_id);
+class TrabajoGeneracion(Base):
+    __tablename__ = "trabajos_generacion"
+
+    # UUID en texto: es lo que el cliente usa para consultar el estado
+    id = Column(String(36), primary_key=True)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), index=True)
+    chat_id = Column(Integer, ForeignKey("chats.id"), nullable=True)
+
+    # 'pendiente', 'procesando', 'completado' o 'error'
+    estado = Column(String(20), nullable=False, default="pendiente")
+    redes_objetivo = Column(String(200), nullable=True) # "tiktok, facebook"
+
+    # JSON por red: {"tiktok": {"estado": "texto_listo", "detalle": null}, ...}
+    estado_redes = Column(Text, nullable=True)
+    # JSON con los resultados parciales por red (mismo formato que /generar)
+    resultado = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+    fecha_creacion = Column(DateTime, default=datetime.now)
+    fecha_actualizacion = Column(DateTime, default=datetime.now, onupdate=datetime.now)
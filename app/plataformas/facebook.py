@@ -1,17 +1,20 @@
-import requests
+import httpx
 import logging
 import base64
 from typing import List, Dict, Any
 
 from app.config.configuracion import obtener_configuracion
 from app.servicios.ia import obtener_servicio_ia # Importamos tu servicio de IA
+from app.servicios.http import ClienteHTTP, obtener_cliente_http
+from app.utilidades.medios import DatosMedio, lector_de
 
 logger = logging.getLogger(__name__)
 
 class Facebook:
     
-    def __init__(self):
+    def __init__(self, http: ClienteHTTP = None):
         config = obtener_configuracion()
+        self.http = http or obtener_cliente_http()
         self.page_id = config.FACEBOOK_PAGE_ID
         self.access_token = config.FACEBOOK_PAGE_ACCESS_TOKEN
         self.base_url = "https://graph.facebook.com/v18.0"
@@ -20,7 +23,7 @@ class Facebook:
         self.ia_service = obtener_servicio_ia()
 
     # ==================== PUBLICACIÓN DIRECTA (Lo que te faltaba) ====================
-    def publicar_foto(self, archivo_binario, mensaje: str) -> str:
+    def publicar_foto(self, archivo_binario: DatosMedio, mensaje: str) -> str:
         print(f"DEBUG TOKEN: {self.access_token}")
         url = f"{self.base_url}/{self.page_id}/photos"
         
@@ -30,12 +33,12 @@ class Facebook:
         }
         
         files = {
-            'source': archivo_binario
+            'source': lector_de(archivo_binario)
         }
 
         try:
             logger.info("📤 Enviando petición a API Graph Facebook...")
-            response = requests.post(url, data=payload, files=files, timeout=30)
+            response = self.http.post(url, data=payload, files=files, timeout=30)
             response.raise_for_status()
             
             data = response.json()
@@ -47,9 +50,9 @@ class Facebook:
             logger.info(f"✅ Publicado en FB con ID: {post_id}")
             return post_id
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Error de conexión con Facebook: {e}")
-            if e.response is not None:
+            if getattr(e, "response", None) is not None:
                 logger.error(f"Detalle Meta: {e.response.text}")
             raise Exception(f"Fallo en API Facebook: {str(e)}")
 
@@ -148,7 +151,7 @@ class Facebook:
 
         try:
             logger.info("📤 Enviando petición a API Graph Facebook...")
-            response = requests.post(url, data=payload, files=files, timeout=30)
+            response = self.http.post(url, data=payload, files=files, timeout=30)
             response.raise_for_status()
             
             data = response.json()
@@ -160,8 +163,8 @@ class Facebook:
             logger.info(f"✅ Publicado en FB con ID: {post_id}")
             return post_id
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Error de conexión con Facebook: {e}")
-            if e.response is not None:
+            if getattr(e, "response", None) is not None:
                 logger.error(f"Detalle Meta: {e.response.text}")
             raise Exception(f"Fallo en API Facebook: {str(e)}")
\ No newline at end of file
@@ -1,43 +1,90 @@
-import requests
+import asyncio
 import logging
 import time
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any
+
+import httpx
 
 # Ajusta estos imports según tu estructura de carpetas
 from app.config.configuracion import obtener_configuracion
+from app.servicios.http import ClienteHTTP, obtener_cliente_http
+from app.servicios.hosting import ServicioHosting, obtener_servicio_hosting
+from app.utilidades.medios import DatosMedio
 
 logger = logging.getLogger(__name__)
 
+# status_code del contenedor: FINISHED se puede publicar, estos ya no van a terminar
+ESTADOS_CONTENEDOR_FALLIDOS = ["ERROR", "EXPIRED"]
+
 class Instagram:
-    
-    def __init__(self):
+
+    def __init__(self, http: ClienteHTTP = None, hosting: ServicioHosting = None):
         config = obtener_configuracion()
+        self.http = http or obtener_cliente_http()
+        self.hosting = hosting or obtener_servicio_hosting()
         self.ig_user_id = config.INSTAGRAM_APP_ID
         self.access_token = config.INSTAGRAM_PAGE_ACCESS_TOKEN
-        self.imgbb_key = config.IMGBB_API_KEY             
-        
+        self.poll_min = config.INSTAGRAM_POLL_MIN_SEG
+        self.poll_max = config.INSTAGRAM_POLL_MAX_SEG
+        self.espera_max = config.INSTAGRAM_ESPERA_MAX_SEG
+
         self.base_url = "https://graph.facebook.com/v18.0"
 
         if not self.ig_user_id:
             logger.warning("⚠️ Falta INSTAGRAM_BUSINESS_ACCOUNT_ID en la configuración")
 
-    # ==================== PUBLICACIÓN CON IMGBB ====================
-    def publicar_foto(self, archivo_binario, mensaje: str) -> str:
+    # ==================== PUBLICACIÓN CON HOSTING ====================
+    def publicar_foto(self, archivo_binario: DatosMedio, mensaje: str) -> str:
         """
-        Recibe bytes de imagen, los sube a ImgBB para obtener URL y publica en IG.
+        Recibe la imagen, obtiene su URL pública (servicio de hosting compartido) y publica en IG.
         """
         logger.info("🚀 Iniciando publicación en Instagram...")
 
         try:
-            # PASO 0: Convertir bytes a URL pública usando ImgBB
+            # PASO 0: URL pública (se reutiliza si otra red ya subió la misma imagen)
             image_url = self._subir_a_hosting_temporal(archivo_binario)
-            
+
             # PASO 1: Crear contenedor de medios en Instagram
             creation_id = self._crear_contenedor(image_url, mensaje)
-            
-            # PASO 2: Publicar el contenedor
+
+            # PASO 2: Esperar a que Meta termine de procesarlo y publicarlo
+            self._esperar_contenedor(creation_id)
             post_id = self._publicar_contenedor(creation_id)
-            
+
+            return post_id
+
+        except Exception as e:
+            logger.error(f"❌ Error en publicación Instagram: {e}")
+            raise e
+
+    async def publicar_foto_async(self, archivo_binario: DatosMedio, mensaje: str) -> str:
+        """
+        Igual que publicar_foto, pero las llamadas a Meta y la espera del
+        contenedor corren en el event loop: ningún hilo queda dormido esperando.
+        """
+        logger.info("🚀 Iniciando publicación en Instagram (async)...")
+
+        try:
+            # El hosting comparte locks con las demás redes: va en un hilo
+            image_url = await asyncio.to_thread(self._subir_a_hosting_temporal, archivo_binario)
+
+            resp = await self.http.post_async(**self._peticion_crear_contenedor(image_url, mensaje))
+            creation_id = self._leer_id(resp, "Error IG Step 1")
+
+            for intervalo in self._intervalos_espera():
+                resp = await self.http.get_async(**self._peticion_estado(creation_id))
+                if self._contenedor_listo(resp, creation_id):
+                    break
+                await asyncio.sleep(intervalo)
+            else:
+                # Última consulta al agotar el techo: pudo terminar durante la última espera
+                resp = await self.http.get_async(**self._peticion_estado(creation_id))
+                if not self._contenedor_listo(resp, creation_id):
+                    raise Exception(f"Instagram no terminó de procesar el contenedor en {self.espera_max:g}s")
+
+            resp = await self.http.post_async(**self._peticion_publicar(creation_id))
+            post_id = self._leer_id(resp, "Error IG Step 2")
+            logger.info(f"🎉 ¡Publicado en Instagram! ID: {post_id}")
             return post_id
 
         except Exception as e:
@@ -46,65 +93,102 @@ class Instagram:
 
     # ==================== MÉTODOS PRIVADOS ====================
 
-    def _subir_a_hosting_temporal(self, image_bytes) -> str:
-        """Sube la imagen a ImgBB para obtener una URL pública temporal"""
-        logger.info("🌐 Subiendo imagen a servidor temporal (ImgBB)...")
-        url_imgbb = "https://api.imgbb.com/1/upload"
-        
-        payload = {
-            "key": self.imgbb_key,
-            "expiration": 600  # La imagen se borra sola en 10 minutos (seguridad)
-        }
-        files = {
-            "image": image_bytes
-        }
-        
+    def _subir_a_hosting_temporal(self, image_bytes: DatosMedio) -> str:
+        """URL pública de la imagen (ImgBB, S3 o local según HOSTING_BACKEND)"""
         try:
-            resp = requests.post(url_imgbb, data=payload, files=files, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()
-            public_url = data["data"]["url"]
-            logger.info(f"✅ URL temporal generada: {public_url}")
-            return public_url
+            return self.hosting.obtener_url(image_bytes)
         except Exception as e:
             raise Exception(f"Fallo al alojar imagen temporalmente: {str(e)}")
 
     def _crear_contenedor(self, image_url: str, caption: str) -> str:
         """Paso 1 de IG: Decirle que prepare la foto desde la URL"""
-        url = f"{self.base_url}/{self.ig_user_id}/media"
-        
-        payload = {
-            'image_url': image_url,
-            'caption': caption,
-            'access_token': self.access_token
-        }
-        
-        resp = requests.post(url, data=payload, timeout=30)
-        try:
-            resp.raise_for_status()
-            return resp.json()['id']
-        except Exception as e:
-            logger.error(f"Error creando contenedor IG: {resp.text}")
-            raise Exception(f"Error IG Step 1: {resp.text}")
+        resp = self.http.post(**self._peticion_crear_contenedor(image_url, caption))
+        return self._leer_id(resp, "Error IG Step 1")
+
+    def _esperar_contenedor(self, creation_id: str) -> None:
+        """Consulta status_code del contenedor con backoff hasta que esté FINISHED"""
+        for intervalo in self._intervalos_espera():
+            resp = self.http.get(**self._peticion_estado(creation_id))
+            if self._contenedor_listo(resp, creation_id):
+                return
+            time.sleep(intervalo)
+        # Última consulta al agotar el techo: pudo terminar durante la última espera
+        resp = self.http.get(**self._peticion_estado(creation_id))
+        if self._contenedor_listo(resp, creation_id):
+            return
+        raise Exception(f"Instagram no terminó de procesar el contenedor en {self.espera_max:g}s")
 
     def _publicar_contenedor(self, creation_id: str) -> str:
         """Paso 2 de IG: Publicar lo que preparamos"""
-        url = f"{self.base_url}/{self.ig_user_id}/media_publish"
-        
-        payload = {
-            'creation_id': creation_id,
-            'access_token': self.access_token
+        resp = self.http.post(**self._peticion_publicar(creation_id))
+        post_id = self._leer_id(resp, "Error IG Step 2")
+        logger.info(f"🎉 ¡Publicado en Instagram! ID: {post_id}")
+        return post_id
+
+    # ==================== PETICIONES (compartidas sync / async) ====================
+
+    def _peticion_crear_contenedor(self, image_url: str, caption: str) -> Dict[str, Any]:
+        return {
+            "url": f"{self.base_url}/{self.ig_user_id}/media",
+            "data": {
+                'image_url': image_url,
+                'caption': caption,
+                'access_token': self.access_token
+            },
+            "timeout": 30
+        }
+
+    def _peticion_estado(self, creation_id: str) -> Dict[str, Any]:
+        return {
+            "url": f"{self.base_url}/{creation_id}",
+            "params": {
+                'fields': 'status_code',
+                'access_token': self.access_token
+            },
+            "timeout": 15
+        }
+
+    def _peticion_publicar(self, creation_id: str) -> Dict[str, Any]:
+        return {
+            "url": f"{self.base_url}/{self.ig_user_id}/media_publish",
+            "data": {
+                'creation_id': creation_id,
+                'access_token': self.access_token
+            },
+            "timeout": 30
         }
-        
-        # Esperamos 3 segundos para asegurar que IG procesó la imagen del paso 1
-        time.sleep(3)
-        
-        resp = requests.post(url, data=payload, timeout=30)
+
+    def _intervalos_espera(self) -> Iterator[float]:
+        """poll_min, x2, x2... hasta poll_max; el último se recorta para sumar justo espera_max"""
+        intervalo, restante = self.poll_min, self.espera_max
+        while restante > 0:
+            paso = min(intervalo, restante)
+            yield paso
+            restante -= paso
+            intervalo = min(intervalo * 2, self.poll_max)
+
+    @staticmethod
+    def _contenedor_listo(resp: httpx.Response, creation_id: str) -> bool:
         try:
             resp.raise_for_status()
-            post_id = resp.json()['id']
-            logger.info(f"🎉 ¡Publicado en Instagram! ID: {post_id}")
-            return post_id
-        except Exception as e:
-             logger.error(f"Error publicando contenedor IG: {resp.text}")
-             raise Exception(f"Error IG Step 2: {resp.text}")
\ No newline at end of file
+        except Exception:
+            logger.error(f"Error consultando contenedor IG: {resp.text}")
+            raise Exception(f"Error IG estado contenedor: {resp.text}")
+
+        estado = resp.json().get("status_code")
+        if estado in ESTADOS_CONTENEDOR_FALLIDOS:
+            raise Exception(f"Instagram rechazó el contenedor {creation_id}: {estado}")
+        if estado == "FINISHED":
+            return True
+
+        logger.info(f"⏳ Contenedor IG {creation_id}: {estado}")
+        return False
+
+    @staticmethod
+    def _leer_id(resp: httpx.Response, contexto: str) -> str:
+        try:
+            resp.raise_for_status()
+            return resp.json()['id']
+        except Exception:
+            logger.error(f"{contexto}: {resp.text}")
+            raise Exception(f"{contexto}: {resp.text}")
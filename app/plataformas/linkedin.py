@@ -1,12 +1,18 @@
-import requests
+import httpx
 import os
 import logging
-import base64
+from typing import Union
+
+from app.servicios.http import ClienteHTTP, obtener_cliente_http
+from app.servicios.hosting import ServicioHosting, obtener_servicio_hosting
+from app.utilidades.medios import BufferMedio
 
 logger = logging.getLogger(__name__)
 
 class LinkedinService:
-    def __init__(self):
+    def __init__(self, http: ClienteHTTP = None, hosting: ServicioHosting = None):
+        self.http = http or obtener_cliente_http()
+        self.hosting = hosting or obtener_servicio_hosting()
         # URL del webhook de Make.com
         self.webhook_url = os.getenv("ZAPIER_LINKEDIN_WEBHOOK")
         
@@ -15,13 +21,13 @@ class LinkedinService:
         
         logger.info("✅ LinkedIn Service inicializado con Make.com")
 
-    def publicar_post_con_imagen(self, texto: str, ruta_imagen: str):
+    def publicar_post_con_imagen(self, texto: str, imagen: Union[str, BufferMedio]):
         """
         Publica en LinkedIn mediante Make.com webhook
         
         Args:
             texto: Contenido del post (incluye hashtags)
-            ruta_imagen: Ruta del archivo de imagen en disco
+            imagen: Ruta del archivo en disco o el BufferMedio ya cargado
             
         Returns:
             Dict con el resultado de la publicación
@@ -30,11 +36,11 @@ class LinkedinService:
             logger.info("📤 Preparando publicación para LinkedIn via Make.com...")
 
             # 1. Verificar que la imagen existe
-            if not os.path.exists(ruta_imagen):
-                raise Exception(f"❌ Imagen no encontrada: {ruta_imagen}")
+            if isinstance(imagen, str) and not os.path.exists(imagen):
+                raise Exception(f"❌ Imagen no encontrada: {imagen}")
 
-            # 2. Subir imagen a servicio temporal (imgbb.com - gratis)
-            imagen_url = self._subir_imagen_temporal(ruta_imagen)
+            # 2. URL pública (servicio de hosting compartido con Instagram)
+            imagen_url = self._subir_imagen_temporal(imagen)
             
             # 3. Preparar payload para Make.com
             payload = {
@@ -45,7 +51,7 @@ class LinkedinService:
 
             # 4. Enviar a Make.com webhook
             logger.info("🚀 Enviando a Make.com webhook...")
-            response = requests.post(
+            response = self.http.post(
                 self.webhook_url,
                 json=payload,
                 timeout=30
@@ -63,11 +69,11 @@ class LinkedinService:
                 logger.error(f"❌ Error de Make.com: {response.status_code} - {response.text}")
                 raise Exception(f"Error en Make.com: {response.status_code}")
 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error("❌ Timeout al conectar con Make.com")
             raise Exception("Timeout al publicar en LinkedIn. Intenta de nuevo.")
         
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"❌ Error de conexión con Make.com: {e}")
             raise Exception(f"Error de conexión: {str(e)}")
         
@@ -75,43 +81,28 @@ class LinkedinService:
             logger.error(f"❌ Error general en publicación LinkedIn: {e}")
             raise Exception(f"Error publicando en LinkedIn: {str(e)}")
     
-    def _subir_imagen_temporal(self, ruta_imagen: str) -> str:
+    def _subir_imagen_temporal(self, imagen: Union[str, BufferMedio]) -> str:
         """
-        Sube imagen a ImgBB (servicio gratuito) y retorna URL pública
+        Obtiene la URL pública de la imagen desde el servicio de hosting
+        (ImgBB, S3 o local según HOSTING_BACKEND). Si Instagram ya subió la
+        misma imagen, se reutiliza su URL.
         
         Args:
-            ruta_imagen: Ruta local de la imagen
+            imagen: Ruta local de la imagen o el BufferMedio ya cargado
             
         Returns:
             URL pública de la imagen
         """
         try:
-            # API Key gratuita de ImgBB (puedes crear tu propia en imgbb.com/api)
-            # Esta es una key pública de ejemplo, crea la tuya
-            api_key = os.getenv("IMGBB_API_KEY", "tu_api_key_aqui")
-            
-            # Leer imagen y convertir a base64
-            with open(ruta_imagen, 'rb') as img_file:
-                imagen_base64 = base64.b64encode(img_file.read()).decode('utf-8')
-            
-            # Subir a ImgBB
-            response = requests.post(
-                "https://api.imgbb.com/1/upload",
-                data={
-                    "key": api_key,
-                    "image": imagen_base64
-                },
-                timeout=30
-            )
+            # El buffer ya cargado o, si vino una ruta, el archivo mapeado una vez
+            medio = imagen if isinstance(imagen, BufferMedio) else BufferMedio.desde_archivo(imagen, umbral_mmap=0)
             
-            if response.status_code == 200:
-                data = response.json()
-                url = data['data']['url']
-                logger.info(f"✅ Imagen subida: {url}")
-                return url
-            else:
-                raise Exception(f"Error subiendo imagen: {response.text}")
+            try:
+                return self.hosting.obtener_url(medio)
+            finally:
+                if medio is not imagen:
+                    medio.soltar()
                 
         except Exception as e:
             logger.error(f"❌ Error subiendo imagen temporal: {e}")
-            raise Exception(f"No se pudo subir la imagen: {str(e)}")
\ No newline at end of file
+            raise Exception(f"No se pudo subir la imagen: {str(e)}")
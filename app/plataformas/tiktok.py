@@ -1,12 +1,16 @@
-import requests
 import os
+import time
 import base64
 import hashlib
 import logging
-from typing import Dict, Any, Tuple, List
+from typing import BinaryIO, Dict, Any, Tuple, List
+
+import httpx
 from fastapi import UploadFile
 
 from app.config.configuracion import obtener_configuracion
+from app.servicios.http import ClienteHTTP, obtener_cliente_http
+from app.utilidades.medios import BufferMedio
 
 logger = logging.getLogger(__name__)
 config = obtener_configuracion()
@@ -21,15 +25,36 @@ def generar_code_challenge(verifier: str) -> str:
     return base64.urlsafe_b64encode(digest).decode('utf-8').rstrip('=')
 
 
+# Límites de la Content Posting API para FILE_UPLOAD
+CHUNK_MIN_BYTES = 5 * 1024 * 1024
+CHUNK_MAX_BYTES = 64 * 1024 * 1024
+
+
+def planificar_chunks(video_size: int, chunk_size: int) -> Tuple[int, int]:
+    """
+    Retorna (chunk_size, total_chunk_count) según las reglas de TikTok:
+    - Videos menores a 5MB van en un solo chunk del tamaño del video.
+    - El resto usa chunks de 5-64MB; el último chunk absorbe el sobrante.
+    """
+    if video_size <= CHUNK_MIN_BYTES:
+        return video_size, 1
+
+    chunk_size = max(CHUNK_MIN_BYTES, min(chunk_size, CHUNK_MAX_BYTES, video_size))
+    return chunk_size, max(1, video_size // chunk_size)
+
+
 class TikTok:
     
-    def __init__(self):
+    def __init__(self, http: ClienteHTTP = None):
+        self.http = http or obtener_cliente_http()
         self.client_key = config.TIKTOK_CLIENT_KEY
         self.client_secret = config.TIKTOK_CLIENT_SECRET
         self.redirect_uri = config.TIKTOK_REDIRECT_URI
         self.auth_url = "https://www.tiktok.com/v2/auth/authorize"
         self.token_url = "https://open.tiktokapis.com/v2/oauth/token/"
         self.api_base = "https://open.tiktokapis.com/v2"
+        self.chunk_size = config.TIKTOK_CHUNK_MB * 1024 * 1024
+        self.reintentos_chunk = config.TIKTOK_REINTENTOS_CHUNK
     
     # ==================== OAUTH ====================
     
@@ -70,7 +95,7 @@ class TikTok:
         
         logger.info("Intercambiando código por token con TikTok")
         
-        response = requests.post(self.token_url, data=payload)
+        response = self.http.post(self.token_url, data=payload)
         
         # Debug por si falla el token
         if response.status_code != 200:
@@ -112,29 +137,36 @@ class TikTok:
             # Los pegamos al final del texto
             texto_completo = f"{texto}\n\n{hashtags_str}"
         
-        # 3. Obtener tamaño del video
-        if hasattr(video, 'size'): 
+        # 3. Obtener tamaño del video (acepta BufferMedio, UploadFile o un archivo abierto)
+        archivo = _archivo_de(video)
+        if isinstance(video, BufferMedio):
+            video_size = video.tamano
+        elif getattr(video, 'size', None):
             video_size = video.size
         else:
-            video.file.seek(0, 2)
-            video_size = video.file.tell()
-            video.file.seek(0)
+            archivo.seek(0, 2)
+            video_size = archivo.tell()
+            archivo.seek(0)
+        
+        chunk_size, total_chunks = planificar_chunks(video_size, self.chunk_size)
         
-        logger.info(f"Publicando en TikTok. Longitud texto: {len(texto_completo)}")
+        logger.info(f"Publicando en TikTok. Longitud texto: {len(texto_completo)} | {total_chunks} chunk(s)")
         
         # PASO 1: Inicializar carga
         init_data = self._inicializar_carga(
             description=texto_completo, # Pasamos el texto YA CONCATENADO
             privacy_level=privacy_level,
             video_size=video_size,
-            access_token=access_token
+            access_token=access_token,
+            chunk_size=chunk_size,
+            total_chunks=total_chunks
         )
         
         upload_url = init_data["upload_url"]
         publish_id = init_data["publish_id"]
         
-        # PASO 2: Subir video
-        exito = self._subir_video(upload_url, video, video_size)
+        # PASO 2: Subir video por chunks
+        exito = self._subir_video(upload_url, archivo, video_size, chunk_size, total_chunks)
         
         if not exito:
             raise Exception("Error al subir video a TikTok")
@@ -153,7 +185,9 @@ class TikTok:
         description: str, 
         privacy_level: str,
         video_size: int,
-        access_token: str
+        access_token: str,
+        chunk_size: int,
+        total_chunks: int
     ) -> Dict[str, Any]:
         """Paso 1: Inicializa carga de video"""
         url = f"{self.api_base}/post/publish/video/init/"
@@ -171,8 +205,8 @@ class TikTok:
             "source_info": {
                 "source": "FILE_UPLOAD",
                 "video_size": video_size,
-                "chunk_size": video_size,
-                "total_chunk_count": 1
+                "chunk_size": chunk_size,
+                "total_chunk_count": total_chunks
             }
         }
         
@@ -181,7 +215,7 @@ class TikTok:
             "Content-Type": "application/json"
         }
         
-        response = requests.post(url, json=payload, headers=headers)
+        response = self.http.post(url, json=payload, headers=headers)
         
         if response.status_code != 200:
             error_detail = response.text
@@ -201,31 +235,71 @@ class TikTok:
     def _subir_video(
         self,
         upload_url: str,
-        video: Any,
-        video_size: int
+        archivo: BinaryIO,
+        video_size: int,
+        chunk_size: int,
+        total_chunks: int
     ) -> bool:
-        """Paso 2: Sube archivo de video"""
+        """
+        Paso 2: Sube el video chunk por chunk.
+        Solo un chunk vive en memoria a la vez; si uno falla se reintenta
+        ese chunk, no el video completo.
+        """
         try:
-            video.file.seek(0)
-            video_content = video.file.read()
-            
-            headers = {
-                "Content-Type": "video/mp4",
-                "Content-Length": str(video_size),
-                "Content-Range": f"bytes 0-{video_size - 1}/{video_size}"
-            }
-            
-            response = requests.put(upload_url, headers=headers, data=video_content)
-            
-            if response.status_code not in [200, 201]:
-                logger.error(f"Error subiendo video: {response.text}")
-                return False
+            for indice in range(total_chunks):
+                inicio = indice * chunk_size
+                # El último chunk se lleva el sobrante
+                fin = video_size - 1 if indice == total_chunks - 1 else inicio + chunk_size - 1
+                
+                archivo.seek(inicio)
+                chunk = archivo.read(fin - inicio + 1)
+                
+                if not self._subir_chunk(upload_url, chunk, inicio, fin, video_size):
+                    logger.error(f"Chunk {indice + 1}/{total_chunks} falló tras {self.reintentos_chunk} intentos")
+                    return False
+                
+                logger.info(f"⬆️ TikTok chunk {indice + 1}/{total_chunks} subido")
             
             return True
             
         except Exception as e:
             logger.error(f"Excepción al subir video: {str(e)}")
             return False
+    
+    def _subir_chunk(
+        self,
+        upload_url: str,
+        chunk: bytes,
+        inicio: int,
+        fin: int,
+        video_size: int
+    ) -> bool:
+        headers = {
+            "Content-Type": "video/mp4",
+            "Content-Length": str(len(chunk)),
+            "Content-Range": f"bytes {inicio}-{fin}/{video_size}"
+        }
+        
+        for intento in range(1, self.reintentos_chunk + 1):
+            try:
+                response = self.http.put(upload_url, headers=headers, content=chunk)
+                
+                # 206: chunk intermedio aceptado, 201: último chunk
+                if response.status_code in [200, 201, 206]:
+                    return True
+                
+                logger.warning(f"⚠️ Chunk {inicio}-{fin} rechazado ({response.status_code}): {response.text}")
+                # Errores 4xx (salvo 429) no se arreglan reintentando
+                if response.status_code < 500 and response.status_code != 429:
+                    return False
+                
+            except httpx.HTTPError as e:
+                logger.warning(f"⚠️ Error de red en chunk {inicio}-{fin} (intento {intento}): {e}")
+            
+            if intento < self.reintentos_chunk:
+                time.sleep(2 ** (intento - 1))
+        
+        return False
         
 # AGREGAR DESPUÉS DE intercambiar_codigo_por_token() en tiktok.py
 
@@ -238,7 +312,7 @@ class TikTok:
             "refresh_token": refresh_token
         }
         
-        response = requests.post(self.token_url, data=payload)
+        response = self.http.post(self.token_url, data=payload)
         
         if response.status_code != 200:
             raise Exception(f"Error refrescando token: {response.text}")
@@ -248,4 +322,11 @@ class TikTok:
             "access_token": data.get("access_token"),
             "refresh_token": data.get("refresh_token"),
             "expires_in": data.get("expires_in")
-        }
\ No newline at end of file
+        }
+
+
+def _archivo_de(video: Any) -> BinaryIO:
+    """BufferMedio se lee sin copiarlo; UploadFile expone .file; un archivo abierto se usa tal cual"""
+    if isinstance(video, BufferMedio):
+        return video.lector()
+    return getattr(video, 'file', video)
@@ -1,14 +1,18 @@
-import requests
+import httpx
 import os
-import base64
 import logging
 import mimetypes
 
+from app.servicios.http import ClienteHTTP, obtener_cliente_http
+from app.utilidades.medios import DatosMedio, vista_de
+from app.utilidades.codificacion import cuerpo_json_data_uri
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class WhatsApp:
-    def __init__(self):
+    def __init__(self, http: ClienteHTTP = None):
+        self.http = http or obtener_cliente_http()
         self.token = os.getenv("WHAPI_TOKEN")
         self.base_url = os.getenv("WHAPI_URL", "https://gate.whapi.cloud/")
         # Si tienes un número de prueba o tu propio número, ponlo aquí o en el .env
@@ -17,7 +21,7 @@ class WhatsApp:
         if not self.token:
             logger.error("❌ No se encontró WHAPI_TOKEN")
 
-    def publicar_foto(self, archivo_binario: bytes, mensaje: str, nombre_archivo: str):
+    def publicar_foto(self, archivo_binario: DatosMedio, mensaje: str, nombre_archivo: str):
         """
         Publica historia replicando EXACTAMENTE el script funcional.
         """
@@ -32,35 +36,29 @@ class WhatsApp:
         if not mime_type:
             mime_type = "image/jpeg"
 
-        try:
-            # 2. Codificar Base64
-            b64_string = base64.b64encode(archivo_binario).decode("utf-8")
-            
-            # 3. Construir cadena Data URI con 'name=' (Vital para Whapi)
-            media_data = f"data:{mime_type};name={nombre_archivo};base64,{b64_string}"
-            
-        except Exception as e:
-            raise Exception(f"Error codificando Base64: {e}")
-
-        # 4. Payload IDÉNTICO a tu script funcional
+        # 2-4. Payload IDÉNTICO a tu script funcional, con el Data URI ('name=' es vital para Whapi)
         # La clave aquí es el campo 'contacts'. Sin él, da error 400.
-        payload = {
-            "media": media_data,
-            "caption": mensaje,
-            "contacts": [self.contact_id] if self.contact_id else [] 
-        }
+        # El base64 se genera por tramos mientras se envía: nunca existe el string completo
+        contactos = [self.contact_id] if self.contact_id else []
+        cuerpo = cuerpo_json_data_uri(
+            "media",
+            vista_de(archivo_binario),
+            mime_type,
+            nombre_archivo,
+            extras={"caption": mensaje, "contacts": contactos}
+        )
         
         headers = {
             "accept": "application/json",
             "authorization": f"Bearer {self.token}",
-            "content-type": "application/json"
+            **cuerpo.headers()
         }
 
         logger.info(f"🚀 Enviando a: {url_endpoint}")
-        logger.info(f"📋 Params: {mime_type} | Contactos: {payload['contacts']}")
+        logger.info(f"📋 Params: {mime_type} | Contactos: {contactos} | {cuerpo.longitud} bytes")
         
         try:
-            response = requests.post(url_endpoint, headers=headers, json=payload, timeout=45)
+            response = self.http.post(url_endpoint, headers=headers, content=cuerpo, timeout=45)
             
             if response.status_code >= 400:
                 logger.error(f"❌ Error Whapi ({response.status_code}): {response.text}")
@@ -74,5 +72,5 @@ class WhatsApp:
             logger.info(f"✅ Historia publicada: {msg_id}")
             return str(msg_id)
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise Exception(f"Error Whapi: {e}")
\ No newline at end of file
@@ -0,0 +1,102 @@
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import zlib
+from sqlalchemy import JSON, literal_column, type_coerce
+from app.config.configuracion import obtener_configuracion
+from app.modelos.tablas import Mensaje
+
+logger = logging.getLogger(__name__)
+
+config = obtener_configuracion()
+
+# Claves de cada red en la respuesta de /generar (ver _armar_nodo_red)
+CAMPOS_PROYECTABLES = ["text", "hashtags", "media_info"]
+
+
+class GestorMensajes:
+    """
+    Mensajes del historial. Las respuestas de la IA se guardan como JSON nativo
+    (o comprimidas si son grandes) y se pueden leer proyectadas por campo.
+    """
+
+    # ==========================================
+    # 1. ESCRITURA
+    # ==========================================
+    @classmethod
+    def nuevo_mensaje_assistant(cls, chat_id: Optional[int], respuesta: Dict[str, Any], redes: List[str]) -> Mensaje:
+        """Arma (sin guardar) el mensaje con la respuesta de la IA"""
+        mensaje = Mensaje(chat_id=chat_id, rol="assistant", contenido="", redes_objetivo=",".join(redes))
+
+        limite = config.MENSAJES_COMPRIMIR_DESDE_KB * 1024
+        if limite:
+            cuerpo = json.dumps(respuesta).encode()
+            if len(cuerpo) >= limite:
+                mensaje.datos_zlib = zlib.compress(cuerpo)
+                logger.info(f"🗜️ Respuesta de {len(cuerpo)} bytes comprimida a {len(mensaje.datos_zlib)}")
+                return mensaje
+
+        mensaje.datos = respuesta
+        return mensaje
+
+    # ==========================================
+    # 2. LECTURA
+    # ==========================================
+    @classmethod
+    def columna_datos(cls, campos: Optional[List[str]], dialecto: str):
+        """
+        Columna a seleccionar en lugar de Mensaje.datos.
+        Con 'campos' la proyección la hace la BD (json_each / jsonb_each): solo
+        viajan esos campos de cada red, sin leer ni re-serializar el JSON entero.
+        Los nombres van dentro del SQL: solo se aceptan los de CAMPOS_PROYECTABLES.
+        """
+        invalidos = [c for c in campos or [] if c not in CAMPOS_PROYECTABLES]
+        if invalidos:
+            raise ValueError(f"Campos no proyectables: {', '.join(invalidos)}")
+        if not campos or dialecto not in ("sqlite", "postgresql"):
+            return Mensaje.datos
+
+        tabla = Mensaje.__tablename__
+        if dialecto == "postgresql":
+            pares = ", ".join(f"'{c}', j.value -> '{c}'" for c in campos)
+            subconsulta = f"SELECT jsonb_object_agg(j.key, jsonb_build_object({pares})) FROM jsonb_each({tabla}.datos) AS j"
+        else:
+            pares = ", ".join(f"'{c}', json_extract(j.value, '$.{c}')" for c in campos)
+            subconsulta = f"SELECT json_group_object(j.key, json_object({pares})) FROM json_each({tabla}.datos) AS j"
+        # Sin datos (comprimidos o filas antiguas) queda NULL y se resuelve en Python
+        sql = f"CASE WHEN {tabla}.datos IS NULL THEN NULL ELSE ({subconsulta}) END"
+        return type_coerce(literal_column(sql), JSON).label("datos")
+
+    @classmethod
+    def contenido_de(
+        cls,
+        rol: str,
+        contenido: str,
+        datos: Optional[Dict[str, Any]],
+        datos_zlib: Optional[bytes],
+        campos: Optional[List[str]] = None
+    ) -> Any:
+        """Contenido para el cliente: texto si es del usuario, objeto si es de la IA"""
+        if rol != "assistant":
+            return contenido
+
+        if datos is None:
+            if datos_zlib is not None:
+                datos = json.loads(zlib.decompress(datos_zlib))
+            else:
+                # Filas anteriores a la columna JSON: el json.dumps quedó en 'contenido'
+                try:
+                    datos = json.loads(contenido)
+                except (TypeError, ValueError):
+                    return contenido
+            if campos:
+                datos = cls.proyectar(datos, campos)
+        return datos
+
+    @staticmethod
+    def proyectar(datos: Dict[str, Any], campos: List[str]) -> Dict[str, Any]:
+        """Misma proyección que columna_datos, en Python (comprimidos y filas antiguas)"""
+        return {
+            red: {campo: (nodo or {}).get(campo) for campo in campos}
+            for red, nodo in datos.items()
+        }
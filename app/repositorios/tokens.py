@@ -1,41 +1,41 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
+import asyncio
 import logging
+import uuid
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.modelos.tablas import TokenRedSocial
+from app.config.configuracion import obtener_configuracion
+from app.servicios.cache import obtener_almacen_verifiers, obtener_cache_estado_tokens
 
 logger = logging.getLogger(__name__)
 
+config = obtener_configuracion()
+
 class GestorTokens:
     
-    # Los verifiers son temporales (duran segundos), los dejamos en memoria RAM
-    verifiers_temporales: Dict[str, Dict[str, Any]] = {}
-
     # ==========================================
-    # 1. MÉTODOS PARA VERIFIERS (Memoria)
+    # 1. MÉTODOS PARA VERIFIERS (Almacén compartido con TTL)
     # ==========================================
+    # Los verifiers son temporales: el callback puede caer en otro worker, por eso
+    # van a un almacén compartido (archivo SQLite) que los vence solo a los VERIFIERS_TTL_SEG.
     @classmethod
     def guardar_verifier(cls, user_id: int, red_social: str, verifier: str) -> None:
         clave = f"{user_id}:{red_social}"
-        cls.verifiers_temporales[clave] = {
-            "verifier": verifier,
-            "created_at": datetime.now()
-        }
+        obtener_almacen_verifiers().guardar(clave, verifier, config.VERIFIERS_TTL_SEG)
         logger.info(f"🔐 Verifier temporal guardado para: {user_id} - {red_social}")
 
     @classmethod
     def obtener_verifier(cls, user_id: int, red_social: str) -> Optional[str]:
         clave = f"{user_id}:{red_social}"
-        data = cls.verifiers_temporales.get(clave)
-        if data:
-            return data.get("verifier")
-        return None
+        return obtener_almacen_verifiers().obtener(clave)
 
     @classmethod
     def eliminar_verifier(cls, user_id: int, red_social: str):
         clave = f"{user_id}:{red_social}"
-        if clave in cls.verifiers_temporales:
-            del cls.verifiers_temporales[clave]
+        obtener_almacen_verifiers().eliminar(clave)
 
     # ==========================================
     # 2. MÉTODOS PARA TOKENS (Base de Datos)
@@ -62,37 +62,15 @@ class GestorTokens:
             usuario_id=user_id, 
             red_social=red_social
         ).first()
-
-        if token_db:
-            # --- ACTUALIZAR EXISTENTE ---
-            logger.info(f"🔄 Actualizando token existente para {red_social}...")
-            token_db.token_acceso = access_token
-            # Solo actualizamos refresh_token si viene uno nuevo (a veces las APIs no lo devuelven siempre)
-            if refresh_token:
-                token_db.token_refresh = refresh_token
-            token_db.fecha_expiracion = fecha_exp
-        else:
-            # --- CREAR NUEVO ---
-            logger.info(f"✨ Creando nuevo token para {red_social}...")
-            token_db = TokenRedSocial(
-                usuario_id=user_id,
-                red_social=red_social,
-                token_acceso=access_token,
-                token_refresh=refresh_token,
-                fecha_expiracion=fecha_exp
-            )
-            db.add(token_db)
+        token_db = cls._aplicar_token(db, token_db, user_id, red_social, access_token, refresh_token, fecha_exp)
 
         # 3. Guardar cambios en Postgres
         db.commit()
         db.refresh(token_db)
+        cls.invalidar_estado(user_id)
 
         # Devolvemos formato diccionario para compatibilidad
-        return {
-            "access_token": token_db.token_acceso,
-            "refresh_token": token_db.token_refresh,
-            "expires_at": token_db.fecha_expiracion
-        }
+        return cls._a_diccionario(token_db)
 
     @classmethod
     def obtener_token(cls, db: Session, user_id: int, red_social: str) -> Optional[Dict[str, Any]]:
@@ -105,11 +83,7 @@ class GestorTokens:
         if not token_db:
             return None
             
-        return {
-            "access_token": token_db.token_acceso,
-            "refresh_token": token_db.token_refresh,
-            "expires_at": token_db.fecha_expiracion
-        }
+        return cls._a_diccionario(token_db)
 
     @classmethod
     def usuario_tiene_token(cls, db: Session, user_id: int, red_social: str) -> bool:
@@ -118,4 +92,160 @@ class GestorTokens:
             usuario_id=user_id, 
             red_social=red_social
         ).count()
-        return count > 0
\ No newline at end of file
+        return count > 0
+
+    # ==========================================
+    # 3. VERSIONES ASYNC (rutas 'async def')
+    # ==========================================
+    # Mismo comportamiento que las de arriba, pero con AsyncSession:
+    # la espera a la BD no bloquea el event loop.
+
+    @classmethod
+    async def guardar_token_async(
+        cls,
+        db: AsyncSession,
+        user_id: int,
+        red_social: str,
+        access_token: str,
+        refresh_token: Optional[str] = None,
+        expires_in: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        fecha_exp = None
+        if expires_in:
+            fecha_exp = datetime.now() + timedelta(seconds=expires_in)
+
+        token_db = await db.scalar(cls._consulta_token(user_id, red_social))
+        token_db = cls._aplicar_token(db, token_db, user_id, red_social, access_token, refresh_token, fecha_exp)
+
+        await db.commit()
+        await db.refresh(token_db)
+        await asyncio.to_thread(cls.invalidar_estado, user_id)
+        return cls._a_diccionario(token_db)
+
+    @classmethod
+    async def obtener_token_async(cls, db: AsyncSession, user_id: int, red_social: str) -> Optional[Dict[str, Any]]:
+        token_db = await db.scalar(cls._consulta_token(user_id, red_social))
+        if not token_db:
+            return None
+        return cls._a_diccionario(token_db)
+
+    @classmethod
+    async def usuario_tiene_token_async(cls, db: AsyncSession, user_id: int, red_social: str) -> bool:
+        existe = await db.scalar(
+            select(TokenRedSocial.id).filter_by(usuario_id=user_id, red_social=red_social).limit(1)
+        )
+        return existe is not None
+
+    @classmethod
+    async def estado_redes_async(cls, db: AsyncSession, user_id: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Redes conectadas del usuario con el estado de su token, en UNA consulta
+        agrupada. Se guarda en caché hasta que guardar_token la invalide; el
+        estado (vigente/vencido) se recalcula en cada lectura con la hora actual.
+        La caché es un archivo SQLite: se consulta fuera del event loop.
+        """
+        generacion, redes = await asyncio.to_thread(cls._leer_estado, user_id)
+        if redes is None:
+            filas = (await db.execute(
+                select(
+                    TokenRedSocial.red_social,
+                    func.max(TokenRedSocial.fecha_expiracion),
+                    func.count(TokenRedSocial.token_refresh)
+                )
+                .filter(TokenRedSocial.usuario_id == user_id)
+                .group_by(TokenRedSocial.red_social)
+            )).all()
+            redes = {
+                red: {"expira": fecha.isoformat() if fecha else None, "renovable": refresh > 0}
+                for red, fecha, refresh in filas
+            }
+            # Queda marcado con la generación leída ANTES de la consulta: si un
+            # guardar_token la invalidó mientras tanto, esta copia ya no se acepta
+            await asyncio.to_thread(
+                obtener_cache_estado_tokens().guardar, str(user_id), {"generacion": generacion, "redes": redes}
+            )
+
+        ahora = datetime.now()
+        for datos in redes.values():
+            if datos["expira"] is None:
+                datos["estado"] = "sin_vencimiento"
+            else:
+                datos["estado"] = "vigente" if datetime.fromisoformat(datos["expira"]) > ahora else "vencido"
+        return redes
+
+    @classmethod
+    def invalidar_estado(cls, user_id: int) -> None:
+        """Descarta el estado de redes en caché del usuario (tras guardar un token)"""
+        cache = obtener_cache_estado_tokens()
+        try:
+            # Nueva generación primero: una lectura en curso no puede dejar su copia vieja
+            cache.almacen.guardar(cls._clave_generacion(user_id), uuid.uuid4().hex, cache.ttl)
+            cache.eliminar(str(user_id))
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo invalidar el estado de tokens de {user_id}: {e}")
+
+    @classmethod
+    def _leer_estado(cls, user_id: int) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """(generación actual, redes en caché si se guardaron en esa misma generación)"""
+        cache = obtener_cache_estado_tokens()
+        try:
+            generacion = cache.almacen.obtener(cls._clave_generacion(user_id))
+        except Exception as e:
+            logger.warning(f"⚠️ Caché estado_tokens no disponible: {e}")
+            return None, None
+
+        guardado = cache.obtener(str(user_id))
+        if guardado is None or guardado.get("generacion") != generacion:
+            return generacion, None
+        return generacion, guardado["redes"]
+
+    @staticmethod
+    def _clave_generacion(user_id: int) -> str:
+        return f"{user_id}:generacion"
+
+    # ==========================================
+    # 4. HELPERS (compartidos sync / async)
+    # ==========================================
+    @staticmethod
+    def _consulta_token(user_id: int, red_social: str):
+        return select(TokenRedSocial).filter_by(usuario_id=user_id, red_social=red_social).limit(1)
+
+    @staticmethod
+    def _aplicar_token(
+        db,
+        token_db: Optional[TokenRedSocial],
+        user_id: int,
+        red_social: str,
+        access_token: str,
+        refresh_token: Optional[str],
+        fecha_exp: Optional[datetime]
+    ) -> TokenRedSocial:
+        if token_db:
+            # --- ACTUALIZAR EXISTENTE ---
+            logger.info(f"🔄 Actualizando token existente para {red_social}...")
+            token_db.token_acceso = access_token
+            # Solo actualizamos refresh_token si viene uno nuevo (a veces las APIs no lo devuelven siempre)
+            if refresh_token:
+                token_db.token_refresh = refresh_token
+            token_db.fecha_expiracion = fecha_exp
+            return token_db
+
+        # --- CREAR NUEVO ---
+        logger.info(f"✨ Creando nuevo token para {red_social}...")
+        token_db = TokenRedSocial(
+            usuario_id=user_id,
+            red_social=red_social,
+            token_acceso=access_token,
+            token_refresh=refresh_token,
+            fecha_expiracion=fecha_exp
+        )
+        db.add(token_db)
+        return token_db
+
+    @staticmethod
+    def _a_diccionario(token_db: TokenRedSocial) -> Dict[str, Any]:
+        return {
+            "access_token": token_db.token_acceso,
+            "refresh_token": token_db.token_refresh,
+            "expires_at": token_db.fecha_expiracion
+        }
@@ -0,0 +1,173 @@
+from typing import Dict, Any, List, Optional
+from datetime import datetime
+import json
+import logging
+import uuid
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.modelos.tablas import TrabajoGeneracion
+
+logger = logging.getLogger(__name__)
+
+class GestorTrabajos:
+    """
+    Estado de los trabajos asíncronos de /generar.
+    Todo vive en la BD para que cualquier worker pueda responder el polling.
+    """
+
+    @classmethod
+    def crear_trabajo(
+        cls,
+        db: Session,
+        user_id: int,
+        chat_id: Optional[int],
+        redes: List[str]
+    ) -> str:
+        trabajo = cls._nuevo_trabajo(user_id, chat_id, redes)
+        db.add(trabajo)
+        db.commit()
+        logger.info(f"🧾 Trabajo de generación creado: {trabajo.id}")
+        return trabajo.id
+
+    @classmethod
+    async def crear_trabajo_async(
+        cls,
+        db: AsyncSession,
+        user_id: int,
+        chat_id: Optional[int],
+        redes: List[str]
+    ) -> str:
+        trabajo = cls._nuevo_trabajo(user_id, chat_id, redes)
+        db.add(trabajo)
+        await db.commit()
+        logger.info(f"🧾 Trabajo de generación creado: {trabajo.id}")
+        return trabajo.id
+
+    @staticmethod
+    def _nuevo_trabajo(user_id: int, chat_id: Optional[int], redes: List[str]) -> TrabajoGeneracion:
+        return TrabajoGeneracion(
+            id=str(uuid.uuid4()),
+            usuario_id=user_id,
+            chat_id=chat_id,
+            estado="pendiente",
+            redes_objetivo=",".join(redes),
+            estado_redes=json.dumps({red: {"estado": "pendiente", "detalle": None} for red in redes}),
+            resultado=json.dumps({})
+        )
+
+    @classmethod
+    def marcar_estado(
+        cls,
+        db: Session,
+        trabajo_id: str,
+        estado: str,
+        error: Optional[str] = None,
+        chat_id: Optional[int] = None
+    ) -> None:
+        """Cambia el estado y confirma la transacción (junto con lo pendiente en 'db')"""
+        trabajo = db.get(TrabajoGeneracion, trabajo_id)
+        if not trabajo:
+            return
+        cls._aplicar_estado(trabajo, estado, error, chat_id)
+        db.commit()
+
+    @classmethod
+    async def marcar_estado_async(
+        cls,
+        db: AsyncSession,
+        trabajo_id: str,
+        estado: str,
+        error: Optional[str] = None,
+        chat_id: Optional[int] = None
+    ) -> None:
+        trabajo = await db.get(TrabajoGeneracion, trabajo_id)
+        if not trabajo:
+            return
+        cls._aplicar_estado(trabajo, estado, error, chat_id)
+        await db.commit()
+
+    @classmethod
+    def actualizar_red(
+        cls,
+        db: Session,
+        trabajo_id: str,
+        red: str,
+        estado: str,
+        nodo: Optional[Dict[str, Any]] = None,
+        detalle: Optional[str] = None
+    ) -> None:
+        """Guarda el avance de una red y, si llega, su resultado parcial"""
+        trabajo = db.get(TrabajoGeneracion, trabajo_id)
+        if not trabajo:
+            return
+        cls._aplicar_red(trabajo, red, estado, nodo, detalle)
+        db.commit()
+
+    @classmethod
+    async def actualizar_red_async(
+        cls,
+        db: AsyncSession,
+        trabajo_id: str,
+        red: str,
+        estado: str,
+        nodo: Optional[Dict[str, Any]] = None,
+        detalle: Optional[str] = None
+    ) -> None:
+        trabajo = await db.get(TrabajoGeneracion, trabajo_id)
+        if not trabajo:
+            return
+        cls._aplicar_red(trabajo, red, estado, nodo, detalle)
+        await db.commit()
+
+    @staticmethod
+    def _aplicar_estado(
+        trabajo: TrabajoGeneracion,
+        estado: str,
+        error: Optional[str],
+        chat_id: Optional[int]
+    ) -> None:
+        trabajo.estado = estado
+        trabajo.error = error
+        if chat_id is not None:
+            trabajo.chat_id = chat_id
+        trabajo.fecha_actualizacion = datetime.now()
+
+    @staticmethod
+    def _aplicar_red(
+        trabajo: TrabajoGeneracion,
+        red: str,
+        estado: str,
+        nodo: Optional[Dict[str, Any]],
+        detalle: Optional[str]
+    ) -> None:
+        estado_redes = json.loads(trabajo.estado_redes or "{}")
+        estado_redes[red] = {"estado": estado, "detalle": detalle}
+        trabajo.estado_redes = json.dumps(estado_redes)
+
+        if nodo is not None:
+            resultado = json.loads(trabajo.resultado or "{}")
+            resultado[red] = nodo
+            trabajo.resultado = json.dumps(resultado)
+
+        trabajo.fecha_actualizacion = datetime.now()
+
+    @classmethod
+    def obtener_trabajo(cls, db: Session, trabajo_id: str, user_id: int) -> Optional[Dict[str, Any]]:
+        """Retorna el trabajo en formato diccionario o None si no existe o no es del usuario"""
+        trabajo = db.query(TrabajoGeneracion).filter_by(
+            id=trabajo_id,
+            usuario_id=user_id
+        ).first()
+
+        if not trabajo:
+            return None
+
+        return {
+            "job_id": trabajo.id,
+            "estado": trabajo.estado,
+            "chat_id": trabajo.chat_id,
+            "redes": json.loads(trabajo.estado_redes or "{}"),
+            "resultado": json.loads(trabajo.resultado or "{}"),
+            "error": trabajo.error,
+            "fecha_actualizacion": str(trabajo.fecha_actualizacion)
+        }
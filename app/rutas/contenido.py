@@ -1,19 +1,25 @@
-from fastapi import APIRouter, HTTPException, Form, File, UploadFile, Depends
+from fastapi import APIRouter, HTTPException, Form, File, UploadFile, Depends, BackgroundTasks, Response
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+import asyncio
 import logging
 import os
 import shutil
+import time
 import uuid
-import json
+from concurrent.futures import ThreadPoolExecutor
 
 # --- IMPORTACIONES DE TUS MÓDULOS ---
-from app.config.bd import obtener_bd
+from app.config.bd import obtener_bd, obtener_bd_async, SessionLocal, SessionLocalAsync
+from app.config.configuracion import obtener_configuracion
 from app.modelos.esquemas import SolicitudGenerarContenido
-from app.modelos.tablas import Usuario, Chat, Mensaje
-from app.utilidades.dependencia import obtener_usuario_actual
+from app.modelos.tablas import Chat, Mensaje
+from app.utilidades.dependencia import UsuarioActual, obtener_usuario_actual
+from app.utilidades.medios import BufferMedio
 from app.servicios.ia import ServicioIA
+from app.servicios.ia_async import ServicioIAAsync
 
 # --- SERVICIOS ---
 from app.servicios.aws_s3 import GestorS3  # <--- NUEVO: Para subir a la nube
@@ -22,12 +28,19 @@ from app.plataformas.whatsapp import WhatsApp
 from app.plataformas.tiktok import TikTok
 from app.plataformas.facebook import Facebook
 from app.plataformas.linkedin import LinkedinService
+from app.repositorios.mensajes import GestorMensajes
 from app.repositorios.tokens import GestorTokens
+from app.repositorios.trabajos import GestorTrabajos
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="")
+config = obtener_configuracion()
 servicio_ia = ServicioIA()
+servicio_ia_async = ServicioIAAsync()
+
+# Hilos dedicados a publicar: una red lenta no frena a las demás ni al event loop
+_pool_publicacion = ThreadPoolExecutor(max_workers=config.PUBLICAR_MAX_HILOS, thread_name_prefix="publicar")
 
 # ==========================================
 # 1. ENDPOINT: GENERAR CONTENIDO
@@ -35,74 +48,45 @@ servicio_ia = ServicioIA()
 @router.post("/generar", response_model=Dict[str, Any])
 async def generar_contenido(
     request: SolicitudGenerarContenido,
-    usuario_actual: Usuario = Depends(obtener_usuario_actual),
-    db: Session = Depends(obtener_bd)
+    background_tasks: BackgroundTasks,
+    response: Response,
+    usuario_actual: UsuarioActual = Depends(obtener_usuario_actual),
+    db: AsyncSession = Depends(obtener_bd_async)
 ):
     try:
         logger.info(f"🧠 Usuario {usuario_actual.id} generando contenido...")
 
-        # 1. Crear Chat en BD
-        nuevo_chat = Chat(
-            usuario_id=usuario_actual.id,
-            titulo=f"{request.contenido[:20]}..."
-        )
-        db.add(nuevo_chat)
-        db.commit()
-        db.refresh(nuevo_chat)
-        
-        # 2. Guardar Prompt
-        mensaje_user = Mensaje(
-            chat_id=nuevo_chat.id,
-            rol="user",
-            contenido=request.contenido,
-            redes_objetivo=",".join(request.target_networks)
-        )
-        db.add(mensaje_user)
-        db.commit()
+        # MODO ASÍNCRONO: respondemos el job_id ya y generamos en segundo plano.
+        # El chat se escribe recién al terminar: si la generación falla no queda a medias.
+        if request.asincrono:
+            trabajo_id = await GestorTrabajos.crear_trabajo_async(
+                db, usuario_actual.id, None, request.target_networks
+            )
+            background_tasks.add_task(
+                _procesar_trabajo_generacion,
+                trabajo_id,
+                usuario_actual.id,
+                request.contenido,
+                request.target_networks,
+                request.no_cache
+            )
+            response.status_code = 202
+            return {"job_id": trabajo_id, "estado": "pendiente", "chat_id": None}
 
-        # 3. Llamar a la IA
-        resultado_ia = servicio_ia.generar_contenido_completo(
+        # 1. Llamar a la IA (cliente async: no bloquea el event loop)
+        resultado_ia = await servicio_ia_async.generar_contenido_completo(
             user_id=str(usuario_actual.id),
             contenido=request.contenido,
-            target_networks=request.target_networks
+            target_networks=request.target_networks,
+            no_cache=request.no_cache
         )
 
-        # 4. Procesar respuesta
-        respuesta_final = {}
-        for red in request.target_networks:
-            if red not in resultado_ia: continue
+        # 2. Procesar respuesta
+        respuesta_final = _armar_respuesta(resultado_ia, request.target_networks)
 
-            datos_raw = resultado_ia[red]
-            nodo_red = {
-                "text": datos_raw.get("text", ""),
-                "hashtags": datos_raw.get("hashtags", [])
-            }
-            
-            media_info = {}
-            if red == "tiktok":
-                video_path = datos_raw.get("video_path")
-                if video_path:
-                    media_info = {"tipo": "video", "archivo_path": video_path, "video_hook": datos_raw.get("video_hook")}
-            elif red in ["facebook", "instagram", "linkedin", "whatsapp"]:
-                image_path = datos_raw.get("image_path")
-                if image_path:
-                    media_info = {"tipo": "imagen", "archivo_path": image_path}
-
-            if media_info:
-                nodo_red["media_info"] = media_info
-            
-            respuesta_final[red] = nodo_red
-
-        # 5. Guardar respuesta en BD
-        mensaje_assistant = Mensaje(
-            chat_id=nuevo_chat.id,
-            rol="assistant",
-            # CAMBIO AQUÍ: Usar json.dumps para que se guarde con comillas dobles ""
-            contenido=json.dumps(respuesta_final), 
-            redes_objetivo=",".join(request.target_networks)
-        )
-        db.add(mensaje_assistant)
-        db.commit()
+        # 3. Guardar chat, prompt y respuesta en UNA transacción (un solo commit)
+        db.add(_nuevo_chat(usuario_actual.id, request.contenido, request.target_networks, respuesta_final))
+        await db.commit()
 
         return respuesta_final
 
@@ -111,43 +95,64 @@ async def generar_contenido(
         raise HTTPException(status_code=500, detail=f"Error interno IA: {str(e)}")
 
 
+@router.get("/generar/{job_id}", response_model=Dict[str, Any])
+def obtener_trabajo_generacion(
+    job_id: str,
+    usuario_actual: UsuarioActual = Depends(obtener_usuario_actual),
+    db: Session = Depends(obtener_bd)
+):
+    """
+    Polling del modo asíncrono: estado general, estado por red y resultados parciales.
+    """
+    trabajo = GestorTrabajos.obtener_trabajo(db, job_id, usuario_actual.id)
+    if not trabajo:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return trabajo
+
+
 # ==========================================
 # 2. ENDPOINT: PUBLICAR (CON AWS S3)
 # ==========================================
 @router.post("/publicar")
 async def publicar_contenido(
     red_social: str = Form(...),
-    text: str = Form(...),
+    text: str = Form(None),
     hashtags: str = Form(None),
-    archivo: UploadFile = File(...),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual),
-    db: Session = Depends(obtener_bd)
+    archivo: UploadFile = File(None),
+    usar_cache: bool = Form(True),
+    usuario_actual: UsuarioActual = Depends(obtener_usuario_actual)
 ):
     current_user_id = str(usuario_actual.id)
     lista_redes = [r.strip().lower() for r in red_social.split(",") if r.strip()]
     logger.info(f"🚀 Usuario {usuario_actual.email} publicando en: {lista_redes}")
 
+    # 0. Reutilizar la última generación (usar_cache, igual que SolicitudPublicar):
+    #    si falta el texto o el archivo, se toman de lo que /generar dejó en caché
+    generacion = None
+    if usar_cache and (not text or archivo is None):
+        # La caché de resultados puede ser un archivo SQLite: se lee fuera del event loop
+        generacion = await asyncio.to_thread(servicio_ia.cache_contenido.obtener_usuario, current_user_id)
+    if not text and not generacion:
+        raise HTTPException(status_code=400, detail="Falta 'text' y no hay una generación reciente en caché")
+    if archivo is None and not generacion:
+        raise HTTPException(status_code=400, detail="Falta 'archivo' y no hay una generación reciente en caché")
+
     # 1. Guardar archivo temporalmente en disco
-    os.makedirs("temp", exist_ok=True)
-    ext = archivo.filename.split(".")[-1]
-    nombre_temp = f"temp_{uuid.uuid4()}.{ext}"
-    ruta_temp = os.path.join("temp", nombre_temp)
-    
-    try:
-        with open(ruta_temp, "wb") as buffer:
-            shutil.copyfileobj(archivo.file, buffer)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error guardando archivo temporal: {e}")
+    ruta_temp = None
+    if archivo is not None:
+        os.makedirs("temp", exist_ok=True)
+        ext = archivo.filename.split(".")[-1]
+        nombre_temp = f"temp_{uuid.uuid4()}.{ext}"
+        ruta_temp = os.path.join("temp", nombre_temp)
+        
+        try:
+            with open(ruta_temp, "wb") as buffer:
+                shutil.copyfileobj(archivo.file, buffer)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error guardando archivo temporal: {e}")
 
     # 2. Preparar Texto
-    texto_final = text
-    if hashtags:
-        limpio = hashtags.replace("[", "").replace("]", "").replace('"', "").replace("'", "")
-        lista_hashtags = [h.strip() for h in limpio.split(",") if h.strip()]
-        tags_str = " ".join(f"#{t}" if not t.startswith("#") else t for t in lista_hashtags)
-        texto_final = f"{text}\n\n{tags_str}"
-    else:
-        lista_hashtags = []
+    hashtags_form = _parsear_hashtags(hashtags)
 
     # 3. SUBIR A AWS S3 (Si es necesario)
     """url_publica_s3 = ""
@@ -165,86 +170,289 @@ async def publicar_contenido(
             # No detenemos el proceso, quizás otras redes (TikTok) funcionen localmente
             url_publica_s3 = None """
 
-    resultados = {}
+    # 4. Cargar cada archivo UNA sola vez; todas las redes leen el mismo buffer.
+    #    El temporal se borra cuando lo suelta el último hilo que lo usa
+    medios: Dict[str, BufferMedio] = {}
+
+    def _medio_de(ruta: str) -> BufferMedio:
+        if ruta not in medios:
+            medios[ruta] = BufferMedio.desde_archivo(
+                ruta,
+                nombre=archivo.filename if ruta == ruta_temp else None,
+                umbral_mmap=config.MEDIOS_UMBRAL_MMAP_MB * 1024 * 1024,
+                borrar_al_liberar=(ruta == ruta_temp)
+            )
+        return medios[ruta]
+
+    resultados_por_red: Dict[str, Dict[str, Any]] = {}
+    inicio = time.perf_counter()
+
+    async def _publicar(red: str) -> None:
+        t0 = time.perf_counter()
+        plazo = _plazo_red(red)
+        try:
+            # Texto y archivo de esta red: los del formulario o los de la generación en caché
+            texto_final, lista_hashtags = _texto_para_red(red, text, hashtags_form, generacion)
+            ruta_medio = ruta_temp or _medio_en_cache(red, generacion)
+            if not ruta_medio:
+                res = {"status": "error", "detalle": "No hay archivo para esta red en la generación en caché"}
+            else:
+                medio = _medio_de(ruta_medio).tomar()
+                if red == "instagram":
+                    # Instagram espera su contenedor en el event loop, sin ocupar un hilo
+                    try:
+                        post_id = await asyncio.wait_for(
+                            Instagram().publicar_foto_async(medio, texto_final), timeout=plazo
+                        )
+                        res = {"status": "ok", "post_id": post_id}
+                    finally:
+                        medio.soltar()
+                else:
+                    futuro = _pool_publicacion.submit(
+                        _publicar_en_red, red, int(current_user_id),
+                        texto_final, lista_hashtags, medio
+                    )
+                    futuro.add_done_callback(lambda _: medio.soltar())
+                    res = await asyncio.wait_for(asyncio.wrap_future(futuro), timeout=plazo)
+        except asyncio.TimeoutError:
+            # La petición a la red ya salió y el hilo sigue: puede publicarse igual.
+            # No es un error para reintentar a ciegas (duplicaría el post).
+            logger.error(f"⏱️ {red} superó su plazo de {plazo:.0f}s, resultado desconocido")
+            res = {"status": "pendiente", "detalle": _detalle_sin_respuesta(f"Tiempo agotado ({plazo:.0f}s)")}
+        except Exception as e_red:
+            logger.error(f"❌ Falló {red}: {e_red}")
+            res = {"status": "error", "detalle": str(e_red)}
+
+        res["tiempo_ms"] = int((time.perf_counter() - t0) * 1000)
+        resultados_por_red[red] = res
 
     try:
+        tareas = [asyncio.create_task(_publicar(red)) for red in lista_redes]
+        if tareas:
+            _, pendientes = await asyncio.wait(tareas, timeout=config.PUBLICAR_TIMEOUT_TOTAL_SEG)
+            for tarea in pendientes:
+                tarea.cancel()
+
+        # Mismo formato de siempre, en el orden pedido, más el tiempo de cada red
+        resultados = {}
         for red in lista_redes:
-            try:
-                # --- TIKTOK (Usa archivo local) ---
-                if red == "tiktok":
-                    # Verificar token en BD
-                    if not GestorTokens.usuario_tiene_token(db, int(current_user_id), "tiktok"):
-                        resultados[red] = {"status": "error", "detalle": "Falta conectar cuenta (Token)"}
-                        continue
-                    
-                    # Usamos helper para manejar refresh token
-                    with open(ruta_temp, "rb") as video_file:
-                        res = await _manejar_publicacion_tiktok(
-                            db, # Pasamos BD
-                            int(current_user_id), 
-                            texto_final, 
-                            lista_hashtags, 
-                            video_file
-                        )
-                    resultados[red] = {"status": "ok", "api_response": res}
-
-                # --- WHATSAPP (Usa URL de S3) ---
-                elif red == "whatsapp":
-                    wa_service = WhatsApp()
-                    
-                    with open(ruta_temp, "rb") as img_file:
-                        # LE PASAMOS EL NOMBRE REAL DEL ARCHIVO
-                        # Esto es lo que rellena la parte "name={nombre_imagen}"
-                        res = wa_service.publicar_foto(
-                            archivo_binario=img_file.read(), 
-                            mensaje=texto_final,
-                            nombre_archivo=archivo.filename 
-                        )
+            resultados[red] = resultados_por_red.get(red) or {
+                "status": "pendiente",
+                "detalle": _detalle_sin_respuesta(f"Tiempo total agotado ({config.PUBLICAR_TIMEOUT_TOTAL_SEG:.0f}s)"),
+                "tiempo_ms": int((time.perf_counter() - inicio) * 1000)
+            }
 
-                    resultados[red] = {"status": "ok", "post_id": res}
+        return {
+            "resumen": "Proceso finalizado",
+            "detalles": resultados,
+            "tiempo_total_ms": int((time.perf_counter() - inicio) * 1000)
+        }
 
-                # --- INSTAGRAM (Usa URL de S3) ---
-                elif red == "instagram":
-                    ig_service = Instagram()
-                    # Leer el archivo a bytes
-                    with open(ruta_temp, "rb") as img_file:
-                        res = ig_service.publicar_foto(
-                            archivo_binario=img_file.read(), 
-                            mensaje=texto_final
-                        )
+    finally:
+        for medio in medios.values():
+            medio.soltar()
+        if ruta_temp and ruta_temp not in medios and os.path.exists(ruta_temp):
+            os.remove(ruta_temp)
 
-                    resultados[red] = {"status": "ok", "post_id": res}
+# ==========================================
+# 3. HELPERS
+# ==========================================
+def _armar_nodo_red(red: str, datos_raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Convierte la salida cruda de la IA de una red al formato que ve el frontend"""
+    nodo_red = {
+        "text": datos_raw.get("text", ""),
+        "hashtags": datos_raw.get("hashtags", [])
+    }
+    
+    media_info = {}
+    if red == "tiktok":
+        video_path = datos_raw.get("video_path")
+        if video_path:
+            media_info = {"tipo": "video", "archivo_path": video_path, "video_hook": datos_raw.get("video_hook")}
+    elif red in ["facebook", "instagram", "linkedin", "whatsapp"]:
+        image_path = datos_raw.get("image_path")
+        if image_path:
+            media_info = {"tipo": "imagen", "archivo_path": image_path}
+
+    if media_info:
+        nodo_red["media_info"] = media_info
+    
+    return nodo_red
 
-                # --- FACEBOOK (Usa Bytes) ---
-                elif red == "facebook":
-                     fb_service = Facebook()
-                     with open(ruta_temp, "rb") as img_file:
-                        res = fb_service.publicar_foto(img_file.read(), texto_final)
-                     resultados[red] = {"status": "ok", "post_id": res}
 
-                # --- LINKEDIN (Usa ruta local o bytes) ---
-                elif red == "linkedin":
-                     lnk_service = LinkedinService()
-                     res = lnk_service.publicar_post_con_imagen(texto_final, ruta_temp)
-                     resultados[red] = {"status": "ok", "api_response": str(res)}
+def _parsear_hashtags(hashtags: Optional[str]) -> List[str]:
+    if not hashtags:
+        return []
+    limpio = hashtags.replace("[", "").replace("]", "").replace('"', "").replace("'", "")
+    return [h.strip() for h in limpio.split(",") if h.strip()]
 
-            except Exception as e_red:
-                logger.error(f"❌ Falló {red}: {e_red}")
-                resultados[red] = {"status": "error", "detalle": str(e_red)}
 
-        return {"resumen": "Proceso finalizado", "detalles": resultados}
+def _texto_para_red(
+    red: str,
+    text: Optional[str],
+    hashtags_form: List[str],
+    generacion: Optional[Dict[str, Any]]
+) -> Tuple[str, List[str]]:
+    """Texto final (con hashtags) de una red: el del formulario o, si no vino, el generado"""
+    if text:
+        texto, lista_hashtags = text, hashtags_form
+    else:
+        datos_red = (generacion or {}).get(red, {})
+        texto, lista_hashtags = datos_red.get("text", ""), datos_red.get("hashtags", [])
+
+    if not lista_hashtags:
+        return texto, []
+    tags_str = " ".join(f"#{t}" if not t.startswith("#") else t for t in lista_hashtags)
+    return f"{texto}\n\n{tags_str}", lista_hashtags
+
+
+def _medio_en_cache(red: str, generacion: Optional[Dict[str, Any]]) -> Optional[str]:
+    datos_red = (generacion or {}).get(red, {})
+    ruta = datos_red.get("video_path") or datos_red.get("image_path")
+    if ruta and os.path.exists(ruta):
+        return ruta
+    return None
+
+
+def _armar_respuesta(resultado_ia: Dict[str, Any], redes: List[str]) -> Dict[str, Any]:
+    return {red: _armar_nodo_red(red, resultado_ia[red]) for red in redes if red in resultado_ia}
+
+
+def _nuevo_chat(user_id: int, contenido: str, redes: List[str], respuesta_final: Dict[str, Any]) -> Chat:
+    """Chat con el prompt y la respuesta, listo para guardarse de una vez (ids al hacer flush)"""
+    return Chat(
+        usuario_id=user_id,
+        titulo=f"{contenido[:20]}...",
+        mensajes=[
+            Mensaje(rol="user", contenido=contenido, redes_objetivo=",".join(redes)),
+            # JSON nativo (comprimido si es grande), el historial lo devuelve sin re-parsear
+            GestorMensajes.nuevo_mensaje_assistant(None, respuesta_final, redes)
+        ]
+    )
+
+
+async def _procesar_trabajo_generacion(
+    trabajo_id: str,
+    user_id: int,
+    contenido: str,
+    redes: List[str],
+    no_cache: bool = False
+):
+    """
+    Corre texto, imágenes y video fuera de la petición HTTP, sobre el event loop:
+    esperar a OpenAI o a Sora no ocupa ningún hilo del threadpool de las rutas.
+    Va guardando el avance por red en la BD para que el polling lo vea.
+    """
+    async with SessionLocalAsync() as db:
+        # Las redes avanzan a la vez, pero la sesión es una sola: se escribe de a una
+        escritura = asyncio.Lock()
+
+        async def al_avanzar(red: str, data_red: Dict[str, Any], estado: str, detalle: Optional[str]):
+            async with escritura:
+                await GestorTrabajos.actualizar_red_async(
+                    db, trabajo_id, red, estado, _armar_nodo_red(red, data_red), detalle
+                )
 
-    finally:
-        if os.path.exists(ruta_temp):
-            try:
-                os.remove(ruta_temp)
-            except:
-                pass
+        try:
+            await GestorTrabajos.marcar_estado_async(db, trabajo_id, "procesando")
+
+            resultado_ia = await servicio_ia_async.generar_contenido_completo(
+                user_id=str(user_id),
+                contenido=contenido,
+                target_networks=redes,
+                al_avanzar=al_avanzar,
+                no_cache=no_cache
+            )
+            respuesta_final = _armar_respuesta(resultado_ia, redes)
 
-# ==========================================
-# 3. HELPERS
-# ==========================================
-async def _manejar_publicacion_tiktok(db: Session, user_id: int, text, hashtags, archivo_obj):
+            # Chat, mensajes y estado final del trabajo se confirman juntos
+            chat = _nuevo_chat(user_id, contenido, redes, respuesta_final)
+            db.add(chat)
+            await db.flush()
+            await GestorTrabajos.marcar_estado_async(db, trabajo_id, "completado", chat_id=chat.id)
+            logger.info(f"✅ Trabajo {trabajo_id} completado")
+
+        except Exception as e:
+            logger.error(f"❌ Trabajo {trabajo_id} falló: {e}")
+            await db.rollback()
+            await GestorTrabajos.marcar_estado_async(db, trabajo_id, "error", str(e))
+
+
+def _detalle_sin_respuesta(motivo: str) -> str:
+    return f"{motivo}: la publicación puede completarse igual, revisar la red antes de reintentar"
+
+
+def _plazo_red(red: str) -> float:
+    if red == "tiktok":
+        return config.PUBLICAR_TIMEOUT_TIKTOK_SEG
+    return config.PUBLICAR_TIMEOUT_RED_SEG
+
+
+def _publicar_en_red(
+    red: str,
+    user_id: int,
+    texto_final: str,
+    lista_hashtags: List[str],
+    medio: BufferMedio
+) -> Dict[str, Any]:
+    """Publica en UNA red. Corre en un hilo del pool de publicación."""
+
+    # --- TIKTOK (Usa archivo local) ---
+    if red == "tiktok":
+        # Sesión propia: la del request no se comparte entre hilos
+        db = SessionLocal()
+        try:
+            # Verificar token en BD
+            if not GestorTokens.usuario_tiene_token(db, user_id, "tiktok"):
+                return {"status": "error", "detalle": "Falta conectar cuenta (Token)"}
+            
+            # Usamos helper para manejar refresh token
+            res = _manejar_publicacion_tiktok(db, user_id, texto_final, lista_hashtags, medio)
+            return {"status": "ok", "api_response": res}
+        finally:
+            db.close()
+
+    # --- WHATSAPP (Usa URL de S3) ---
+    elif red == "whatsapp":
+        wa_service = WhatsApp()
+        
+        # LE PASAMOS EL NOMBRE REAL DEL ARCHIVO
+        # Esto es lo que rellena la parte "name={nombre_imagen}"
+        res = wa_service.publicar_foto(
+            archivo_binario=medio, 
+            mensaje=texto_final,
+            nombre_archivo=medio.nombre 
+        )
+
+        return {"status": "ok", "post_id": res}
+
+    # --- INSTAGRAM (Usa URL de S3) ---
+    elif red == "instagram":
+        ig_service = Instagram()
+        # El buffer compartido, sin volver a leer el archivo
+        res = ig_service.publicar_foto(
+            archivo_binario=medio, 
+            mensaje=texto_final
+        )
+
+        return {"status": "ok", "post_id": res}
+
+    # --- FACEBOOK (Usa Bytes) ---
+    elif red == "facebook":
+        fb_service = Facebook()
+        res = fb_service.publicar_foto(medio, texto_final)
+        return {"status": "ok", "post_id": res}
+
+    # --- LINKEDIN (Usa ruta local o el buffer) ---
+    elif red == "linkedin":
+        lnk_service = LinkedinService()
+        res = lnk_service.publicar_post_con_imagen(texto_final, medio)
+        return {"status": "ok", "api_response": str(res)}
+
+    return {"status": "error", "detalle": f"Red social no soportada: {red}"}
+
+
+def _manejar_publicacion_tiktok(db: Session, user_id: int, text, hashtags, archivo_obj):
     """Maneja TikTok con reintento de token"""
     tiktok_service = TikTok()
     
@@ -256,7 +464,7 @@ async def _manejar_publicacion_tiktok(db: Session, user_id: int, text, hashtags,
     
     try:
         # Intentar publicar
-        return tiktok_service.publicar_video(text, archivo_obj, hashtags, access_token)
+        return tiktok_service.publicar_video(text, archivo_obj, access_token, hashtags)
 
     except Exception as e:
         error_str = str(e).lower()
@@ -278,8 +486,7 @@ async def _manejar_publicacion_tiktok(db: Session, user_id: int, text, hashtags,
                 nuevo.get("expires_in")
             )
             
-            # Reintentar
-            archivo_obj.seek(0)
-            return tiktok_service.publicar_video(text, archivo_obj, hashtags, nuevo["access_token"])
+            # Reintentar (publicar_video vuelve a leer desde el inicio)
+            return tiktok_service.publicar_video(text, archivo_obj, nuevo["access_token"], hashtags)
         else:
             raise e
\ No newline at end of file
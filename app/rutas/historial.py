@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List
-from app.config.bd import obtener_bd
-from app.modelos.tablas import Chat, Mensaje, Usuario
-from app.utilidades.dependencia import obtener_usuario_actual
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, desc, or_, select
+from typing import Any, List, Optional
+from datetime import datetime
+import base64
+from app.config.bd import obtener_bd_async
+from app.modelos.tablas import Chat, Mensaje
+from app.repositorios.mensajes import CAMPOS_PROYECTABLES, GestorMensajes
+from app.utilidades.dependencia import UsuarioActual, obtener_usuario_actual
 from pydantic import BaseModel
 import json
 
 router = APIRouter(prefix="/historial", tags=["Historial"])
 
+# Paginación por cursor (keyset): la página siguiente se pide con el valor de
+# la cabecera X-Siguiente-Cursor; si no viene, no hay más resultados.
+CABECERA_CURSOR = "X-Siguiente-Cursor"
+
 # Esquemas simples para responder
 class ChatOut(BaseModel):
     id: int
@@ -19,39 +26,104 @@ class ChatOut(BaseModel):
 class MensajeOut(BaseModel):
     id: int
     rol: str
-    contenido: str # Se enviará como string JSON
+    contenido: Any # Texto si es del usuario, objeto JSON por red si es de la IA
     fecha: str
 
 # 1. OBTENER LISTA DE CHATS (Para la barra lateral)
 @router.get("/chats", response_model=List[ChatOut])
-def obtener_mis_chats(
-    db: Session = Depends(obtener_bd),
-    usuario: Usuario = Depends(obtener_usuario_actual)
+async def obtener_mis_chats(
+    response: Response,
+    limite: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(obtener_bd_async),
+    usuario: UsuarioActual = Depends(obtener_usuario_actual)
 ):
-    chats = db.query(Chat).filter(Chat.usuario_id == usuario.id).order_by(desc(Chat.fecha_creacion)).all()
+    # Más nuevos primero; el id desempata chats creados en el mismo instante
+    consulta = (
+        select(Chat.id, Chat.titulo, Chat.fecha_creacion)
+        .filter(Chat.usuario_id == usuario.id)
+        .order_by(desc(Chat.fecha_creacion), desc(Chat.id))
+        .limit(limite + 1)
+    )
+    if cursor:
+        fecha, ultimo_id = _leer_cursor(cursor, datetime.fromisoformat, int)
+        consulta = consulta.filter(or_(
+            Chat.fecha_creacion < fecha,
+            and_(Chat.fecha_creacion == fecha, Chat.id < ultimo_id)
+        ))
+
+    chats = (await db.execute(consulta)).all()
+    if len(chats) > limite:
+        chats = chats[:limite]
+        response.headers[CABECERA_CURSOR] = _crear_cursor(chats[-1].fecha_creacion.isoformat(), chats[-1].id)
+
     return [{"id": c.id, "titulo": c.titulo, "fecha": str(c.fecha_creacion)} for c in chats]
 
 # 2. OBTENER MENSAJES DE UN CHAT ESPECÍFICO
 @router.get("/chats/{chat_id}/mensajes", response_model=List[MensajeOut])
-def obtener_mensajes(
+async def obtener_mensajes(
     chat_id: int,
-    db: Session = Depends(obtener_bd),
-    usuario: Usuario = Depends(obtener_usuario_actual)
+    response: Response,
+    limite: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    campos: Optional[str] = Query(None, description="Solo estos campos por red, ej: 'text' o 'text,hashtags'"),
+    db: AsyncSession = Depends(obtener_bd_async),
+    usuario: UsuarioActual = Depends(obtener_usuario_actual)
 ):
+    lista_campos = [c.strip() for c in campos.split(",") if c.strip()] if campos else None
+    if lista_campos and not set(lista_campos) <= set(CAMPOS_PROYECTABLES):
+        raise HTTPException(status_code=400, detail=f"Campos válidos: {', '.join(CAMPOS_PROYECTABLES)}")
+
     # Verificamos que el chat sea del usuario
-    chat = db.query(Chat).filter(Chat.id == chat_id, Chat.usuario_id == usuario.id).first()
-    if not chat:
+    chat_id_propio = await db.scalar(
+        select(Chat.id).filter(Chat.id == chat_id, Chat.usuario_id == usuario.id)
+    )
+    if chat_id_propio is None:
         raise HTTPException(status_code=404, detail="Chat no encontrado")
     
-    mensajes = db.query(Mensaje).filter(Mensaje.chat_id == chat_id).order_by(Mensaje.id.asc()).all()
+    # En orden de conversación, a partir del último id de la página anterior
+    consulta = (
+        select(
+            Mensaje.id, Mensaje.rol, Mensaje.contenido, Mensaje.fecha,
+            GestorMensajes.columna_datos(lista_campos, db.bind.dialect.name), Mensaje.datos_zlib
+        )
+        .filter(Mensaje.chat_id == chat_id)
+        .order_by(Mensaje.id.asc())
+        .limit(limite + 1)
+    )
+    if cursor:
+        (ultimo_id,) = _leer_cursor(cursor, int)
+        consulta = consulta.filter(Mensaje.id > ultimo_id)
+
+    mensajes = (await db.execute(consulta)).all()
+    if len(mensajes) > limite:
+        mensajes = mensajes[:limite]
+        response.headers[CABECERA_CURSOR] = _crear_cursor(mensajes[-1].id)
     
     return [
         {
             "id": m.id, 
             "rol": m.rol, 
-            # Si es assistant, ya está en JSON string por el Paso 0. Si es user, es texto plano.
-            "contenido": m.contenido, 
+            # Si es assistant, el JSON ya viene decodificado (y proyectado si se pidió). Si es user, es texto plano.
+            "contenido": GestorMensajes.contenido_de(m.rol, m.contenido, m.datos, m.datos_zlib, lista_campos),
             "fecha": str(m.fecha)
         } 
         for m in mensajes
-    ]
\ No newline at end of file
+    ]
+
+
+# 3. HELPERS DEL CURSOR
+def _crear_cursor(*valores) -> str:
+    """Cursor opaco para el cliente: la clave del último elemento entregado"""
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode()
+
+
+def _leer_cursor(cursor: str, *tipos) -> list:
+    """Decodifica el cursor y convierte cada valor con su tipo; 400 si no es nuestro"""
+    try:
+        valores = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(valores) != len(tipos):
+            raise ValueError(cursor)
+        return [tipo(valor) for tipo, valor in zip(tipos, valores)]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
@@ -1,41 +1,60 @@
 # app/rutas/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Importamos tus herramientas
-from app.config.bd import obtener_bd
+from app.config.bd import obtener_bd_async
 from app.modelos.tablas import Usuario  # Tu modelo SQL
 from app.modelos.esquemas import UsuarioRegistro, UsuarioLogin, TokenResponse # Tus modelos JSON
-from app.utilidades.seguridad import encriptar_password, verificar_password, crear_token_acceso
+from app.utilidades.seguridad import (
+    HashSaturado,
+    encriptar_password_async,
+    verificar_y_actualizar_async,
+    crear_token_acceso,
+)
 
 # Creamos el router separado
 router = APIRouter(prefix="", tags=["Autenticación"])
 
+
+def _servicio_saturado() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servicio de autenticación saturado, intenta de nuevo en unos segundos",
+        headers={"Retry-After": "2"}
+    )
+
+
 # ==========================================
 # 1. ENDPOINT: REGISTRO
 # ==========================================
 @router.post("/registro", status_code=status.HTTP_201_CREATED)
-def registrar_usuario(usuario: UsuarioRegistro, db: Session = Depends(obtener_bd)):
+async def registrar_usuario(usuario: UsuarioRegistro, db: AsyncSession = Depends(obtener_bd_async)):
     
     # 1. Verificar si el email ya existe
-    usuario_existente = db.query(Usuario).filter(Usuario.email == usuario.email).first()
+    usuario_existente = await db.scalar(select(Usuario.id).filter(Usuario.email == usuario.email))
     if usuario_existente:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="El correo electrónico ya está registrado"
         )
 
-    # 2. Crear el nuevo usuario (Hasheando la contraseña)
+    # 2. Crear el nuevo usuario (Hasheando la contraseña en el pool de Argon2)
+    try:
+        contrasena_hash = await encriptar_password_async(usuario.password)
+    except HashSaturado:
+        raise _servicio_saturado()
+
     nuevo_usuario = Usuario(
         nombre=usuario.nombre,
         email=usuario.email,
-        contrasena_hash=encriptar_password(usuario.password) # <--- Importante: Hashear aquí
+        contrasena_hash=contrasena_hash # <--- Importante: Hashear aquí
     )
 
     # 3. Guardar en BD
     db.add(nuevo_usuario)
-    db.commit()
-    db.refresh(nuevo_usuario)
+    await db.commit()
 
     return {"mensaje": "Usuario creado exitosamente", "id": nuevo_usuario.id}
 
@@ -44,20 +63,31 @@ def registrar_usuario(usuario: UsuarioRegistro, db: Session = Depends(obtener_bd
 # 2. ENDPOINT: LOGIN
 # ==========================================
 @router.post("/login", response_model=TokenResponse)
-def login_usuario(credenciales: UsuarioLogin, db: Session = Depends(obtener_bd)):
+async def login_usuario(credenciales: UsuarioLogin, db: AsyncSession = Depends(obtener_bd_async)):
     
     # 1. Buscar usuario por email
-    usuario_db = db.query(Usuario).filter(Usuario.email == credenciales.email).first()
+    usuario_db = await db.scalar(select(Usuario).filter(Usuario.email == credenciales.email))
 
     # 2. Validar que exista y que la contraseña coincida
     if not usuario_db:
         raise HTTPException(status_code=400, detail="Credenciales incorrectas")
         
-    if not verificar_password(credenciales.password, usuario_db.contrasena_hash):
+    try:
+        valida, hash_nuevo = await verificar_y_actualizar_async(credenciales.password, usuario_db.contrasena_hash)
+    except HashSaturado:
+        raise _servicio_saturado()
+
+    if not valida:
         raise HTTPException(status_code=400, detail="Credenciales incorrectas")
 
+    # Cambiaron los parámetros de Argon2: guardamos el hash con los nuevos
+    if hash_nuevo:
+        usuario_db.contrasena_hash = hash_nuevo
+        await db.commit()
+
     # 3. Generar el Token JWT
-    access_token = crear_token_acceso(data={"sub": usuario_db.email})
+    # 'uid' permite resolver al usuario por clave primaria (o desde caché) en cada petición
+    access_token = crear_token_acceso(data={"sub": usuario_db.email, "uid": usuario_db.id})
 
     return {
         "access_token": access_token,
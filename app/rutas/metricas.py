@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends
+from typing import Dict, Any
+
+from app.config.bd import estadisticas_pool
+from app.config.configuracion import obtener_configuracion
+from app.servicios.http import obtener_cliente_http
+from app.servicios.cache import (
+    obtener_cache_estado_tokens, obtener_cache_generaciones, obtener_cache_imagenes, obtener_cache_resultados
+)
+from app.servicios.hosting import obtener_servicio_hosting
+from app.utilidades.dependencia import obtener_admin_metricas
+from app.utilidades.monitor_bucle import obtener_monitor_bucle
+
+# Exponen hosts, tamaños de pools y pilas de código: solo para administradores
+router = APIRouter(prefix="/metricas", tags=["Métricas"], dependencies=[Depends(obtener_admin_metricas)])
+
+
+# ==================== CACHÉS ====================
+@router.get("/cache", response_model=Dict[str, Any])
+def obtener_metricas_cache():
+    """Aciertos, fallos y ocupación de las cachés de generación"""
+    return {
+        "generaciones_texto": obtener_cache_generaciones().estadisticas(),
+        "imagenes": obtener_cache_imagenes().estadisticas(),
+        "resultados": obtener_cache_resultados().estadisticas(),
+        "hosting": obtener_servicio_hosting().estadisticas(),
+        "estado_tokens": obtener_cache_estado_tokens().estadisticas()
+    }
+
+
+# ==================== POOL HTTP ====================
+@router.get("/http", response_model=Dict[str, Any])
+def obtener_metricas_http():
+    """Uso del pool HTTP compartido por host (conexiones en uso, picos, esperas)"""
+    return obtener_cliente_http().estadisticas()
+
+
+
+# ==================== POOL DE BASE DE DATOS ====================
+@router.get("/bd", response_model=Dict[str, Any])
+def obtener_metricas_bd():
+    """Conexiones en uso, saturación y tiempos de espera del pool de la BD"""
+    return estadisticas_pool()
+
+
+# ==================== EVENT LOOP ====================
+@router.get("/bucle", response_model=Dict[str, Any])
+def obtener_metricas_bucle():
+    """Lag del event loop (p50/p90/p99) y los últimos bloqueos (con su pila si MONITOR_BUCLE_EXPONER_PILAS)"""
+    return obtener_monitor_bucle().estadisticas(incluir_pilas=obtener_configuracion().MONITOR_BUCLE_EXPONER_PILAS)
@@ -1,66 +1,48 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
 import logging
 
 # IMPORTAMOS LA SEGURIDAD PARA OBTENER EL USUARIO REAL
-from app.utilidades.dependencia import obtener_usuario_actual
-from app.modelos.tablas import Usuario
+from app.utilidades.dependencia import UsuarioActual, obtener_usuario_actual
 
 from app.repositorios.tokens import GestorTokens
 from app.plataformas.tiktok import TikTok
-from app.config.bd import SessionLocal # Necesario para guardar el token en el callback
+from app.config.bd import SessionLocalAsync, obtener_bd_async
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="")
 
-# Helper para obtener BD manualmente dentro del callback
-def obtener_bd_manual():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 
 # ==================== TOKENS (ESTADO) ====================
 # Quitamos {user_id} de la URL. Ahora es solo /tokens/estado
 @router.get("/tokens/estado")
 async def obtener_tokens_usuario(
     # Obtenemos el usuario del token (Header Authorization)
-    usuario_actual: Usuario = Depends(obtener_usuario_actual),
-    db: Session = Depends(obtener_bd_manual) # O usa tu dependency normal 'obtener_bd'
+    usuario_actual: UsuarioActual = Depends(obtener_usuario_actual),
+    db: AsyncSession = Depends(obtener_bd_async)
 ):
     """
-    Verifica qué redes tiene conectadas el usuario logueado.
+    Verifica qué redes tiene conectadas el usuario logueado y el estado de cada token.
+    Una sola consulta agrupada, en caché por usuario hasta que se guarde un token nuevo.
     """
     user_id = usuario_actual.id # ID real (ej: 1)
     
-    repo_tokens = GestorTokens()
     redes = ["tiktok", "facebook", "instagram", "linkedin", "whatsapp"]
-    
-    tokens_activos = []
-    
-    # IMPORTANTE: Asegúrate de pasar la sesión de BD 'db' si tu función lo pide.
-    # Si tu GestorTokens.usuario_tiene_token usa una sesión interna, está bien,
-    # pero según tu código anterior, 'usuario_tiene_token' pide 'db'.
-    
-    for red in redes:
-        # Pasamos el ID entero (1), no el string "api-user"
-        if repo_tokens.usuario_tiene_token(db, user_id, red):
-            tokens_activos.append(red)
+    estado = await GestorTokens.estado_redes_async(db, user_id)
     
     return {
         "user_id": user_id,
-        "redes_conectadas": tokens_activos
+        "redes_conectadas": [red for red in redes if red in estado],
+        "estado": {red: estado[red] for red in redes if red in estado}
     }
 
 # ==================== 1. INICIAR CONEXIÓN ====================
 @router.get("/tiktok/conectar")
 async def conectar_tiktok(
-    usuario_actual: Usuario = Depends(obtener_usuario_actual)
+    usuario_actual: UsuarioActual = Depends(obtener_usuario_actual)
 ):
     try:
         user_id_str = str(usuario_actual.id)
@@ -69,8 +51,9 @@ async def conectar_tiktok(
         # 1. Obtenemos URL y Verifier
         auth_url, verifier = tiktok_service.obtener_url_oauth_con_verifier(user_id_str)
         
-        # 2. Guardamos el verifier asociado a este ID real
-        GestorTokens.guardar_verifier(
+        # 2. Guardamos el verifier asociado a este ID real (SQLite bloqueante: fuera del loop)
+        await asyncio.to_thread(
+            GestorTokens.guardar_verifier,
             user_id=user_id_str,
             red_social="tiktok",
             verifier=verifier
@@ -101,27 +84,28 @@ async def callback_tiktok(
         
         # --- CORRECCIÓN AQUÍ ---
         # obtener_verifier devuelve el string directamente, NO un diccionario.
-        verifier = GestorTokens.obtener_verifier(user_id, "tiktok")
+        verifier = await asyncio.to_thread(GestorTokens.obtener_verifier, user_id, "tiktok")
         
         if not verifier:
             raise HTTPException(status_code=400, detail="Error: verifier no encontrado o expiró")
         
         # Usamos la variable 'verifier' directamente (antes decía verifier['verifier'])
-        token_data = tiktok.intercambiar_codigo_por_token(code, verifier)
+        token_data = await asyncio.to_thread(tiktok.intercambiar_codigo_por_token, code, verifier)
         
         # GUARDAR TOKEN (Usando el user_id que llegó en el state)
-        GestorTokens.guardar_token(
-            db=next(obtener_bd_manual()),
-            user_id=int(user_id),
-            red_social="tiktok",
-            access_token=token_data["access_token"],
-            refresh_token=token_data.get("refresh_token"),
-            expires_in=token_data.get("expires_in"),
-            # metadata={"open_id": token_data.get("open_id")} # Descomenta si tu función lo soporta
-        )
+        async with SessionLocalAsync() as db:
+            await GestorTokens.guardar_token_async(
+                db=db,
+                user_id=int(user_id),
+                red_social="tiktok",
+                access_token=token_data["access_token"],
+                refresh_token=token_data.get("refresh_token"),
+                expires_in=token_data.get("expires_in"),
+                # metadata={"open_id": token_data.get("open_id")} # Descomenta si tu función lo soporta
+            )
         
         # Limpiar verifier usado
-        GestorTokens.eliminar_verifier(user_id, "tiktok")
+        await asyncio.to_thread(GestorTokens.eliminar_verifier, user_id, "tiktok")
         
         # Redirigir al frontend (ajusta el puerto si es necesario)
         return RedirectResponse(url="http://localhost:4200/chat")
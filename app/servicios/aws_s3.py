@@ -1,55 +1,90 @@
 import boto3
-import os
 import logging
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import NoCredentialsError
 from app.config.configuracion import obtener_configuracion
+from app.utilidades.medios import DatosMedio, lector_de
 
 logger = logging.getLogger(__name__)
 
 class GestorS3:
+    """
+    Cliente S3 de larga vida (singleton): un solo pool de conexiones para
+    todo el proceso, subidas multipart concurrentes y lotes en paralelo.
+    Con AWS_S3_ENDPOINT_URL apunta a un S3 compatible local (MinIO, moto).
+    """
+
+    _instancia = None
+
+    def __new__(cls):
+        if cls._instancia is None:
+            cls._instancia = super().__new__(cls)
+            cls._instancia._inicializado = False
+        return cls._instancia
+
     def __init__(self):
+        if self._inicializado:
+            return
+
         config = obtener_configuracion()
-        
+
         self.bucket_name = config.AWS_S3_BUCKET_NAME
         self.region = config.AWS_REGION
-        
-        # Conexión con AWS
+        self.endpoint_url = config.AWS_S3_ENDPOINT_URL or None
+
+        # Conexión con AWS (el cliente de boto3 es thread-safe y reutiliza conexiones)
         self.s3 = boto3.client(
             's3',
             aws_access_key_id=config.AWS_ACCESS_KEY_ID,
             aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
-            region_name=self.region
+            region_name=self.region,
+            endpoint_url=self.endpoint_url,
+            config=BotoConfig(
+                max_pool_connections=config.AWS_S3_MAX_CONEXIONES,
+                retries={"max_attempts": 5, "mode": "adaptive"}
+            )
+        )
+
+        # Archivos grandes: partes de AWS_S3_PARTE_MB subidas en paralelo
+        self.transferencia = TransferConfig(
+            multipart_threshold=config.AWS_S3_MULTIPART_UMBRAL_MB * 1024 * 1024,
+            multipart_chunksize=config.AWS_S3_PARTE_MB * 1024 * 1024,
+            max_concurrency=config.AWS_S3_HILOS_POR_ARCHIVO,
+            use_threads=True
         )
+        self._pool_lote = ThreadPoolExecutor(
+            max_workers=config.AWS_S3_HILOS_LOTE,
+            thread_name_prefix="s3-lote"
+        )
+        self._inicializado = True
+
+        logger.info("☁️ Gestor S3 inicializado")
 
     def subir_archivo(self, ruta_archivo: str, nombre_destino: str) -> str:
         """
         Sube un archivo local a S3 y retorna su URL pública.
         """
         try:
-            # 1. Detectar tipo de contenido (Para que el navegador sepa si es imagen o video)
-            ext = nombre_destino.split('.')[-1].lower()
-            content_type = "application/octet-stream"
-            if ext in ['jpg', 'jpeg']: content_type = "image/jpeg"
-            elif ext == 'png': content_type = "image/png"
-            elif ext == 'mp4': content_type = "video/mp4"
-
             logger.info(f"☁️ Subiendo a S3: {nombre_destino}...")
 
-            # 2. Subir archivo
-            with open(ruta_archivo, "rb") as data:
-                self.s3.upload_fileobj(
-                    data, 
-                    self.bucket_name, 
-                    nombre_destino,
-                    ExtraArgs={'ContentType': content_type} 
-                    # Nota: Si tu bucket NO es público por política, 
-                    # podrías necesitar agregar: 'ACL': 'public-read' aquí.
-                )
-
-            # 3. Construir URL Pública
-            # Formato estándar: https://BUCKET.s3.REGION.amazonaws.com/ARCHIVO
-            url = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{nombre_destino}"
-            
+            # upload_file decide solo entre PUT simple y multipart concurrente
+            self.s3.upload_file(
+                ruta_archivo,
+                self.bucket_name,
+                nombre_destino,
+                ExtraArgs={'ContentType': self._tipo_contenido(nombre_destino)},
+                Config=self.transferencia
+                # Nota: Si tu bucket NO es público por política,
+                # podrías necesitar agregar: 'ACL': 'public-read' aquí.
+            )
+
+            url = self.url_publica(nombre_destino)
             logger.info(f"✅ Subida exitosa. URL: {url}")
             return url
 
@@ -59,4 +94,71 @@ class GestorS3:
             raise Exception("Credenciales de AWS incorrectas")
         except Exception as e:
             logger.error(f"❌ Error S3: {e}")
-            raise Exception(f"Error subiendo a S3: {e}")
\ No newline at end of file
+            raise Exception(f"Error subiendo a S3: {e}")
+
+    def subir_buffer(
+        self,
+        datos: DatosMedio,
+        nombre_destino: str,
+        tipo_contenido: Optional[str] = None
+    ) -> str:
+        """
+        Sube bytes o un BufferMedio ya cargado, sin pasar por disco ni copiarlo.
+        """
+        try:
+            logger.info(f"☁️ Subiendo a S3 (memoria): {nombre_destino}...")
+
+            self.s3.upload_fileobj(
+                lector_de(datos),
+                self.bucket_name,
+                nombre_destino,
+                ExtraArgs={'ContentType': tipo_contenido or self._tipo_contenido(nombre_destino)},
+                Config=self.transferencia
+            )
+
+            url = self.url_publica(nombre_destino)
+            logger.info(f"✅ Subida exitosa. URL: {url}")
+            return url
+
+        except NoCredentialsError:
+            raise Exception("Credenciales de AWS incorrectas")
+        except Exception as e:
+            logger.error(f"❌ Error S3: {e}")
+            raise Exception(f"Error subiendo a S3: {e}")
+
+    def subir_lote(self, archivos: List[Tuple[str, str]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Sube varios (ruta_archivo, nombre_destino) en paralelo.
+        Un archivo que falla no detiene al resto: cada destino trae su status.
+        """
+        futuros = {
+            nombre_destino: self._pool_lote.submit(self.subir_archivo, ruta, nombre_destino)
+            for ruta, nombre_destino in archivos
+        }
+
+        resultados = {}
+        for nombre_destino, futuro in futuros.items():
+            try:
+                resultados[nombre_destino] = {"status": "ok", "url": futuro.result()}
+            except Exception as e:
+                resultados[nombre_destino] = {"status": "error", "detalle": str(e)}
+
+        logger.info(f"☁️ Lote S3: {sum(r['status'] == 'ok' for r in resultados.values())}/{len(archivos)} subidos")
+        return resultados
+
+    def url_publica(self, nombre_destino: str) -> str:
+        if self.endpoint_url:
+            # S3 compatible local: estilo ruta (endpoint/bucket/archivo)
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket_name}/{nombre_destino}"
+        # Formato estándar: https://BUCKET.s3.REGION.amazonaws.com/ARCHIVO
+        return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{nombre_destino}"
+
+    @staticmethod
+    def _tipo_contenido(nombre_destino: str) -> str:
+        # Para que el navegador sepa si es imagen o video
+        return mimetypes.guess_type(nombre_destino)[0] or "application/octet-stream"
+
+
+@lru_cache()
+def obtener_gestor_s3() -> GestorS3:
+    return GestorS3()
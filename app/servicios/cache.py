@@ -0,0 +1,512 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config.configuracion import obtener_configuracion
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================
+# 1. ALMACENES CLAVE -> TEXTO (intercambiables)
+# ==========================================
+class AlmacenMemoria:
+    """
+    Almacén en RAM del proceso, con TTL por entrada y desalojo LRU
+    por número de entradas y por bytes totales.
+    """
+
+    def __init__(self, max_entradas: int = 1000, max_bytes: Optional[int] = None):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._datos: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str) -> Optional[str]:
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            valor, expira, _ = entrada
+            if expira <= time.time():
+                self._quitar(clave)
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave: str, valor: str, ttl: float) -> None:
+        tamano = len(valor.encode("utf-8"))
+        with self._lock:
+            if clave in self._datos:
+                self._quitar(clave)
+            self._datos[clave] = (valor, time.time() + ttl, tamano)
+            self._bytes += tamano
+            self._desalojar()
+
+    def eliminar(self, clave: str) -> None:
+        with self._lock:
+            if clave in self._datos:
+                self._quitar(clave)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._datos)
+
+    def bytes_usados(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def _quitar(self, clave: str) -> None:
+        _, _, tamano = self._datos.pop(clave)
+        self._bytes -= tamano
+
+    def _desalojar(self) -> None:
+        # Se llama con el lock tomado: primero vencidos, luego los menos usados
+        ahora = time.time()
+        for clave in [c for c, (_, expira, _) in self._datos.items() if expira <= ahora]:
+            self._quitar(clave)
+        while self._datos and (
+            len(self._datos) > self.max_entradas
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            self._quitar(next(iter(self._datos)))
+
+
+class AlmacenSQLite:
+    """
+    Almacén clave -> texto en un archivo SQLite local, con TTL por entrada
+    y desalojo LRU por número de entradas y por bytes totales.
+    El archivo lo pueden compartir varios workers de la misma máquina.
+    """
+
+    def __init__(
+        self,
+        ruta: str,
+        tabla: str = "entradas",
+        max_entradas: int = 1000,
+        max_bytes: Optional[int] = None
+    ):
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+        self.ruta = ruta
+        self.tabla = tabla
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(ruta, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+
+        # Es una caché: si el esquema viejo no tiene 'tamano', se recrea la tabla
+        columnas = [fila[1] for fila in self._conn.execute(f"PRAGMA table_info({tabla})")]
+        if columnas and "tamano" not in columnas:
+            self._conn.execute(f"DROP TABLE {tabla}")
+
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {tabla} ("
+            " clave TEXT PRIMARY KEY,"
+            " valor TEXT NOT NULL,"
+            " expira REAL NOT NULL,"
+            " ultimo_acceso REAL NOT NULL,"
+            " tamano INTEGER NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{tabla}_acceso ON {tabla} (ultimo_acceso)")
+
+    def obtener(self, clave: str) -> Optional[str]:
+        ahora = time.time()
+        with self._lock:
+            fila = self._conn.execute(
+                f"SELECT valor, expira FROM {self.tabla} WHERE clave = ?", (clave,)
+            ).fetchone()
+            if fila is None:
+                return None
+            if fila[1] <= ahora:
+                self._conn.execute(f"DELETE FROM {self.tabla} WHERE clave = ?", (clave,))
+                return None
+            self._conn.execute(
+                f"UPDATE {self.tabla} SET ultimo_acceso = ? WHERE clave = ?", (ahora, clave)
+            )
+            return fila[0]
+
+    def guardar(self, clave: str, valor: str, ttl: float) -> None:
+        ahora = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.tabla} (clave, valor, expira, ultimo_acceso, tamano) VALUES (?, ?, ?, ?, ?)",
+                (clave, valor, ahora + ttl, ahora, len(valor.encode("utf-8")))
+            )
+            self._desalojar(ahora)
+
+    def eliminar(self, clave: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.tabla} WHERE clave = ?", (clave,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.tabla}").fetchone()[0]
+
+    def bytes_usados(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COALESCE(SUM(tamano), 0) FROM {self.tabla}").fetchone()[0]
+
+    def _desalojar(self, ahora: float) -> None:
+        # Se llama con el lock tomado: primero vencidos, luego los menos usados
+        self._conn.execute(f"DELETE FROM {self.tabla} WHERE expira <= ?", (ahora,))
+        sobrantes = self._conn.execute(f"SELECT COUNT(*) FROM {self.tabla}").fetchone()[0] - self.max_entradas
+        if sobrantes > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.tabla} WHERE clave IN ("
+                f" SELECT clave FROM {self.tabla} ORDER BY ultimo_acceso ASC LIMIT ?)",
+                (sobrantes,)
+            )
+
+        if self.max_bytes is None:
+            return
+        total = self._conn.execute(f"SELECT COALESCE(SUM(tamano), 0) FROM {self.tabla}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        filas = self._conn.execute(
+            f"SELECT clave, tamano FROM {self.tabla} ORDER BY ultimo_acceso ASC"
+        ).fetchall()
+        # Nunca dejamos la tabla vacía por una sola entrada grande: la más reciente se queda
+        for clave, tamano in filas[:-1]:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute(f"DELETE FROM {self.tabla} WHERE clave = ?", (clave,))
+            total -= tamano
+
+
+class AlmacenConRespaldo:
+    """
+    Usa el almacén 'principal' (compartido entre workers) y, si falla, cae al
+    'respaldo' en RAM: un problema con el archivo no corta el flujo, solo
+    pierde el alcance entre workers mientras dure.
+    """
+
+    def __init__(self, principal, respaldo: AlmacenMemoria, nombre: str = "almacen"):
+        self.principal = principal
+        self.respaldo = respaldo
+        self.nombre = nombre
+        self.max_entradas = respaldo.max_entradas
+        self.max_bytes = respaldo.max_bytes
+
+    def obtener(self, clave: str) -> Optional[str]:
+        if self.principal is not None:
+            try:
+                valor = self.principal.obtener(clave)
+                if valor is not None:
+                    return valor
+            except Exception as e:
+                logger.warning(f"⚠️ Almacén {self.nombre} no disponible, usando memoria: {e}")
+        return self.respaldo.obtener(clave)
+
+    def guardar(self, clave: str, valor: str, ttl: float) -> None:
+        if self.principal is not None:
+            try:
+                self.principal.guardar(clave, valor, ttl)
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ Almacén {self.nombre} no disponible, usando memoria: {e}")
+        self.respaldo.guardar(clave, valor, ttl)
+
+    def eliminar(self, clave: str) -> None:
+        self.respaldo.eliminar(clave)
+        if self.principal is not None:
+            try:
+                self.principal.eliminar(clave)
+            except Exception as e:
+                logger.warning(f"⚠️ Almacén {self.nombre} no disponible: {e}")
+
+    def __len__(self) -> int:
+        return len(self.respaldo) + (len(self.principal) if self.principal is not None else 0)
+
+    def bytes_usados(self) -> int:
+        return self.respaldo.bytes_usados() + (self.principal.bytes_usados() if self.principal is not None else 0)
+
+
+def crear_almacen(
+    backend: str,
+    nombre: str,
+    max_entradas: int,
+    max_bytes: Optional[int] = None
+):
+    """
+    'memoria' -> solo este proceso.
+    'sqlite'  -> archivo local en CACHE_DIR compartido entre workers de la máquina.
+    """
+    if backend == "memoria":
+        return AlmacenMemoria(max_entradas=max_entradas, max_bytes=max_bytes)
+    if backend == "sqlite":
+        config = obtener_configuracion()
+        return AlmacenSQLite(
+            os.path.join(config.CACHE_DIR, f"{nombre}.db"),
+            tabla=nombre,
+            max_entradas=max_entradas,
+            max_bytes=max_bytes
+        )
+    raise ValueError(f"Backend de caché desconocido: {backend}")
+
+
+# ==========================================
+# 2. CACHÉS DE RESULTADOS JSON
+# ==========================================
+class CacheJSON:
+    """Diccionarios serializados sobre cualquier almacén, con contadores de aciertos/fallos"""
+
+    def __init__(self, almacen, ttl: float, nombre: str = "cache"):
+        self.almacen = almacen
+        self.ttl = ttl
+        self.nombre = nombre
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: str) -> Optional[Dict[str, Any]]:
+        try:
+            valor = self.almacen.obtener(clave)
+        except Exception as e:
+            logger.warning(f"⚠️ Caché {self.nombre} no disponible: {e}")
+            valor = None
+
+        with self._lock:
+            if valor is None:
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+
+        logger.info(f"♻️ Acierto en caché {self.nombre} ({clave[:12]})")
+        return json.loads(valor)
+
+    def guardar(self, clave: str, valor: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        try:
+            self.almacen.guardar(clave, json.dumps(valor, ensure_ascii=False), ttl or self.ttl)
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo guardar en caché {self.nombre}: {e}")
+
+    def eliminar(self, clave: str) -> None:
+        self.almacen.eliminar(clave)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "backend": type(self.almacen).__name__,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / total, 3) if total else 0.0,
+                "entradas": len(self.almacen),
+                "max_entradas": self.almacen.max_entradas,
+                "bytes": self.almacen.bytes_usados(),
+                "max_bytes": self.almacen.max_bytes,
+                "ttl_seg": self.ttl
+            }
+
+
+class CacheGeneraciones(CacheJSON):
+    """
+    Guarda la respuesta JSON del modelo de texto.
+    La clave es un hash de: contenido normalizado + redes ordenadas + modelo + versión del prompt.
+    """
+
+    @staticmethod
+    def clave(contenido: str, redes: List[str], modelo: str, version_prompt: str) -> str:
+        # Normalizamos para que reintentos con espacios o saltos distintos caigan en la misma clave
+        normalizado = " ".join(unicodedata.normalize("NFC", contenido).split())
+        material = json.dumps(
+            {
+                "contenido": normalizado,
+                "redes": sorted(set(redes)),
+                "modelo": modelo,
+                "prompt": version_prompt
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class CacheResultados(CacheJSON):
+    """
+    Última generación completa de cada usuario (texto por red + rutas de imagen/video).
+    Es lo que /publicar reutiliza cuando usar_cache=True.
+    """
+
+    def obtener_usuario(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return self.obtener(f"usuario:{user_id}")
+
+    def guardar_usuario(self, user_id: str, resultado: Dict[str, Any]) -> None:
+        self.guardar(f"usuario:{user_id}", resultado)
+
+
+# ==========================================
+# 3. CACHÉ DE IMÁGENES GENERADAS (disco)
+# ==========================================
+class CacheImagenes:
+    """
+    Cada imagen se guarda UNA vez en disco, nombrada por el hash de
+    (modelo, tamaño, prompt). Un acierto devuelve la ruta existente.
+    El directorio se limita por bytes totales: se borran primero las
+    imágenes usadas hace más tiempo (mtime se actualiza en cada acierto).
+    Lo que queda en el historial se exporta fuera del directorio: el
+    desalojo nunca borra la única copia de una imagen referenciada.
+    """
+
+    def __init__(self, directorio: str, max_bytes: int):
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clave(modelo: str, size: str, prompt: str) -> str:
+        prompt_hash = hashlib.sha256(prompt.strip().encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{modelo}|{size}|{prompt_hash}".encode("utf-8")).hexdigest()
+
+    def ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, f"{clave}.png")
+
+    def obtener(self, modelo: str, size: str, prompt: str) -> Optional[str]:
+        ruta = self.ruta(self.clave(modelo, size, prompt))
+        try:
+            # Marcamos el uso para el LRU; si no existe, es un fallo
+            os.utime(ruta, None)
+        except FileNotFoundError:
+            with self._lock:
+                self.fallos += 1
+            return None
+
+        with self._lock:
+            self.aciertos += 1
+        logger.info(f"♻️ Imagen recuperada de caché: {ruta}")
+        return ruta
+
+    def guardar(self, modelo: str, size: str, prompt: str, imagen_bytes: bytes) -> str:
+        ruta = self.ruta(self.clave(modelo, size, prompt))
+
+        # Escritura atómica: otro hilo nunca ve un PNG a medio escribir
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporal, "wb") as f:
+            f.write(imagen_bytes)
+        os.replace(temporal, ruta)
+
+        self._desalojar(conservar=ruta)
+        return ruta
+
+    def exportar(self, ruta: str, destino: str) -> str:
+        """
+        Copia propia de una imagen de la caché en 'destino'. Es un hard link si
+        el sistema lo permite (no ocupa espacio extra); desalojar la entrada de
+        la caché no la afecta. FileNotFoundError si la entrada ya se desalojó.
+        """
+        os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+        with self._lock:
+            try:
+                os.link(ruta, destino)
+            except FileNotFoundError:
+                raise
+            except OSError:
+                shutil.copyfile(ruta, destino)
+        return destino
+
+    def _archivos(self) -> List[os.DirEntry]:
+        return [e for e in os.scandir(self.directorio) if e.is_file() and e.name.endswith(".png")]
+
+    def _desalojar(self, conservar: str) -> None:
+        with self._lock:
+            archivos = self._archivos()
+            total = sum(e.stat().st_size for e in archivos)
+            if total <= self.max_bytes:
+                return
+
+            for entrada in sorted(archivos, key=lambda e: e.stat().st_mtime):
+                if total <= self.max_bytes:
+                    break
+                if os.path.abspath(entrada.path) == os.path.abspath(conservar):
+                    continue
+                try:
+                    tamano = entrada.stat().st_size
+                    os.remove(entrada.path)
+                    total -= tamano
+                    logger.info(f"🧹 Imagen desalojada de caché: {entrada.name}")
+                except FileNotFoundError:
+                    pass
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            archivos = self._archivos()
+            total = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / total, 3) if total else 0.0,
+                "archivos": len(archivos),
+                "bytes": sum(e.stat().st_size for e in archivos),
+                "max_bytes": self.max_bytes
+            }
+
+
+@lru_cache()
+def obtener_cache_generaciones() -> CacheGeneraciones:
+    config = obtener_configuracion()
+    almacen = crear_almacen(
+        "sqlite",
+        "generaciones_texto",
+        max_entradas=config.CACHE_TEXTO_MAX_ENTRADAS
+    )
+    return CacheGeneraciones(almacen, ttl=config.CACHE_TEXTO_TTL_SEG, nombre="texto")
+
+
+@lru_cache()
+def obtener_cache_resultados() -> CacheResultados:
+    config = obtener_configuracion()
+    almacen = crear_almacen(
+        config.CACHE_RESULTADOS_BACKEND,
+        "resultados",
+        max_entradas=config.CACHE_RESULTADOS_MAX_ENTRADAS,
+        max_bytes=config.CACHE_RESULTADOS_MAX_MB * 1024 * 1024
+    )
+    return CacheResultados(almacen, ttl=config.CACHE_RESULTADOS_TTL_SEG, nombre="resultados")
+
+
+@lru_cache()
+def obtener_cache_estado_tokens() -> CacheJSON:
+    config = obtener_configuracion()
+    almacen = crear_almacen(
+        config.CACHE_TOKENS_BACKEND,
+        "estado_tokens",
+        max_entradas=config.CACHE_TOKENS_MAX_ENTRADAS
+    )
+    return CacheJSON(almacen, ttl=config.CACHE_TOKENS_TTL_SEG, nombre="estado_tokens")
+
+
+@lru_cache()
+def obtener_almacen_verifiers() -> AlmacenConRespaldo:
+    """Verifiers PKCE de OAuth: compartidos entre workers, con TTL y tope de entradas"""
+    config = obtener_configuracion()
+    respaldo = AlmacenMemoria(max_entradas=config.VERIFIERS_MAX_ENTRADAS)
+    try:
+        principal = crear_almacen(config.VERIFIERS_BACKEND, "verifiers_oauth", max_entradas=config.VERIFIERS_MAX_ENTRADAS)
+    except Exception as e:
+        logger.warning(f"⚠️ Almacén de verifiers no disponible, solo memoria: {e}")
+        principal = None
+    return AlmacenConRespaldo(principal, respaldo, nombre="verifiers_oauth")
+
+
+@lru_cache()
+def obtener_cache_imagenes() -> CacheImagenes:
+    config = obtener_configuracion()
+    return CacheImagenes(config.CACHE_IMAGENES_DIR, max_bytes=config.CACHE_IMAGENES_MAX_MB * 1024 * 1024)
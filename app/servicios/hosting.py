@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from app.config.configuracion import obtener_configuracion
+from app.servicios.cache import CacheJSON, crear_almacen
+from app.servicios.http import ClienteHTTP, obtener_cliente_http
+from app.utilidades.codificacion import cuerpo_multipart_base64
+from app.utilidades.medios import BufferMedio, DatosMedio
+
+logger = logging.getLogger(__name__)
+
+
+# ==========================================
+# 1. BACKENDS (intercambiables)
+# ==========================================
+# Cada backend implementa subir(medio, nombre) -> (url_publica, segundos_de_validez | None)
+# None significa que la URL no vence.
+
+class HostingImgBB:
+    nombre = "imgbb"
+
+    def __init__(self, api_key: str, expiracion_seg: int, http: ClienteHTTP = None):
+        self.api_key = api_key
+        self.expiracion_seg = expiracion_seg
+        self.http = http or obtener_cliente_http()
+
+    def subir(self, medio: BufferMedio, nombre: str) -> Tuple[str, Optional[float]]:
+        if not self.api_key:
+            raise Exception("Falta IMGBB_API_KEY")
+
+        # ImgBB borra la imagen sola al vencer la expiración
+        cuerpo = cuerpo_multipart_base64(
+            {"key": self.api_key, "expiration": str(self.expiracion_seg), "name": nombre},
+            "image",
+            medio.vista
+        )
+        resp = self.http.post(
+            "https://api.imgbb.com/1/upload",
+            headers=cuerpo.headers(),
+            content=cuerpo,
+            timeout=30
+        )
+        resp.raise_for_status()
+        return resp.json()["data"]["url"], self.expiracion_seg
+
+
+class HostingS3:
+    nombre = "s3"
+
+    def subir(self, medio: BufferMedio, nombre: str) -> Tuple[str, Optional[float]]:
+        # Import diferido: boto3 solo hace falta si se elige este backend
+        from app.servicios.aws_s3 import obtener_gestor_s3
+
+        return obtener_gestor_s3().subir_buffer(medio, f"medios/{nombre}", medio.tipo_mime), None
+
+
+class HostingLocal:
+    """Para desarrollo: copia el archivo a la carpeta estática /outputs del propio servidor"""
+    nombre = "local"
+
+    def __init__(self, directorio: str, url_base: str):
+        self.directorio = directorio
+        self.url_base = url_base.rstrip("/")
+        os.makedirs(directorio, exist_ok=True)
+
+    def subir(self, medio: BufferMedio, nombre: str) -> Tuple[str, Optional[float]]:
+        ruta = os.path.join(self.directorio, nombre)
+        if not os.path.exists(ruta):
+            temporal = f"{ruta}.{threading.get_ident()}.tmp"
+            with open(temporal, "wb") as archivo:
+                archivo.write(medio.vista)
+            os.replace(temporal, ruta)
+        return f"{self.url_base}/{self.directorio.strip('/')}/{nombre}", None
+
+
+# ==========================================
+# 2. SERVICIO: UNA SUBIDA POR CONTENIDO
+# ==========================================
+class ServicioHosting:
+    """
+    Entrega una URL pública para un medio, subiéndolo como máximo una vez.
+
+    La clave es el sha256 del contenido: si Instagram y LinkedIn publican la
+    misma imagen (aunque sea en paralelo) solo uno sube y el otro espera y
+    reutiliza la URL, que queda en caché mientras siga vigente (menos un margen).
+    """
+
+    def __init__(self, backend, cache: CacheJSON, margen_seg: float, ttl_sin_vencimiento: float):
+        self.backend = backend
+        self.cache = cache
+        self.margen_seg = margen_seg
+        self.ttl_sin_vencimiento = ttl_sin_vencimiento
+        self.subidas = 0
+        # Locks por franjas: acotados, y dos claves distintas casi nunca se bloquean entre sí
+        self._locks = [threading.Lock() for _ in range(64)]
+
+    def obtener_url(self, dato: DatosMedio) -> str:
+        medio = dato if isinstance(dato, BufferMedio) else BufferMedio(dato, "upload")
+        clave = f"{self.backend.nombre}:{medio.huella}"
+
+        guardado = self.cache.obtener(clave)
+        if guardado:
+            return guardado["url"]
+
+        with self._locks[int(medio.huella[:8], 16) % len(self._locks)]:
+            # Otro hilo pudo subirlo mientras esperábamos
+            guardado = self.cache.obtener(clave)
+            if guardado:
+                return guardado["url"]
+
+            logger.info(f"🌐 Subiendo medio a hosting ({self.backend.nombre})...")
+            url, validez = self.backend.subir(medio, self._nombre_destino(medio))
+            self.subidas += 1
+
+            ttl = self.ttl_sin_vencimiento if validez is None else validez - self.margen_seg
+            if ttl > 0:
+                self.cache.guardar(clave, {"url": url}, ttl=ttl)
+
+            logger.info(f"✅ URL pública generada: {url}")
+            return url
+
+    def estadisticas(self) -> Dict[str, Any]:
+        return {"backend": self.backend.nombre, "subidas": self.subidas, **self.cache.estadisticas()}
+
+    @staticmethod
+    def _nombre_destino(medio: BufferMedio) -> str:
+        extension = os.path.splitext(medio.nombre)[1].lower()
+        return f"{medio.huella[:32]}{extension}"
+
+
+@lru_cache()
+def obtener_servicio_hosting() -> ServicioHosting:
+    config = obtener_configuracion()
+
+    if config.HOSTING_BACKEND == "imgbb":
+        backend = HostingImgBB(config.IMGBB_API_KEY, config.HOSTING_EXPIRACION_SEG)
+    elif config.HOSTING_BACKEND == "s3":
+        backend = HostingS3()
+    elif config.HOSTING_BACKEND == "local":
+        backend = HostingLocal(config.HOSTING_LOCAL_DIR, config.URL_PUBLICA_BASE)
+    else:
+        raise ValueError(f"Backend de hosting desconocido: {config.HOSTING_BACKEND}")
+
+    almacen = crear_almacen(config.HOSTING_CACHE_BACKEND, "hosting", max_entradas=config.HOSTING_CACHE_MAX)
+    cache = CacheJSON(almacen, ttl=config.HOSTING_TTL_SEG, nombre="hosting")
+    return ServicioHosting(
+        backend,
+        cache,
+        margen_seg=config.HOSTING_MARGEN_SEG,
+        ttl_sin_vencimiento=config.HOSTING_TTL_SEG
+    )
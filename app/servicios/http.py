@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config.configuracion import obtener_configuracion
+
+logger = logging.getLogger(__name__)
+
+
+class _MetricasHost:
+    def __init__(self, limite: int):
+        self.limite = limite
+        self.en_uso = 0
+        self.pico = 0
+        self.peticiones = 0
+        self.errores = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.semaforo_sync = threading.BoundedSemaphore(limite)
+        self.semaforo_async = None  # se crea dentro del event loop la primera vez
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {
+            "en_uso": self.en_uso,
+            "limite": self.limite,
+            "pico": self.pico,
+            "peticiones": self.peticiones,
+            "errores": self.errores,
+            "timeouts": self.timeouts,
+            "espera_promedio_ms": round(self.espera_total * 1000 / self.peticiones, 2) if self.peticiones else 0.0
+        }
+
+
+class ClienteHTTP:
+    """
+    Pool HTTP compartido (httpx con keep-alive) para todos los adaptadores.
+
+    - 'sync' y 'asincrono' usan los mismos límites de conexiones.
+    - Cada host tiene un tope de peticiones simultáneas (max_por_host);
+      si se llena, la petición espera su turno y esa espera se mide.
+    - estadisticas() reporta uso del pool por host.
+    """
+
+    def __init__(
+        self,
+        max_conexiones: int = 100,
+        max_keepalive: int = 20,
+        max_por_host: int = 10,
+        timeout: float = 60.0
+    ):
+        limites = httpx.Limits(max_connections=max_conexiones, max_keepalive_connections=max_keepalive)
+        self.max_conexiones = max_conexiones
+        self.max_por_host = max_por_host
+
+        # follow_redirects: requests seguía redirecciones por defecto, mantenemos ese comportamiento
+        self.sync = httpx.Client(limits=limites, timeout=timeout, follow_redirects=True)
+        self.asincrono = httpx.AsyncClient(limits=limites, timeout=timeout, follow_redirects=True)
+
+        self._hosts: Dict[str, _MetricasHost] = {}
+        self._lock = threading.Lock()
+
+    # ==================== API SÍNCRONA ====================
+
+    def request(self, metodo: str, url: str, **kwargs) -> httpx.Response:
+        with self._turno_sync(url):
+            return self.sync.request(metodo, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("PUT", url, **kwargs)
+
+    # ==================== API ASÍNCRONA ====================
+
+    async def request_async(self, metodo: str, url: str, **kwargs) -> httpx.Response:
+        async with self._turno_async(url):
+            return await self.asincrono.request(metodo, url, **kwargs)
+
+    async def get_async(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request_async("GET", url, **kwargs)
+
+    async def post_async(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request_async("POST", url, **kwargs)
+
+    # ==================== MÉTRICAS ====================
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            por_host = {host: m.como_dict() for host, m in self._hosts.items()}
+        en_uso = sum(h["en_uso"] for h in por_host.values())
+        return {
+            "max_conexiones": self.max_conexiones,
+            "max_por_host": self.max_por_host,
+            "en_uso": en_uso,
+            "utilizacion": round(en_uso / self.max_conexiones, 3) if self.max_conexiones else 0.0,
+            "por_host": por_host
+        }
+
+    # ==================== INTERNOS ====================
+
+    def _metricas(self, url: str) -> _MetricasHost:
+        host = urlsplit(str(url)).netloc
+        with self._lock:
+            metricas = self._hosts.get(host)
+            if metricas is None:
+                metricas = _MetricasHost(self.max_por_host)
+                self._hosts[host] = metricas
+            return metricas
+
+    def _entrar(self, metricas: _MetricasHost, espera: float) -> None:
+        with self._lock:
+            metricas.en_uso += 1
+            metricas.pico = max(metricas.pico, metricas.en_uso)
+            metricas.peticiones += 1
+            metricas.espera_total += espera
+
+    def _salir(self, metricas: _MetricasHost, error: Optional[Exception]) -> None:
+        with self._lock:
+            metricas.en_uso -= 1
+            if error is not None:
+                metricas.errores += 1
+                if isinstance(error, httpx.TimeoutException):
+                    metricas.timeouts += 1
+
+    @contextmanager
+    def _turno_sync(self, url: str):
+        metricas = self._metricas(url)
+        t0 = time.perf_counter()
+        metricas.semaforo_sync.acquire()
+        self._entrar(metricas, time.perf_counter() - t0)
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._salir(metricas, error)
+            metricas.semaforo_sync.release()
+
+    @asynccontextmanager
+    async def _turno_async(self, url: str):
+        metricas = self._metricas(url)
+        if metricas.semaforo_async is None:
+            metricas.semaforo_async = asyncio.Semaphore(metricas.limite)
+        t0 = time.perf_counter()
+        async with metricas.semaforo_async:
+            self._entrar(metricas, time.perf_counter() - t0)
+            error = None
+            try:
+                yield
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                self._salir(metricas, error)
+
+
+@lru_cache()
+def obtener_cliente_http() -> ClienteHTTP:
+    config = obtener_configuracion()
+    logger.info("🌐 Pool HTTP compartido inicializado")
+    return ClienteHTTP(
+        max_conexiones=config.HTTP_MAX_CONEXIONES,
+        max_keepalive=config.HTTP_MAX_KEEPALIVE,
+        max_por_host=config.HTTP_MAX_POR_HOST,
+        timeout=config.HTTP_TIMEOUT_SEG
+    )
@@ -1,18 +1,94 @@
 import json
 import logging
 from openai import OpenAI
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable, Optional
 from functools import lru_cache
 import os
 import base64
 import time
-import requests
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 
 from app.config.configuracion import obtener_configuracion
-from app.utilidades.prompt import obtener_prompt
+from app.utilidades.prompt import obtener_prompt, version_prompt
+from app.servicios.cache import CacheGeneraciones, obtener_cache_generaciones, obtener_cache_imagenes, obtener_cache_resultados
+from app.servicios.sora import PollerVideos
+from app.servicios.http import obtener_cliente_http
 
 logger = logging.getLogger(__name__)
 
+REDES_VALIDAS = ["facebook", "instagram", "linkedin", "tiktok", "whatsapp"]
+REDES_CON_IMAGEN = ["facebook", "instagram", "whatsapp", "linkedin"]
+
+
+# ==================== HELPERS COMPARTIDOS (sync y async) ====================
+
+def validar_redes(target_networks: List[str]) -> None:
+    redes_invalidas = [red for red in target_networks if red not in REDES_VALIDAS]
+    
+    if redes_invalidas:
+        raise ValueError(f"Redes inválidas: {redes_invalidas}")
+    
+    if not target_networks:
+        raise ValueError("Especifica al menos una red social")
+
+
+def construir_mensajes(contenido: str, redes_sociales: List[str]) -> List[Dict[str, str]]:
+    mensaje_usuario = f"""Contenido: {contenido}
+Redes sociales: {', '.join(redes_sociales)}
+
+Genera contenido optimizado para cada red social solicitada."""
+    
+    return [
+        {"role": "system", "content": obtener_prompt()},
+        {"role": "user", "content": mensaje_usuario}
+    ]
+
+
+def clave_cache_texto(contenido: str, redes_sociales: List[str], modelo: str) -> str:
+    return CacheGeneraciones.clave(contenido, redes_sociales, modelo, version_prompt())
+
+
+def prompt_imagen_red(red: str, data_red: Dict[str, Any]) -> Optional[str]:
+    # 1. Intentamos obtener el prompt sugerido por la IA
+    prompt_imagen = data_red.get("suggested_image_prompt")
+    
+    # 2. FALLBACK: Si la IA olvidó el prompt, usamos el texto del post (cortado a 300 chars)
+    if not prompt_imagen:
+        texto_post = data_red.get("text", "")
+        if texto_post:
+            prompt_imagen = f"A professional photorealistic image representing: {texto_post[:300]}"
+            logger.warning(f"⚠️ IA no dio prompt para {red}, usando texto como fallback.")
+    
+    return prompt_imagen
+
+
+def ruta_imagen_red(user_id: str, red: str) -> str:
+    """Archivo propio de la imagen de una red (el que queda en el historial)"""
+    nombre_archivo = f"{user_id}_{red}_{int(time.time())}_{uuid.uuid4().hex[:8]}.png"
+    return os.path.join("outputs", nombre_archivo)
+
+
+def parametros_imagen(modelo: str, prompt: str, size: str) -> Dict[str, Any]:
+    # NOTA: En tu JS comentaste que 'response_format' daba error con gpt-image-1,
+    # pero el modelo suele devolver b64 por defecto.
+    # Aquí lo hacemos dinámico: si es gpt-4 o dall-e-3 estándar, pedimos b64.
+    # Si es tu modelo custom, dejamos que la API decida y nosotros parseamos la respuesta.
+    params = {
+        "model": modelo,
+        "prompt": prompt,
+        "size": size,
+        "n": 1,
+    }
+
+    # Si NO es tu modelo custom raro, forzamos b64 para asegurar (DALL-E 3 lo requiere)
+    if "gpt-image-1" not in modelo:
+        params["response_format"] = "b64_json"
+    
+    return params
+
+
 class ServicioIA:
     
     _instancia = None
@@ -29,10 +105,19 @@ class ServicioIA:
         
         config = obtener_configuracion()
         self.client = OpenAI(api_key=config.OPENAI_API_KEY)
+        self.http = obtener_cliente_http()
         self.modelo_texto = config.MODELO_TEXTO
         self.modelo_imagen = config.MODELO_IMAGEN
         self.modelo_video = config.MODELO_VIDEO
-        self.cache_contenido: Dict[str, Dict[str, Any]] = {}
+        self.max_hilos_medios = config.MAX_HILOS_MEDIOS
+        self.timeout_video = config.TIMEOUT_VIDEO_SEG
+        self.poller_videos = PollerVideos(
+            self.client,
+            intervalo_min=config.SORA_POLL_MIN_SEG,
+            intervalo_max=config.SORA_POLL_MAX_SEG
+        )
+        # Última generación por usuario (acotada y con TTL); /publicar la reutiliza
+        self.cache_contenido = obtener_cache_resultados()
         self._inicializado = True
         
         logger.info(f" Servicio IA inicializado")
@@ -41,111 +126,132 @@ class ServicioIA:
         self,
         user_id: str,
         contenido: str,
-        target_networks: List[str]
+        target_networks: List[str],
+        al_avanzar: Optional[Callable[[str, Dict[str, Any], str, Optional[str]], None]] = None,
+        no_cache: bool = False
     ) -> Dict[str, Any]:
+        """
+        al_avanzar(red, data_red, estado, detalle) es opcional y se llama cuando
+        una red tiene su texto listo ("texto_listo") y cuando termina su recurso
+        visual ("completado" o "error").
+        no_cache=True ignora la caché de texto y fuerza una llamada al modelo.
+        Las rutas (incluido el modo asíncrono de /generar) usan ServicioIAAsync:
+        aquí cada video tiene un hilo esperando hasta TIMEOUT_VIDEO_SEG.
+        """
         
-        redes_validas = ["facebook", "instagram", "linkedin", "tiktok", "whatsapp"]
-        redes_invalidas = [red for red in target_networks if red not in redes_validas]
-        
-        if redes_invalidas:
-            raise ValueError(f"Redes inválidas: {redes_invalidas}")
-        
-        if not target_networks:
-            raise ValueError("Especifica al menos una red social")
+        validar_redes(target_networks)
         
         logger.info(f" Generando contenido para: {', '.join(target_networks)}")
         
         # PASO 1: Generar texto, hashtags y prompts
-        contenido_texto = self._generar_texto(contenido, target_networks)
+        contenido_texto = self._generar_texto(contenido, target_networks, usar_cache=not no_cache)
         
         # PASO 2: Generar recursos visuales según la red
-        resultado_final = {}
+        # Cada red trabaja sobre su propia copia, así los hilos no comparten estado
+        resultado_final = {
+            red: contenido_texto[red].copy()
+            for red in target_networks
+            if red in contenido_texto
+        }
+        
+        if al_avanzar:
+            for red, data_red in resultado_final.items():
+                al_avanzar(red, data_red, "texto_listo", None)
         
         # Crear carpeta outputs si no existe
         os.makedirs("outputs", exist_ok=True)
 
-        for red in target_networks:
-            if red not in contenido_texto:
-                continue
-            
-            data_red = contenido_texto[red].copy()
-            
-            # === GENERACIÓN DE IMAGEN (Facebook, Instagram, LinkedIn, WhatsApp) ===
-            if red in ["facebook", "instagram", "whatsapp", "linkedin"]:
-                # 1. Intentamos obtener el prompt sugerido por la IA
-                prompt_imagen = data_red.get("suggested_image_prompt")
-                
-                # 2. FALLBACK: Si la IA olvidó el prompt, usamos el texto del post (cortado a 300 chars)
-                if not prompt_imagen:
-                    texto_post = data_red.get("text", "")
-                    if texto_post:
-                        prompt_imagen = f"A professional photorealistic image representing: {texto_post[:300]}"
-                        logger.warning(f"⚠️ IA no dio prompt para {red}, usando texto como fallback.")
-
-                # 3. Solo si tenemos prompt (que ahora casi siempre tendremos), generamos
-                if prompt_imagen:
-                    try:
-                        logger.info(f"🎨 Generando imagen para {red}...")
-                        
-                        imagen_bytes = self.generar_imagen(prompt_imagen)
-                        
-                        if imagen_bytes:
-                            timestamp = int(time.time())
-                            # Usamos os.path.join para evitar problemas de slash en Windows
-                            nombre_archivo = f"{user_id}_{red}_{timestamp}.png"
-                            ruta_archivo = os.path.join("outputs", nombre_archivo)
-                            
-                            with open(ruta_archivo, "wb") as f:
-                                f.write(imagen_bytes)
-                                
-                            data_red["image_path"] = ruta_archivo
-                            logger.info(f"✅ Imagen guardada en: {ruta_archivo}")
-                        else:
-                            logger.error(f"❌ La IA no retornó datos válidos para {red}.")
-
-                    except Exception as e:
-                        logger.error(f"❌ Error generando imagen {red}: {str(e)}")
-            
-            # Generar video para TikTok
-            if red == "tiktok":
-                video_hook = data_red.get("video_hook")
-                if video_hook:
-                    try:
-                        logger.info(f" Generando video para TikTok...")
-                        video_path = f"outputs/{user_id}_tiktok_video.mp4"
-                        self.generar_video(video_hook, duracion=4, ruta_salida=video_path)
-                        data_red["video_path"] = video_path
-                        logger.info(" Video generado")
-                    except Exception as e:
-                        logger.error(f" Error generando video: {str(e)}")
-            
-            resultado_final[red] = data_red
+        # Imágenes y video se generan en paralelo: la llamada tarda lo que el recurso más lento
+        if resultado_final:
+            hilos = min(self.max_hilos_medios, len(resultado_final))
+            with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="medios-ia") as pool:
+                futuros = {
+                    pool.submit(self._generar_recurso_red, user_id, red, data_red): red
+                    for red, data_red in resultado_final.items()
+                }
+                for futuro in as_completed(futuros):
+                    red = futuros[futuro]
+                    error = futuro.result()
+                    if al_avanzar:
+                        estado = "error" if error else "completado"
+                        al_avanzar(red, resultado_final[red], estado, error)
         
         # Guardar en caché
-        self.cache_contenido[user_id] = resultado_final
+        self.cache_contenido.guardar_usuario(user_id, resultado_final)
         
         logger.info(f" Contenido completo generado y guardado en caché")
         
         return resultado_final
     
+    def _generar_recurso_red(
+        self,
+        user_id: str,
+        red: str,
+        data_red: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        Genera la imagen o el video de una red y anota la ruta en data_red.
+        Los errores se registran por red y no cortan a las demás.
+        Retorna el mensaje de error de esa red, o None si todo salió bien.
+        """
+        # === GENERACIÓN DE IMAGEN (Facebook, Instagram, LinkedIn, WhatsApp) ===
+        if red in REDES_CON_IMAGEN:
+            prompt_imagen = prompt_imagen_red(red, data_red)
+
+            # Solo si tenemos prompt (que ahora casi siempre tendremos), generamos
+            if prompt_imagen:
+                try:
+                    logger.info(f"🎨 Generando imagen para {red}...")
+                    
+                    ruta_archivo = self.generar_imagen_en_disco(prompt_imagen, destino=ruta_imagen_red(user_id, red))
+                    
+                    if ruta_archivo:
+                        data_red["image_path"] = ruta_archivo
+                        logger.info(f"✅ Imagen guardada en: {ruta_archivo}")
+                    else:
+                        logger.error(f"❌ La IA no retornó datos válidos para {red}.")
+                        return "La IA no retornó una imagen válida"
+
+                except Exception as e:
+                    logger.error(f"❌ Error generando imagen {red}: {str(e)}")
+                    return f"Error generando imagen: {str(e)}"
+        
+        # Generar video para TikTok
+        if red == "tiktok":
+            video_hook = data_red.get("video_hook")
+            if video_hook:
+                try:
+                    logger.info(f" Generando video para TikTok...")
+                    video_path = f"outputs/{user_id}_tiktok_video.mp4"
+                    if not self.generar_video(video_hook, duracion=4, ruta_salida=video_path):
+                        return "No se pudo generar el video"
+                    data_red["video_path"] = video_path
+                    logger.info(" Video generado")
+                except Exception as e:
+                    logger.error(f" Error generando video: {str(e)}")
+                    return f"Error generando video: {str(e)}"
+        
+        return None
+    
     def _generar_texto(
         self,
         contenido: str,
-        redes_sociales: List[str]
+        redes_sociales: List[str],
+        usar_cache: bool = True
     ) -> Dict[str, Any]:
         
-        mensaje_usuario = f"""Contenido: {contenido}
-Redes sociales: {', '.join(redes_sociales)}
-
-Genera contenido optimizado para cada red social solicitada."""
+        # Reintentos con el mismo contenido y redes no vuelven a llamar al modelo
+        cache = obtener_cache_generaciones()
+        clave = clave_cache_texto(contenido, redes_sociales, self.modelo_texto)
+        if usar_cache:
+            guardado = cache.obtener(clave)
+            if guardado is not None:
+                return guardado
         
         try:
             respuesta = self.client.chat.completions.create(
                 model=self.modelo_texto,
-                messages=[
-                    {"role": "system", "content": obtener_prompt()},
-                    {"role": "user", "content": mensaje_usuario}
-                ],
+                messages=construir_mensajes(contenido, redes_sociales),
                 response_format={"type": "json_object"},
                 temperature=0.7,
                 max_tokens=3000,
@@ -153,6 +259,7 @@ Genera contenido optimizado para cada red social solicitada."""
             )
             
             contenido_generado = json.loads(respuesta.choices[0].message.content)
+            cache.guardar(clave, contenido_generado)
             
             return contenido_generado
             
@@ -163,6 +270,31 @@ Genera contenido optimizado para cada red social solicitada."""
             logger.error(f" Error al generar contenido: {str(e)}")
             raise ValueError(f"Error al generar contenido: {str(e)}")
     
+    def generar_imagen_en_disco(
+        self,
+        prompt: str,
+        size: str = "1024x1024",
+        destino: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Retorna la ruta del PNG para este prompt. Si ya se generó antes con el
+        mismo modelo y tamaño, reutiliza el archivo y no se llama a OpenAI.
+        Con 'destino' la imagen se exporta ahí (la caché puede desalojar la suya).
+        """
+        cache = obtener_cache_imagenes()
+        ruta = cache.obtener(self.modelo_imagen, size, prompt)
+        if ruta:
+            try:
+                return cache.exportar(ruta, destino) if destino else ruta
+            except FileNotFoundError:
+                pass  # otro worker la desalojó recién: se genera de nuevo
+        
+        imagen_bytes = self.generar_imagen(prompt, size)
+        if not imagen_bytes:
+            return None
+        ruta = cache.guardar(self.modelo_imagen, size, prompt, imagen_bytes)
+        return cache.exportar(ruta, destino) if destino else ruta
+    
     def generar_imagen(
         self,
         prompt: str,
@@ -177,22 +309,7 @@ Genera contenido optimizado para cada red social solicitada."""
         try:
             logger.info(f" Generando imagen con modelo: {self.modelo_imagen}")
             
-            # Configuración de parámetros
-            # NOTA: En tu JS comentaste que 'response_format' daba error con gpt-image-1,
-            # pero el modelo suele devolver b64 por defecto.
-            # Aquí lo hacemos dinámico: si es gpt-4 o dall-e-3 estándar, pedimos b64.
-            # Si es tu modelo custom, dejamos que la API decida y nosotros parseamos la respuesta.
-            
-            params = {
-                "model": self.modelo_imagen,
-                "prompt": prompt,
-                "size": size,
-                "n": 1,
-            }
-
-            # Si NO es tu modelo custom raro, forzamos b64 para asegurar (DALL-E 3 lo requiere)
-            if "gpt-image-1" not in self.modelo_imagen:
-                params["response_format"] = "b64_json"
+            params = parametros_imagen(self.modelo_imagen, prompt, size)
 
             # Llamada a OpenAI
             respuesta = self.client.images.generate(**params)
@@ -212,7 +329,7 @@ Genera contenido optimizado para cada red social solicitada."""
             
             if imagen_url:
                 logger.info(f"🔗 Imagen recibida como URL, descargando... {imagen_url[:30]}...")
-                resp_img = requests.get(imagen_url)
+                resp_img = self.http.get(imagen_url)
                 resp_img.raise_for_status()
                 logger.info("✅ Imagen descargada correctamente")
                 return resp_img.content
@@ -226,17 +343,24 @@ Genera contenido optimizado para cada red social solicitada."""
                  logger.error(f"Response raw: {e.response}")
             raise ValueError(f"Fallo generación imagen: {str(e)}")
     
+    def esperar_video(self, video_id: str) -> Future:
+        """
+        Future que se resuelve con el video terminado (completed o failed).
+        No ocupa un hilo por video: el sondeo lo hace el PollerVideos compartido.
+        """
+        return self.poller_videos.registrar(video_id)
+    
     def generar_video(
         self,
         texto: str,
         duracion: int = 4,
         ruta_salida: str = "outputs/video.mp4"
     ) -> str:
-        
-        import time
-        import os
-        import requests # Necesitaremos esto por si nos devuelve una URL
-        
+        """
+        Versión bloqueante: el hilo que llama queda esperando el Future del poller
+        durante todo el render (como mucho timeout_video). Para no ocupar hilos,
+        ServicioIAAsync.generar_video espera el mismo Future desde el event loop.
+        """
         try:
             os.makedirs(os.path.dirname(ruta_salida), exist_ok=True)
             
@@ -251,25 +375,14 @@ Genera contenido optimizado para cada red social solicitada."""
             
             logger.info(f" Trabajo creado: {video.id}")
             
-            # 2. Loop de espera
-            while video.status in ["in_progress", "queued"]:
-                video = self.client.videos.retrieve(video.id)
-                progreso = getattr(video, 'progress', 0) or 0
-
-                estado_icon = "" if video.status == "queued" else ""
-                logger.info(f"{estado_icon} [Sora] Estado: {video.status.upper()} | Progreso: {progreso}%")
-                
-                time.sleep(4)
-                
-                # Barra de progreso visual
-                largo_barra = 20
-                llenado = int((progreso / 100) * largo_barra)
-                barra = "=" * llenado + "-" * (largo_barra - llenado)
-                print(f"\rProcesando: [{barra}] {progreso:.1f}%", end="", flush=True)
-                
-                time.sleep(2)
-            
-            print() # Salto de línea
+            # 2. Espera: el poller central consulta a Sora; aquí solo esperamos el resultado
+            if video.status in ["in_progress", "queued"]:
+                try:
+                    video = self.esperar_video(video.id).result(timeout=self.timeout_video)
+                except FuturesTimeoutError:
+                    # Nadie más espera este video: que el poller deje de consultarlo
+                    self.poller_videos.cancelar(video.id)
+                    raise ValueError(f"Sora no terminó el video en {self.timeout_video}s")
             
             if video.status == "failed":
                 error_msg = getattr(video, 'error', 'Error desconocido')
@@ -291,7 +404,7 @@ Genera contenido optimizado para cada red social solicitada."""
                 url = getattr(video, 'result_url', getattr(video, 'url', None))
                 if url:
                     logger.info(f"   > Descargando desde URL: {url[:30]}...")
-                    resp = requests.get(url)
+                    resp = self.http.get(url)
                     content_bytes = resp.content
 
             # ESTRATEGIA C: Método content (El que falló antes, por si acaso)
@@ -0,0 +1,314 @@
+import asyncio
+import json
+import logging
+import os
+import base64
+from functools import lru_cache
+from typing import Dict, Any, List, Awaitable, Callable, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.config.configuracion import obtener_configuracion
+from app.servicios.http import obtener_cliente_http
+from app.servicios.cache import obtener_cache_generaciones, obtener_cache_imagenes, obtener_cache_resultados
+from app.servicios.ia import (
+    REDES_CON_IMAGEN,
+    obtener_servicio_ia,
+    validar_redes,
+    construir_mensajes,
+    clave_cache_texto,
+    prompt_imagen_red,
+    parametros_imagen,
+    ruta_imagen_red,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _escribir_archivo(ruta: str, contenido: bytes) -> None:
+    with open(ruta, "wb") as archivo:
+        archivo.write(contenido)
+
+
+class ServicioIAAsync:
+    """
+    Variante asíncrona de ServicioIA para las rutas 'async def'.
+
+    Usa AsyncOpenAI con un único pool HTTP compartido (keep-alive), así un
+    worker de uvicorn puede tener muchas generaciones en vuelo sin bloquear
+    el event loop. El sondeo de Sora lo sigue haciendo el PollerVideos del
+    servicio síncrono; aquí solo se espera su Future.
+    """
+
+    _instancia = None
+
+    def __new__(cls):
+        if cls._instancia is None:
+            cls._instancia = super().__new__(cls)
+            cls._instancia._inicializado = False
+        return cls._instancia
+
+    def __init__(self):
+        if self._inicializado:
+            return
+
+        config = obtener_configuracion()
+
+        # Pool de conexiones compartido por todas las llamadas a OpenAI
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=config.OPENAI_MAX_CONEXIONES,
+                max_keepalive_connections=config.OPENAI_MAX_KEEPALIVE
+            ),
+            timeout=httpx.Timeout(1000.0, connect=10.0)
+        )
+        self.client = AsyncOpenAI(api_key=config.OPENAI_API_KEY, http_client=self.http_client)
+        # Descargas fuera de OpenAI: mismo pool compartido que los adaptadores
+        self.http = obtener_cliente_http()
+        self.modelo_texto = config.MODELO_TEXTO
+        self.modelo_imagen = config.MODELO_IMAGEN
+        self.modelo_video = config.MODELO_VIDEO
+        self.timeout_video = config.TIMEOUT_VIDEO_SEG
+        self.cache_contenido = obtener_cache_resultados()
+        self._inicializado = True
+
+        logger.info(f" Servicio IA (async) inicializado")
+
+    async def generar_contenido_completo(
+        self,
+        user_id: str,
+        contenido: str,
+        target_networks: List[str],
+        al_avanzar: Optional[Callable[[str, Dict[str, Any], str, Optional[str]], Optional[Awaitable[None]]]] = None,
+        no_cache: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Mismo contrato que ServicioIA.generar_contenido_completo.
+        al_avanzar puede ser una corrutina (p. ej. para guardar el avance con una sesión async).
+        """
+
+        validar_redes(target_networks)
+
+        logger.info(f" Generando contenido (async) para: {', '.join(target_networks)}")
+
+        # PASO 1: Generar texto, hashtags y prompts
+        contenido_texto = await self._generar_texto(contenido, target_networks, usar_cache=not no_cache)
+
+        # PASO 2: Recursos visuales, todos a la vez sobre el mismo event loop
+        resultado_final = {
+            red: contenido_texto[red].copy()
+            for red in target_networks
+            if red in contenido_texto
+        }
+
+        async def _avisar(red: str, estado: str, detalle: Optional[str]) -> None:
+            if al_avanzar:
+                aviso = al_avanzar(red, resultado_final[red], estado, detalle)
+                if asyncio.iscoroutine(aviso):
+                    await aviso
+
+        for red in resultado_final:
+            await _avisar(red, "texto_listo", None)
+
+        os.makedirs("outputs", exist_ok=True)
+
+        async def _procesar(red: str) -> None:
+            error = await self._generar_recurso_red(user_id, red, resultado_final[red])
+            await _avisar(red, "error" if error else "completado", error)
+
+        await asyncio.gather(*(_procesar(red) for red in resultado_final))
+
+        await asyncio.to_thread(self.cache_contenido.guardar_usuario, user_id, resultado_final)
+
+        logger.info(f" Contenido completo generado (async) y guardado en caché")
+
+        return resultado_final
+
+    async def _generar_recurso_red(
+        self,
+        user_id: str,
+        red: str,
+        data_red: Dict[str, Any]
+    ) -> Optional[str]:
+        """Igual que ServicioIA._generar_recurso_red: retorna el error de la red o None"""
+        if red in REDES_CON_IMAGEN:
+            prompt_imagen = prompt_imagen_red(red, data_red)
+
+            if prompt_imagen:
+                try:
+                    logger.info(f"🎨 Generando imagen para {red}...")
+
+                    ruta_archivo = await self.generar_imagen_en_disco(prompt_imagen, destino=ruta_imagen_red(user_id, red))
+
+                    if ruta_archivo:
+                        data_red["image_path"] = ruta_archivo
+                        logger.info(f"✅ Imagen guardada en: {ruta_archivo}")
+                    else:
+                        logger.error(f"❌ La IA no retornó datos válidos para {red}.")
+                        return "La IA no retornó una imagen válida"
+
+                except Exception as e:
+                    logger.error(f"❌ Error generando imagen {red}: {str(e)}")
+                    return f"Error generando imagen: {str(e)}"
+
+        if red == "tiktok":
+            video_hook = data_red.get("video_hook")
+            if video_hook:
+                try:
+                    logger.info(f" Generando video para TikTok...")
+                    video_path = f"outputs/{user_id}_tiktok_video.mp4"
+                    if not await self.generar_video(video_hook, duracion=4, ruta_salida=video_path):
+                        return "No se pudo generar el video"
+                    data_red["video_path"] = video_path
+                    logger.info(" Video generado")
+                except Exception as e:
+                    logger.error(f" Error generando video: {str(e)}")
+                    return f"Error generando video: {str(e)}"
+
+        return None
+
+    async def _generar_texto(
+        self,
+        contenido: str,
+        redes_sociales: List[str],
+        usar_cache: bool = True
+    ) -> Dict[str, Any]:
+
+        # Misma caché persistente que la versión síncrona (archivo SQLite local)
+        cache = obtener_cache_generaciones()
+        clave = clave_cache_texto(contenido, redes_sociales, self.modelo_texto)
+        if usar_cache:
+            guardado = await asyncio.to_thread(cache.obtener, clave)
+            if guardado is not None:
+                return guardado
+
+        try:
+            respuesta = await self.client.chat.completions.create(
+                model=self.modelo_texto,
+                messages=construir_mensajes(contenido, redes_sociales),
+                response_format={"type": "json_object"},
+                temperature=0.7,
+                max_tokens=3000,
+                timeout=1000
+            )
+
+            contenido_generado = json.loads(respuesta.choices[0].message.content)
+            await asyncio.to_thread(cache.guardar, clave, contenido_generado)
+
+            return contenido_generado
+
+        except json.JSONDecodeError as e:
+            logger.error(f" Error al parsear JSON: {str(e)}")
+            raise ValueError(f"Error al parsear respuesta de IA: {str(e)}")
+        except Exception as e:
+            logger.error(f" Error al generar contenido: {str(e)}")
+            raise ValueError(f"Error al generar contenido: {str(e)}")
+
+    async def generar_imagen_en_disco(
+        self,
+        prompt: str,
+        size: str = "1024x1024",
+        destino: Optional[str] = None
+    ) -> Optional[str]:
+        """Igual que ServicioIA.generar_imagen_en_disco (misma caché en disco)"""
+        cache = obtener_cache_imagenes()
+        ruta = await asyncio.to_thread(cache.obtener, self.modelo_imagen, size, prompt)
+        if ruta:
+            try:
+                return await asyncio.to_thread(cache.exportar, ruta, destino) if destino else ruta
+            except FileNotFoundError:
+                pass  # otro worker la desalojó recién: se genera de nuevo
+
+        imagen_bytes = await self.generar_imagen(prompt, size)
+        if not imagen_bytes:
+            return None
+        ruta = await asyncio.to_thread(cache.guardar, self.modelo_imagen, size, prompt, imagen_bytes)
+        return await asyncio.to_thread(cache.exportar, ruta, destino) if destino else ruta
+
+    async def generar_imagen(
+        self,
+        prompt: str,
+        size: str = "1024x1024"
+    ) -> bytes:
+        """Igual que ServicioIA.generar_imagen: b64_json o, si no, descarga de la URL"""
+        try:
+            logger.info(f" Generando imagen con modelo: {self.modelo_imagen}")
+
+            respuesta = await self.client.images.generate(
+                **parametros_imagen(self.modelo_imagen, prompt, size)
+            )
+            data_obj = respuesta.data[0]
+
+            imagen_b64 = getattr(data_obj, 'b64_json', None)
+            if imagen_b64:
+                logger.info("✅ Imagen recibida en Base64")
+                return base64.b64decode(imagen_b64)
+
+            imagen_url = getattr(data_obj, 'url', None)
+            if imagen_url:
+                logger.info(f"🔗 Imagen recibida como URL, descargando... {imagen_url[:30]}...")
+                resp_img = await self.http.get_async(imagen_url)
+                resp_img.raise_for_status()
+                logger.info("✅ Imagen descargada correctamente")
+                return resp_img.content
+
+            raise ValueError("La API respondió, pero no se encontró ni 'b64_json' ni 'url'.")
+
+        except Exception as e:
+            logger.error(f"❌ Error crítico en generar_imagen: {str(e)}")
+            raise ValueError(f"Fallo generación imagen: {str(e)}")
+
+    async def generar_video(
+        self,
+        texto: str,
+        duracion: int = 4,
+        ruta_salida: str = "outputs/video.mp4"
+    ) -> str:
+        """Igual que ServicioIA.generar_video: retorna la ruta o "" si falla"""
+        try:
+            os.makedirs(os.path.dirname(ruta_salida), exist_ok=True)
+
+            logger.info(f" Iniciando generación de video (Sora)...")
+
+            video = await self.client.videos.create(
+                model=self.modelo_video,
+                prompt=texto,
+                seconds=str(duracion)
+            )
+
+            logger.info(f" Trabajo creado: {video.id}")
+
+            # Esperamos el Future del poller central sin ocupar ningún hilo
+            if video.status in ["in_progress", "queued"]:
+                futuro = obtener_servicio_ia().esperar_video(video.id)
+                try:
+                    video = await asyncio.wait_for(asyncio.wrap_future(futuro), timeout=self.timeout_video)
+                except asyncio.TimeoutError:
+                    # Nadie más espera este video: que el poller deje de consultarlo
+                    obtener_servicio_ia().poller_videos.cancelar(video.id)
+                    raise ValueError(f"Sora no terminó el video en {self.timeout_video}s")
+
+            if video.status == "failed":
+                error_msg = getattr(video, 'error', 'Error desconocido')
+                raise ValueError(f"Generación fallida: {error_msg}")
+
+            logger.info("⬇ Descargando video...")
+            response = await self.client.videos.download_content(video.id)
+            content_bytes = response.read() if hasattr(response, 'read') else response
+
+            if not content_bytes:
+                raise ValueError("No se pudieron obtener los bytes del video.")
+
+            await asyncio.to_thread(_escribir_archivo, ruta_salida, content_bytes)
+            logger.info(f" Video guardado exitosamente: {ruta_salida}")
+            return ruta_salida
+
+        except Exception as e:
+            logger.error(f" Error generando video: {str(e)}")
+            return ""
+
+
+@lru_cache()
+def obtener_servicio_ia_async() -> ServicioIAAsync:
+    return ServicioIAAsync()
@@ -0,0 +1,155 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ESTADOS_PENDIENTES = ["in_progress", "queued"]
+
+
+class _VideoPendiente:
+    """Lo que el poller sabe de un trabajo de Sora que aún no termina"""
+
+    def __init__(self, video_id: str, intervalo: float):
+        self.video_id = video_id
+        self.futuro: Future = Future()
+        self.intervalo = intervalo
+        self.proxima_consulta = time.monotonic() + intervalo
+        self.progreso = -1.0
+        self.errores = 0
+
+
+class PollerVideos:
+    """
+    Un único hilo que consulta TODOS los trabajos de Sora pendientes.
+
+    En vez de un time.sleep por video, cada trabajo se registra aquí y recibe
+    un Future que se resuelve con el objeto video final (completed o failed).
+    El intervalo de consulta es adaptativo: si el progreso avanza se mantiene,
+    si no avanza se alarga (backoff) hasta intervalo_max.
+    """
+
+    def __init__(
+        self,
+        client,
+        intervalo_min: float = 2.0,
+        intervalo_max: float = 20.0,
+        factor: float = 1.5,
+        max_errores: int = 5
+    ):
+        self.client = client
+        self.intervalo_min = intervalo_min
+        self.intervalo_max = intervalo_max
+        self.factor = factor
+        self.max_errores = max_errores
+
+        self._pendientes: Dict[str, _VideoPendiente] = {}
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    # ==================== API PÚBLICA ====================
+
+    def registrar(self, video_id: str) -> Future:
+        """Empieza a seguir un trabajo y retorna el Future que se resolverá al terminar"""
+        with self._lock:
+            pendiente = self._pendientes.get(video_id)
+            if pendiente is None:
+                pendiente = _VideoPendiente(video_id, self.intervalo_min)
+                self._pendientes[video_id] = pendiente
+                logger.info(f"🎬 [Sora] Siguiendo trabajo {video_id} ({len(self._pendientes)} pendientes)")
+            self._asegurar_hilo()
+
+        self._despertar.set()
+        return pendiente.futuro
+
+    def cancelar(self, video_id: str) -> None:
+        """Deja de seguir un trabajo cuyo interesado ya no espera (p. ej. se le acabó el plazo)"""
+        with self._lock:
+            pendiente = self._pendientes.pop(video_id, None)
+        if pendiente is not None:
+            pendiente.futuro.cancel()
+            logger.info(f"🛑 [Sora] Trabajo {video_id} abandonado, se deja de consultar")
+
+    def pendientes(self) -> int:
+        with self._lock:
+            return len(self._pendientes)
+
+    # ==================== HILO DE POLLING ====================
+
+    def _asegurar_hilo(self) -> None:
+        # Se llama con el lock tomado
+        if self._hilo is None or not self._hilo.is_alive():
+            self._hilo = threading.Thread(target=self._bucle, name="poller-sora", daemon=True)
+            self._hilo.start()
+
+    def _bucle(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pendientes:
+                    # Sin trabajos el hilo termina; registrar() lo vuelve a levantar
+                    self._hilo = None
+                    return
+                # Futures cancelados por quien esperaba (wait_for cancela el Future envuelto)
+                for video_id in [v for v, p in self._pendientes.items() if p.futuro.cancelled()]:
+                    del self._pendientes[video_id]
+                if not self._pendientes:
+                    continue
+                ahora = time.monotonic()
+                vencidos = [p for p in self._pendientes.values() if p.proxima_consulta <= ahora]
+
+            for pendiente in vencidos:
+                self._consultar(pendiente)
+
+            with self._lock:
+                if not self._pendientes:
+                    continue
+                siguiente = min(p.proxima_consulta for p in self._pendientes.values())
+
+            espera = max(0.0, siguiente - time.monotonic())
+            self._despertar.wait(timeout=espera)
+            self._despertar.clear()
+
+    def _consultar(self, pendiente: _VideoPendiente) -> None:
+        try:
+            video = self.client.videos.retrieve(pendiente.video_id)
+        except Exception as e:
+            pendiente.errores += 1
+            logger.warning(f"⚠️ [Sora] Error consultando {pendiente.video_id} ({pendiente.errores}/{self.max_errores}): {e}")
+            if pendiente.errores >= self.max_errores:
+                self._resolver(pendiente, error=e)
+            else:
+                self._reprogramar(pendiente, avanzo=False)
+            return
+
+        pendiente.errores = 0
+
+        if video.status not in ESTADOS_PENDIENTES:
+            logger.info(f"🏁 [Sora] Trabajo {pendiente.video_id} terminó con estado: {video.status.upper()}")
+            self._resolver(pendiente, video=video)
+            return
+
+        progreso = float(getattr(video, "progress", 0) or 0)
+        avanzo = progreso > pendiente.progreso
+        if avanzo:
+            logger.info(f"[Sora] {pendiente.video_id} | Estado: {video.status.upper()} | Progreso: {progreso:.0f}%")
+        pendiente.progreso = progreso
+        self._reprogramar(pendiente, avanzo=avanzo)
+
+    def _reprogramar(self, pendiente: _VideoPendiente, avanzo: bool) -> None:
+        if not avanzo:
+            pendiente.intervalo = min(pendiente.intervalo * self.factor, self.intervalo_max)
+        pendiente.proxima_consulta = time.monotonic() + pendiente.intervalo
+
+    def _resolver(self, pendiente: _VideoPendiente, video: Any = None, error: Exception = None) -> None:
+        with self._lock:
+            self._pendientes.pop(pendiente.video_id, None)
+
+        if pendiente.futuro.done():
+            return
+        if error is not None:
+            pendiente.futuro.set_exception(error)
+        else:
+            pendiente.futuro.set_result(video)
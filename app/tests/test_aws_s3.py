@@ -0,0 +1,71 @@
+# Ubicación: app/tests/test_aws_s3.py
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+# S3 compatible en memoria; si moto no está instalado el test se salta
+moto = pytest.importorskip("moto")
+
+import boto3
+
+from app.config.configuracion import obtener_configuracion
+from app.servicios import aws_s3
+from app.utilidades.medios import BufferMedio
+
+BUCKET = "bucket-pruebas"
+
+
+@pytest.fixture
+def gestor(monkeypatch):
+    config = obtener_configuracion()
+    monkeypatch.setattr(config, "AWS_S3_BUCKET_NAME", BUCKET)
+    monkeypatch.setattr(config, "AWS_REGION", "us-east-1")
+    monkeypatch.setattr(config, "AWS_ACCESS_KEY_ID", "prueba")
+    monkeypatch.setattr(config, "AWS_SECRET_ACCESS_KEY", "prueba")
+    # Partes de 5MB (mínimo de S3) para forzar multipart con archivos chicos
+    monkeypatch.setattr(config, "AWS_S3_MULTIPART_UMBRAL_MB", 5)
+    monkeypatch.setattr(config, "AWS_S3_PARTE_MB", 5)
+
+    with moto.mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        aws_s3.GestorS3._instancia = None
+        aws_s3.obtener_gestor_s3.cache_clear()
+        yield aws_s3.obtener_gestor_s3()
+        aws_s3.GestorS3._instancia = None
+        aws_s3.obtener_gestor_s3.cache_clear()
+
+
+# ==========================================
+# TEST 1: Singleton, buffer en memoria y tipo de contenido
+# ==========================================
+def test_subir_buffer_multipart(gestor):
+    assert aws_s3.obtener_gestor_s3() is aws_s3.GestorS3()
+
+    datos = os.urandom(11 * 1024 * 1024)
+    url = gestor.subir_buffer(BufferMedio(datos, "video.mp4"), "medios/video.mp4")
+
+    assert url.endswith(f"{BUCKET}.s3.us-east-1.amazonaws.com/medios/video.mp4")
+    objeto = gestor.s3.get_object(Bucket=BUCKET, Key="medios/video.mp4")
+    assert objeto["ContentType"] == "video/mp4"
+    assert objeto["Body"].read() == datos
+
+
+# ==========================================
+# TEST 2: Lote en paralelo, un fallo no detiene al resto
+# ==========================================
+def test_subir_lote(gestor, tmp_path):
+    archivos = []
+    for i in range(3):
+        ruta = tmp_path / f"foto_{i}.png"
+        ruta.write_bytes(b"png" * (i + 1))
+        archivos.append((str(ruta), f"lote/foto_{i}.png"))
+    archivos.append((str(tmp_path / "no_existe.png"), "lote/no_existe.png"))
+
+    resultados = gestor.subir_lote(archivos)
+
+    assert [r["status"] for r in resultados.values()] == ["ok", "ok", "ok", "error"]
+    objeto = gestor.s3.get_object(Bucket=BUCKET, Key="lote/foto_2.png")
+    assert objeto["ContentType"] == "image/png"
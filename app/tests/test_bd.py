@@ -0,0 +1,78 @@
+# Ubicación: app/tests/test_bd.py
+import logging
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError, TimeoutError as TimeoutPool
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+sys.path.append(RAIZ)
+
+from app.config import bd
+from app.config.bd import PoolMedido, URL_SQLITE_LOCAL, _MetricasPool, _url_configurada
+
+
+class _PoolPrueba(PoolMedido):
+    metricas = _MetricasPool()
+
+
+# ==========================================
+# TEST 1: Solo el pool lleno cuenta como timeout
+# ==========================================
+def test_timeouts_del_pool(tmp_path):
+    motor = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}", poolclass=_PoolPrueba,
+        pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    metricas = motor.pool.metricas
+
+    with motor.connect():
+        with pytest.raises(TimeoutPool):
+            motor.connect()
+    assert metricas.timeouts == 1
+    assert metricas.checkouts == 1
+
+    # Una BD que no responde es un error de conexión, no una espera por el pool
+    caido = create_engine(
+        "sqlite:////directorio/que/no/existe/x.db", poolclass=_PoolPrueba, pool_size=1, max_overflow=0
+    )
+    with pytest.raises(OperationalError):
+        caido.connect()
+    assert metricas.timeouts == 1
+
+
+# ==========================================
+# TEST 2: Sin DATABASE_URL: SQLite con aviso solo con ENTORNO=desarrollo
+# ==========================================
+def test_url_sin_configurar(caplog):
+    assert _url_configurada(SimpleNamespace(DATABASE_URL="postgresql://u@bd/redes", ENTORNO="produccion")) \
+        == "postgresql://u@bd/redes"
+
+    with caplog.at_level(logging.WARNING, logger=bd.logger.name):
+        assert _url_configurada(SimpleNamespace(DATABASE_URL=None, ENTORNO="desarrollo")) == URL_SQLITE_LOCAL
+    assert "DATABASE_URL no configurada" in caplog.text
+
+    with pytest.raises(RuntimeError, match="DATABASE_URL"):
+        _url_configurada(SimpleNamespace(DATABASE_URL=None, ENTORNO="produccion"))
+    # Sin ENTORNO también falla: SQLite solo si se pide desarrollo explícitamente
+    with pytest.raises(RuntimeError, match="sin definir"):
+        _url_configurada(SimpleNamespace(DATABASE_URL=None, ENTORNO=""))
+
+
+# ==========================================
+# TEST 3: El módulo de BD se importa sin las claves de OpenAI / TikTok
+# ==========================================
+def test_importar_sin_claves(tmp_path):
+    entorno = {k: v for k, v in os.environ.items() if k not in ("OPENAI_API_KEY", "TIKTOK_CLIENT_KEY")}
+    entorno.update({"PYTHONPATH": RAIZ, "DATABASE_URL": f"sqlite:///{tmp_path / 'x.db'}"})
+
+    proceso = subprocess.run(
+        [sys.executable, "-c", "import app.config.bd as bd; print(bd.engine.dialect.name)"],
+        cwd=tmp_path, env=entorno, capture_output=True, text=True
+    )
+    assert proceso.returncode == 0, proceso.stderr
+    assert proceso.stdout.strip() == "sqlite"
@@ -0,0 +1,123 @@
+# Ubicación: app/tests/test_cache.py
+import time
+
+from app.servicios.cache import (
+    AlmacenConRespaldo, AlmacenMemoria, AlmacenSQLite, CacheGeneraciones, CacheImagenes, CacheResultados
+)
+
+# ==========================================
+# TEST 1: La clave ignora espacios y orden de redes
+# ==========================================
+def test_clave_normalizada():
+    a = CacheGeneraciones.clave("Hola   mundo\n", ["tiktok", "facebook"], "gpt-4o-mini", "v1")
+    b = CacheGeneraciones.clave(" Hola mundo", ["facebook", "tiktok"], "gpt-4o-mini", "v1")
+    c = CacheGeneraciones.clave("Hola mundo", ["facebook", "tiktok"], "gpt-4o-mini", "v2")
+
+    assert a == b
+    assert a != c
+
+# ==========================================
+# TEST 2: Aciertos, fallos y TTL
+# ==========================================
+def test_cache_generaciones_ttl(tmp_path):
+    cache = CacheGeneraciones(AlmacenSQLite(str(tmp_path / "c.db")), ttl=0.2)
+
+    assert cache.obtener("k") is None
+    cache.guardar("k", {"facebook": {"text": "hola"}})
+    assert cache.obtener("k") == {"facebook": {"text": "hola"}}
+
+    time.sleep(0.3)
+    assert cache.obtener("k") is None
+
+    stats = cache.estadisticas()
+    assert stats["aciertos"] == 1
+    assert stats["fallos"] == 2
+
+# ==========================================
+# TEST 3: Desalojo LRU al superar max_entradas
+# ==========================================
+def test_almacen_desaloja_lru(tmp_path):
+    almacen = AlmacenSQLite(str(tmp_path / "c.db"), max_entradas=2)
+
+    almacen.guardar("a", "1", ttl=60)
+    almacen.guardar("b", "2", ttl=60)
+    almacen.obtener("a")  # 'a' pasa a ser la más reciente
+    almacen.guardar("c", "3", ttl=60)
+
+    assert almacen.obtener("b") is None
+    assert almacen.obtener("a") == "1"
+    assert almacen.obtener("c") == "3"
+
+# ==========================================
+# TEST 4: Imágenes: un acierto reutiliza el archivo y se limita por bytes
+# ==========================================
+def test_cache_imagenes(tmp_path):
+    cache = CacheImagenes(str(tmp_path), max_bytes=25)
+
+    assert cache.obtener("gpt-image-1", "1024x1024", "campus") is None
+    ruta = cache.guardar("gpt-image-1", "1024x1024", "campus", b"x" * 10)
+    assert cache.obtener("gpt-image-1", "1024x1024", "campus") == ruta
+    assert cache.obtener("gpt-image-1", "512x512", "campus") is None
+
+    cache.guardar("gpt-image-1", "1024x1024", "biblioteca", b"y" * 10)
+    cache.guardar("gpt-image-1", "1024x1024", "aula", b"z" * 10)
+
+    stats = cache.estadisticas()
+    assert stats["bytes"] <= 25
+    assert stats["aciertos"] == 1
+
+
+# ==========================================
+# TEST 4b: Lo exportado al historial sobrevive al desalojo
+# ==========================================
+def test_cache_imagenes_exportadas(tmp_path):
+    cache = CacheImagenes(str(tmp_path / "cache"), max_bytes=15)
+    ruta = cache.guardar("gpt-image-1", "1024x1024", "campus", b"x" * 10)
+    copia = cache.exportar(ruta, str(tmp_path / "outputs" / "1_facebook.png"))
+
+    # La segunda imagen desaloja a la primera de la caché...
+    cache.guardar("gpt-image-1", "1024x1024", "aula", b"y" * 10)
+    assert cache.obtener("gpt-image-1", "1024x1024", "campus") is None
+
+    # ...pero el historial sigue teniendo su archivo
+    with open(copia, "rb") as archivo:
+        assert archivo.read() == b"x" * 10
+
+# ==========================================
+# TEST 5: Resultados: límite por bytes en ambos backends
+# ==========================================
+def test_cache_resultados_limite_bytes(tmp_path):
+    for almacen in [AlmacenMemoria(max_entradas=10, max_bytes=200), AlmacenSQLite(str(tmp_path / "r.db"), max_entradas=10, max_bytes=200)]:
+        cache = CacheResultados(almacen, ttl=60)
+
+        cache.guardar_usuario("1", {"facebook": {"text": "a" * 120}})
+        cache.guardar_usuario("2", {"facebook": {"text": "b" * 120}})
+
+        assert cache.obtener_usuario("1") is None
+        assert cache.obtener_usuario("2")["facebook"]["text"] == "b" * 120
+        assert cache.estadisticas()["bytes"] <= 200
+
+# ==========================================
+# TEST 6: Verifiers: compartidos entre workers, con TTL y respaldo en memoria
+# ==========================================
+def test_almacen_con_respaldo(tmp_path):
+    ruta = str(tmp_path / "verifiers.db")
+    # Dos workers: cada uno abre su conexión al mismo archivo
+    worker_a = AlmacenConRespaldo(AlmacenSQLite(ruta, tabla="verifiers"), AlmacenMemoria())
+    worker_b = AlmacenConRespaldo(AlmacenSQLite(ruta, tabla="verifiers"), AlmacenMemoria())
+
+    worker_a.guardar("7:tiktok", "verifier-7", ttl=0.2)
+    assert worker_b.obtener("7:tiktok") == "verifier-7"
+    time.sleep(0.25)
+    assert worker_b.obtener("7:tiktok") is None
+
+    class _Roto:
+        def obtener(self, *args):
+            raise OSError("disco lleno")
+        guardar = eliminar = obtener
+
+    sin_archivo = AlmacenConRespaldo(_Roto(), AlmacenMemoria())
+    sin_archivo.guardar("8:tiktok", "verifier-8", ttl=60)
+    assert sin_archivo.obtener("8:tiktok") == "verifier-8"
+    sin_archivo.eliminar("8:tiktok")
+    assert sin_archivo.obtener("8:tiktok") is None
@@ -0,0 +1,48 @@
+# Ubicación: app/tests/test_codificacion.py
+import base64
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.utilidades.codificacion import (
+    CHUNK_BASE64,
+    cuerpo_json_data_uri,
+    cuerpo_multipart_base64,
+)
+
+
+# ==========================================
+# TEST 1: Data URI en JSON, idéntico al armado en memoria
+# ==========================================
+def test_cuerpo_json_data_uri():
+    imagen = os.urandom(CHUNK_BASE64 * 2 + 7)  # varios tramos y relleno al final
+    extras = {"caption": 'Hola "mundo" ñ', "contacts": ["591"]}
+
+    cuerpo = cuerpo_json_data_uri("media", memoryview(imagen), "image/png", "foto.png", extras)
+    enviado = b"".join(cuerpo)
+
+    esperado = {
+        "media": "data:image/png;name=foto.png;base64," + base64.b64encode(imagen).decode(),
+        **extras
+    }
+    assert json.loads(enviado) == esperado
+    assert cuerpo.longitud == len(enviado)
+    # Se puede volver a iterar (reintentos del cliente HTTP)
+    assert b"".join(cuerpo) == enviado
+    # Ningún tramo supera el tamaño de un chunk codificado
+    assert max(len(parte) for parte in cuerpo) <= CHUNK_BASE64 * 4 // 3
+
+
+# ==========================================
+# TEST 2: multipart con el base64 como campo de texto
+# ==========================================
+def test_cuerpo_multipart_base64():
+    imagen = b"\x00\xff" * 1000
+    cuerpo = cuerpo_multipart_base64({"key": "abc"}, "image", memoryview(imagen))
+    enviado = b"".join(cuerpo)
+
+    assert cuerpo.headers()["Content-Length"] == str(len(enviado))
+    assert b'name="key"\r\n\r\nabc\r\n' in enviado
+    assert base64.b64encode(imagen) in enviado
@@ -1,7 +1,7 @@
 # Ubicación: app/tests/test_contenido.py
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
 import io
 import sys
 import os
@@ -31,7 +31,7 @@ client = TestClient(app)
 # ==========================================
 # TEST 1: Generar Contenido (Mock IA)
 # ==========================================
-@patch("app.servicios.ia.ServicioIA.generar_contenido_completo")
+@patch("app.servicios.ia_async.ServicioIAAsync.generar_contenido_completo", new_callable=AsyncMock)
 def test_generar_contenido_exitoso(mock_ia):
     mock_ia.return_value = {
         "whatsapp": {
@@ -108,7 +108,7 @@ def test_publicar_tiktok_ok(mock_tiene, mock_get, mock_pub):
 # ==========================================
 # TEST 5: Error Interno (CORREGIDO)
 # ==========================================
-@patch("app.servicios.ia.ServicioIA.generar_contenido_completo")
+@patch("app.servicios.ia_async.ServicioIAAsync.generar_contenido_completo", new_callable=AsyncMock)
 def test_error_interno(mock_ia):
     # Simulamos que la IA se rompe
     mock_ia.side_effect = Exception("Crash")
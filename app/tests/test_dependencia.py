@@ -0,0 +1,87 @@
+# Ubicación: app/tests/test_dependencia.py
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.config.bd import Base
+from app.modelos.tablas import Usuario
+from app.utilidades.dependencia import obtener_usuario_actual
+from app.utilidades.seguridad import crear_token_acceso
+
+
+@pytest.fixture
+def bd():
+    motor = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(motor)
+    consultas = []
+    event.listen(motor, "before_cursor_execute", lambda *args: consultas.append(args[2]))
+
+    sesion = sessionmaker(bind=motor)()
+    yield sesion, consultas
+    sesion.close()
+
+
+# ==========================================
+# TEST 1: La segunda petición no toca la BD
+# ==========================================
+def test_usuario_resuelto_desde_cache(bd):
+    db, consultas = bd
+    usuario = Usuario(nombre="Ana", email="ana.cache@test.com", contrasena_hash="x")
+    db.add(usuario)
+    db.commit()
+    token = crear_token_acceso({"sub": usuario.email, "uid": usuario.id})
+
+    db.expunge_all()  # que la primera resolución tenga que ir a la BD
+    consultas.clear()
+    primero = obtener_usuario_actual(token, db)
+    segundo = obtener_usuario_actual(token, db)
+
+    assert primero == segundo and primero.id == usuario.id
+    assert len(consultas) == 1
+
+
+# ==========================================
+# TEST 2: Cambios en el usuario invalidan la caché
+# ==========================================
+def test_cambio_de_usuario_invalida(bd):
+    db, _ = bd
+    usuario = Usuario(nombre="Luis", email="luis.cache@test.com", contrasena_hash="x")
+    db.add(usuario)
+    db.commit()
+    token = crear_token_acceso({"sub": usuario.email, "uid": usuario.id})
+    obtener_usuario_actual(token, db)
+
+    usuario.nombre = "Luis Alberto"
+    db.commit()
+    assert obtener_usuario_actual(token, db).nombre == "Luis Alberto"
+
+    db.delete(usuario)
+    db.commit()
+    with pytest.raises(HTTPException):
+        obtener_usuario_actual(token, db)
+
+
+# ==========================================
+# TEST 3: Un token con otro 'uid' no se resuelve desde la caché
+# ==========================================
+def test_cache_respeta_uid(bd):
+    db, _ = bd
+    usuario = Usuario(nombre="Eva", email="eva.cache@test.com", contrasena_hash="x")
+    db.add(usuario)
+    db.commit()
+    obtener_usuario_actual(crear_token_acceso({"sub": usuario.email, "uid": usuario.id}), db)
+
+    # Token viejo de otra cuenta que tuvo el mismo email
+    token_ajeno = crear_token_acceso({"sub": usuario.email, "uid": usuario.id + 100})
+    with pytest.raises(HTTPException):
+        obtener_usuario_actual(token_ajeno, db)
+
+    # Tokens antiguos sin 'uid' siguen entrando por email
+    assert obtener_usuario_actual(crear_token_acceso({"sub": usuario.email}), db).id == usuario.id
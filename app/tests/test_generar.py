@@ -0,0 +1,182 @@
+# Ubicación: app/tests/test_generar.py
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from main import app
+from app.config.bd import Base, obtener_bd, obtener_bd_async
+from app.rutas import contenido
+from app.modelos.tablas import Chat, Mensaje, TrabajoGeneracion, Usuario
+from app.utilidades.dependencia import UsuarioActual, obtener_usuario_actual
+
+
+@pytest.fixture
+def entorno():
+    motor = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    sesiones = async_sessionmaker(motor, expire_on_commit=False)
+    commits = []
+    event.listen(motor.sync_engine, "commit", lambda conexion: commits.append(1))
+
+    async def preparar():
+        async with motor.begin() as conexion:
+            await conexion.run_sync(Base.metadata.create_all)
+        async with sesiones() as db:
+            db.add(Usuario(id=1, nombre="Ana", email="ana@correo.com", contrasena_hash="x"))
+            await db.commit()
+        commits.clear()
+
+    async def bd_pruebas():
+        async with sesiones() as db:
+            yield db
+
+    async def contar(modelo):
+        async with sesiones() as db:
+            return await db.scalar(select(func.count()).select_from(modelo))
+
+    asyncio.run(preparar())
+    app.dependency_overrides[obtener_bd_async] = bd_pruebas
+    app.dependency_overrides[obtener_usuario_actual] = lambda: UsuarioActual(1, "ana@correo.com", "Ana")
+    yield TestClient(app), commits, lambda modelo: asyncio.run(contar(modelo))
+    app.dependency_overrides.clear()
+    asyncio.run(motor.dispose())
+
+
+# ==========================================
+# TEST 1: Chat, prompt y respuesta se guardan con un solo commit
+# ==========================================
+@patch("app.servicios.ia_async.ServicioIAAsync.generar_contenido_completo", new_callable=AsyncMock)
+def test_generar_un_solo_commit(mock_ia, entorno):
+    cliente, commits, contar = entorno
+    mock_ia.return_value = {"facebook": {"text": "hola", "hashtags": []}}
+
+    resp = cliente.post("/generar", json={"contenido": "Lanzamiento", "target_networks": ["facebook"]})
+
+    assert resp.status_code == 200
+    assert len(commits) == 1
+    assert contar(Chat) == 1
+    assert contar(Mensaje) == 2
+
+
+# ==========================================
+# TEST 2: Si la IA falla no queda un chat a medias
+# ==========================================
+@patch("app.servicios.ia_async.ServicioIAAsync.generar_contenido_completo", new_callable=AsyncMock)
+def test_generar_fallido_no_deja_chat(mock_ia, entorno):
+    cliente, commits, contar = entorno
+    mock_ia.side_effect = Exception("OpenAI caído")
+
+    resp = cliente.post("/generar", json={"contenido": "Lanzamiento", "target_networks": ["facebook"]})
+
+    assert resp.status_code == 500
+    assert commits == []
+    assert contar(Chat) == 0
+    assert contar(Mensaje) == 0
+
+
+@pytest.fixture
+def entorno_trabajos(tmp_path, monkeypatch):
+    """Archivo SQLite compartido: la ruta y el trabajo en segundo plano usan la sesión async"""
+    ruta = tmp_path / "trabajos.db"
+    motor = create_engine(f"sqlite:///{ruta}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(motor)
+    sesiones = sessionmaker(bind=motor)
+    with sesiones() as db:
+        db.add(Usuario(id=1, nombre="Ana", email="ana@correo.com", contrasena_hash="x"))
+        db.commit()
+
+    motor_async = create_async_engine(f"sqlite+aiosqlite:///{ruta}")
+    sesiones_async = async_sessionmaker(motor_async, expire_on_commit=False)
+
+    async def bd_async():
+        async with sesiones_async() as db:
+            yield db
+
+    def bd_sync():
+        with sesiones() as db:
+            yield db
+
+    monkeypatch.setattr(contenido, "SessionLocalAsync", sesiones_async)
+    app.dependency_overrides[obtener_bd_async] = bd_async
+    app.dependency_overrides[obtener_bd] = bd_sync
+    app.dependency_overrides[obtener_usuario_actual] = lambda: UsuarioActual(1, "ana@correo.com", "Ana")
+    yield TestClient(app), sesiones
+    app.dependency_overrides.clear()
+    asyncio.run(motor_async.dispose())
+    motor.dispose()
+
+
+# ==========================================
+# TEST 3: Modo asíncrono: 202 con job_id, avance por red en el polling y chat_id al final
+# ==========================================
+def test_trabajo_asincrono_completo(entorno_trabajos):
+    cliente, sesiones = entorno_trabajos
+    sondeos = []
+
+    async def generar(user_id, contenido, target_networks, al_avanzar=None, no_cache=False):
+        data = {"facebook": {"text": "hola", "hashtags": []}, "tiktok": {"text": "video", "hashtags": []}}
+        for red in target_networks:
+            await al_avanzar(red, data[red], "texto_listo", None)
+        await al_avanzar("facebook", data["facebook"], "completado", None)
+        # Polling a mitad de camino (desde otro hilo, como otro cliente): facebook terminó, tiktok sigue
+        with sesiones() as db:
+            trabajo_id = db.query(TrabajoGeneracion.id).scalar()
+        sondeos.append((await asyncio.to_thread(cliente.get, f"/generar/{trabajo_id}")).json())
+        await al_avanzar("tiktok", data["tiktok"], "error", "Sora no respondió")
+        return data
+
+    with patch.object(contenido.servicio_ia_async, "generar_contenido_completo", side_effect=generar):
+        resp = cliente.post("/generar", json={
+            "contenido": "Lanzamiento de producto", "target_networks": ["facebook", "tiktok"], "asincrono": True
+        })
+    trabajo_id = resp.json()["job_id"]
+
+    assert resp.status_code == 202
+    assert resp.json() == {"job_id": trabajo_id, "estado": "pendiente", "chat_id": None}
+    # Corre en el event loop: no ocupa el threadpool que atiende las rutas sync
+    assert asyncio.iscoroutinefunction(contenido._procesar_trabajo_generacion)
+
+    intermedio = sondeos[0]
+    assert intermedio["estado"] == "procesando"
+    assert intermedio["chat_id"] is None
+    assert intermedio["redes"]["facebook"]["estado"] == "completado"
+    assert intermedio["redes"]["tiktok"]["estado"] == "texto_listo"
+    assert intermedio["resultado"]["facebook"]["text"] == "hola"
+
+    final = cliente.get(f"/generar/{trabajo_id}").json()
+    assert final["estado"] == "completado"
+    assert final["redes"]["tiktok"] == {"estado": "error", "detalle": "Sora no respondió"}
+    with sesiones() as db:
+        chat = db.get(Chat, final["chat_id"])
+        assert [m.rol for m in chat.mensajes] == ["user", "assistant"]
+
+
+# ==========================================
+# TEST 4: Si la generación falla el trabajo queda en error y sin chat
+# ==========================================
+def test_trabajo_asincrono_fallido(entorno_trabajos):
+    cliente, sesiones = entorno_trabajos
+
+    with patch.object(
+        contenido.servicio_ia_async, "generar_contenido_completo",
+        new_callable=AsyncMock, side_effect=Exception("OpenAI caído")
+    ):
+        resp = cliente.post("/generar", json={
+            "contenido": "Lanzamiento de producto", "target_networks": ["facebook"], "asincrono": True
+        })
+
+    trabajo = cliente.get(f"/generar/{resp.json()['job_id']}").json()
+    assert trabajo["estado"] == "error"
+    assert trabajo["error"] == "OpenAI caído"
+    assert trabajo["chat_id"] is None
+    with sesiones() as db:
+        assert db.query(Chat).count() == 0
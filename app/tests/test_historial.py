@@ -0,0 +1,134 @@
+# Ubicación: app/tests/test_historial.py
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from main import app
+from app.config.bd import Base, obtener_bd_async
+from app.modelos.tablas import Chat, Mensaje, Usuario
+from app.repositorios import mensajes
+from app.repositorios.mensajes import GestorMensajes
+from app.utilidades.dependencia import UsuarioActual, obtener_usuario_actual
+
+
+@pytest.fixture
+def cliente():
+    motor = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    sesiones = async_sessionmaker(motor, expire_on_commit=False)
+
+    async def preparar():
+        async with motor.begin() as conexion:
+            await conexion.run_sync(Base.metadata.create_all)
+        async with sesiones() as db:
+            db.add(Usuario(id=1, nombre="Ana", email="ana@correo.com", contrasena_hash="x"))
+            base = datetime(2025, 1, 1)
+            # Dos chats con la misma fecha para probar el desempate por id
+            for i, minutos in enumerate([0, 1, 2, 2, 3], start=1):
+                db.add(Chat(id=i, usuario_id=1, titulo=f"chat {i}", fecha_creacion=base + timedelta(minutes=minutos)))
+            for i in range(1, 8):
+                db.add(Mensaje(chat_id=1, rol="user", contenido=f"mensaje {i}"))
+            await db.commit()
+
+    async def bd_pruebas():
+        async with sesiones() as db:
+            yield db
+
+    asyncio.run(preparar())
+    app.dependency_overrides[obtener_bd_async] = bd_pruebas
+    app.dependency_overrides[obtener_usuario_actual] = lambda: UsuarioActual(1, "ana@correo.com", "Ana")
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    asyncio.run(motor.dispose())
+
+
+def _recorrer(cliente, url, limite):
+    """Pide todas las páginas siguiendo X-Siguiente-Cursor"""
+    paginas, cursor = [], None
+    while True:
+        params = {"limite": limite, **({"cursor": cursor} if cursor else {})}
+        resp = cliente.get(url, params=params)
+        assert resp.status_code == 200
+        paginas.append([item["id"] for item in resp.json()])
+        cursor = resp.headers.get("X-Siguiente-Cursor")
+        if not cursor:
+            return paginas
+
+
+# ==========================================
+# TEST 1: Chats del más nuevo al más viejo, sin repetir ni saltar
+# ==========================================
+def test_paginar_chats(cliente):
+    assert _recorrer(cliente, "/historial/chats", 2) == [[5, 4], [3, 2], [1]]
+
+
+# ==========================================
+# TEST 2: Mensajes en orden de conversación
+# ==========================================
+def test_paginar_mensajes(cliente):
+    assert _recorrer(cliente, "/historial/chats/1/mensajes", 3) == [[1, 2, 3], [4, 5, 6], [7]]
+    assert cliente.get("/historial/chats/1/mensajes", params={"cursor": "basura"}).status_code == 400
+    assert cliente.get("/historial/chats/99/mensajes").status_code == 404
+
+
+# ==========================================
+# TEST 3: Respuestas de la IA como JSON, comprimidas o antiguas, con proyección
+# ==========================================
+def test_respuestas_json_y_proyeccion(cliente, monkeypatch):
+    respuesta = {
+        "facebook": {"text": "hola", "hashtags": ["a"], "media_info": {"tipo": "imagen"}},
+        "tiktok": {"text": "video", "hashtags": []}
+    }
+    grande = {"linkedin": {"text": "x" * 4000, "hashtags": ["b"]}}
+    monkeypatch.setattr(mensajes.config, "MENSAJES_COMPRIMIR_DESDE_KB", 2)
+
+    normal = GestorMensajes.nuevo_mensaje_assistant(2, respuesta, ["facebook", "tiktok"])
+    comprimido = GestorMensajes.nuevo_mensaje_assistant(2, grande, ["linkedin"])
+    assert normal.datos == respuesta and normal.datos_zlib is None
+    assert comprimido.datos is None and len(comprimido.datos_zlib) < 4000
+
+    async def guardar():
+        motor = app.dependency_overrides[obtener_bd_async]
+        async for db in motor():
+            db.add_all([
+                normal,
+                comprimido,
+                # Fila anterior a la columna JSON
+                Mensaje(chat_id=2, rol="assistant", contenido='{"whatsapp": {"text": "viejo", "hashtags": []}}')
+            ])
+            await db.commit()
+
+    asyncio.run(guardar())
+
+    completos = cliente.get("/historial/chats/2/mensajes").json()
+    assert [m["contenido"] for m in completos] == [
+        respuesta, grande, {"whatsapp": {"text": "viejo", "hashtags": []}}
+    ]
+
+    solo_texto = cliente.get("/historial/chats/2/mensajes", params={"campos": "text,media_info"}).json()
+    assert solo_texto[0]["contenido"] == {
+        "facebook": {"text": "hola", "media_info": {"tipo": "imagen"}},
+        "tiktok": {"text": "video", "media_info": None}
+    }
+    assert solo_texto[1]["contenido"] == {"linkedin": {"text": "x" * 4000, "media_info": None}}
+    assert solo_texto[2]["contenido"] == {"whatsapp": {"text": "viejo", "media_info": None}}
+
+    assert cliente.get("/historial/chats/2/mensajes", params={"campos": "contrasena"}).status_code == 400
+
+
+# ==========================================
+# TEST 4: columna_datos no arma SQL con campos fuera de la lista
+# ==========================================
+def test_columna_datos_rechaza_campos_desconocidos():
+    with pytest.raises(ValueError, match="no proyectables"):
+        GestorMensajes.columna_datos(["text", "x') FROM usuarios --"], "postgresql")
+    with pytest.raises(ValueError):
+        GestorMensajes.columna_datos(["otro"], "mysql")
+    assert GestorMensajes.columna_datos(["text", "hashtags"], "sqlite") is not Mensaje.datos
@@ -0,0 +1,85 @@
+# Ubicación: app/tests/test_hosting.py
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.servicios.cache import AlmacenMemoria, CacheJSON
+from app.config.configuracion import obtener_configuracion
+from app.servicios.hosting import ServicioHosting, obtener_servicio_hosting
+from app.utilidades.medios import BufferMedio
+
+
+class _BackendFalso:
+    nombre = "falso"
+
+    def __init__(self, validez=None):
+        self.validez = validez
+        self.subidas = []
+
+    def subir(self, medio, nombre):
+        time.sleep(0.05)  # da tiempo a que el otro hilo llegue
+        self.subidas.append(nombre)
+        return f"https://cdn/{nombre}", self.validez
+
+
+def _servicio(backend, margen=0):
+    cache = CacheJSON(AlmacenMemoria(), ttl=60, nombre="hosting")
+    return ServicioHosting(backend, cache, margen_seg=margen, ttl_sin_vencimiento=60)
+
+
+# ==========================================
+# TEST 1: Misma imagen en paralelo -> una sola subida
+# ==========================================
+def test_una_subida_por_contenido():
+    backend = _BackendFalso()
+    servicio = _servicio(backend)
+    urls = []
+
+    hilos = [
+        threading.Thread(target=lambda: urls.append(servicio.obtener_url(BufferMedio(b"foto", "a.jpg"))))
+        for _ in range(4)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert len(backend.subidas) == 1
+    assert len(set(urls)) == 1 and urls[0].endswith(".jpg")
+
+    # Otro contenido sí se sube
+    servicio.obtener_url(b"otra foto")
+    assert len(backend.subidas) == 2
+
+
+# ==========================================
+# TEST 2: URL a punto de vencer no se guarda
+# ==========================================
+def test_no_cachea_urls_sin_vigencia():
+    backend = _BackendFalso(validez=60)
+    servicio = _servicio(backend, margen=60)
+
+    servicio.obtener_url(b"foto")
+    servicio.obtener_url(b"foto")
+
+    assert len(backend.subidas) == 2
+
+
+# ==========================================
+# TEST 3: La caché de hosting tiene su propia configuración
+# ==========================================
+def test_configuracion_cache_hosting(monkeypatch):
+    config = obtener_configuracion()
+    monkeypatch.setattr(config, "HOSTING_BACKEND", "local")
+    monkeypatch.setattr(config, "HOSTING_CACHE_BACKEND", "memoria")
+    monkeypatch.setattr(config, "HOSTING_CACHE_MAX", 5)
+    obtener_servicio_hosting.cache_clear()
+    try:
+        almacen = obtener_servicio_hosting().cache.almacen
+        assert isinstance(almacen, AlmacenMemoria)
+        assert almacen.max_entradas == 5
+    finally:
+        obtener_servicio_hosting.cache_clear()
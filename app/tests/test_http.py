@@ -0,0 +1,115 @@
+# Ubicación: app/tests/test_http.py
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.servicios.http import ClienteHTTP
+
+
+class _Servidor:
+    """Transporte falso: cuenta peticiones simultáneas y falla según la ruta"""
+
+    def __init__(self):
+        self.en_curso = 0
+        self.pico = 0
+        self.lock = threading.Lock()
+
+    def _responder(self, peticion):
+        if peticion.url.path == "/caido":
+            raise httpx.ConnectError("conexión rechazada", request=peticion)
+        if peticion.url.path == "/lento":
+            raise httpx.ReadTimeout("sin respuesta", request=peticion)
+        return httpx.Response(200, json={"ok": True})
+
+    def sync(self, peticion):
+        with self.lock:
+            self.en_curso += 1
+            self.pico = max(self.pico, self.en_curso)
+        try:
+            time.sleep(0.05)
+            return self._responder(peticion)
+        finally:
+            with self.lock:
+                self.en_curso -= 1
+
+    async def asincrono(self, peticion):
+        self.en_curso += 1
+        self.pico = max(self.pico, self.en_curso)
+        try:
+            await asyncio.sleep(0.05)
+            return self._responder(peticion)
+        finally:
+            self.en_curso -= 1
+
+
+def _cliente(servidor, max_por_host=2):
+    cliente = ClienteHTTP(max_por_host=max_por_host)
+    cliente.sync = httpx.Client(transport=httpx.MockTransport(servidor.sync))
+    cliente.asincrono = httpx.AsyncClient(transport=httpx.MockTransport(servidor.asincrono))
+    return cliente
+
+
+# ==========================================
+# TEST 1: Un host no recibe más de max_por_host peticiones a la vez (sync)
+# ==========================================
+def test_tope_por_host_sync():
+    servidor = _Servidor()
+    cliente = _cliente(servidor)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda _: cliente.get("https://api.uno.com/x"), range(6)))
+
+    stats = cliente.estadisticas()["por_host"]["api.uno.com"]
+    assert servidor.pico == 2
+    assert stats["pico"] == 2
+    assert stats["peticiones"] == 6
+    assert stats["en_uso"] == 0
+    assert stats["espera_promedio_ms"] > 0
+
+
+# ==========================================
+# TEST 2: Mismo tope en la API async, y cada host tiene el suyo
+# ==========================================
+def test_tope_por_host_async():
+    servidor = _Servidor()
+    cliente = _cliente(servidor)
+
+    async def prueba():
+        urls = ["https://api.uno.com/x"] * 4 + ["https://api.dos.com/x"] * 4
+        await asyncio.gather(*(cliente.get_async(url) for url in urls))
+
+    asyncio.run(prueba())
+
+    por_host = cliente.estadisticas()["por_host"]
+    assert servidor.pico == 4  # 2 por host, los dos hosts en paralelo
+    assert por_host["api.uno.com"]["pico"] == 2
+    assert por_host["api.dos.com"]["pico"] == 2
+
+
+# ==========================================
+# TEST 3: Errores y timeouts quedan contados por host
+# ==========================================
+def test_errores_y_timeouts():
+    cliente = _cliente(_Servidor())
+
+    with pytest.raises(httpx.ConnectError):
+        cliente.get("https://api.uno.com/caido")
+    with pytest.raises(httpx.ReadTimeout):
+        cliente.post("https://api.uno.com/lento")
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(cliente.get_async("https://api.uno.com/lento"))
+    assert cliente.get("https://api.uno.com/x").status_code == 200
+
+    stats = cliente.estadisticas()["por_host"]["api.uno.com"]
+    assert stats["peticiones"] == 4
+    assert stats["errores"] == 3
+    assert stats["timeouts"] == 2
+    assert stats["en_uso"] == 0
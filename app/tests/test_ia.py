@@ -0,0 +1,85 @@
+# Ubicación: app/tests/test_ia.py
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.servicios.ia import ServicioIA
+
+
+class _CacheFalsa:
+    def __init__(self):
+        self.guardado = None
+
+    def guardar_usuario(self, user_id, resultado):
+        self.guardado = resultado
+
+
+def _servicio(generar_imagen):
+    """ServicioIA sin OpenAI: texto fijo y una función de imagen a medida"""
+    servicio = object.__new__(ServicioIA)
+    servicio.max_hilos_medios = 4
+    servicio.cache_contenido = _CacheFalsa()
+    servicio._generar_texto = lambda contenido, redes, usar_cache=True: {
+        red: {"text": f"texto {red}", "suggested_image_prompt": red} for red in redes
+    }
+    servicio.generar_imagen_en_disco = generar_imagen
+    return servicio
+
+
+# ==========================================
+# TEST 1: Las redes generan sus medios en paralelo y cada una recibe el suyo
+# ==========================================
+def test_medios_en_paralelo():
+    en_curso, pico = [0], [0]
+    lock = threading.Lock()
+
+    def imagen_lenta(prompt, destino=None):
+        with lock:
+            en_curso[0] += 1
+            pico[0] = max(pico[0], en_curso[0])
+        time.sleep(0.3)
+        with lock:
+            en_curso[0] -= 1
+        return f"outputs/{prompt}.png"
+
+    servicio = _servicio(imagen_lenta)
+    t0 = time.perf_counter()
+    resultado = servicio.generar_contenido_completo("1", "Lanzamiento", ["facebook", "instagram"])
+
+    assert time.perf_counter() - t0 < 0.55
+    assert pico[0] == 2
+    assert resultado["facebook"]["image_path"] == "outputs/facebook.png"
+    assert resultado["instagram"]["image_path"] == "outputs/instagram.png"
+    assert servicio.cache_contenido.guardado == resultado
+
+
+# ==========================================
+# TEST 2: Una red que falla no se lleva a las demás
+# ==========================================
+def test_red_fallida_no_corta_las_demas():
+    def imagen(prompt, destino=None):
+        if prompt == "linkedin":
+            raise RuntimeError("límite de cuota")
+        time.sleep(0.05)
+        return f"outputs/{prompt}.png"
+
+    avances = []
+    servicio = _servicio(imagen)
+    resultado = servicio.generar_contenido_completo(
+        "1", "Lanzamiento", ["facebook", "linkedin", "whatsapp"],
+        al_avanzar=lambda red, data, estado, detalle: avances.append((red, estado, detalle))
+    )
+
+    assert resultado["facebook"]["image_path"] == "outputs/facebook.png"
+    assert resultado["whatsapp"]["image_path"] == "outputs/whatsapp.png"
+    assert "image_path" not in resultado["linkedin"]
+    assert resultado["linkedin"]["text"] == "texto linkedin"
+
+    finales = {red: (estado, detalle) for red, estado, detalle in avances if estado != "texto_listo"}
+    assert finales["facebook"] == ("completado", None)
+    assert finales["whatsapp"] == ("completado", None)
+    assert finales["linkedin"][0] == "error"
+    assert "límite de cuota" in finales["linkedin"][1]
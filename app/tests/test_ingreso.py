@@ -0,0 +1,126 @@
+# Ubicación: app/tests/test_ingreso.py
+import asyncio
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from main import app
+from app.config.bd import Base, obtener_bd_async
+from app.modelos.esquemas import UsuarioLogin, UsuarioRegistro
+from app.rutas import ingreso
+
+
+@pytest.fixture
+def bd(tmp_path):
+    """SQLite en archivo (para poder bloquearlo desde otra conexión) con sesiones async"""
+    ruta = tmp_path / "usuarios.db"
+    motor = create_engine(f"sqlite:///{ruta}")
+    Base.metadata.create_all(motor)
+    motor.dispose()
+
+    motor_async = create_async_engine(f"sqlite+aiosqlite:///{ruta}")
+    sesiones = async_sessionmaker(motor_async, expire_on_commit=False)
+
+    async def bd_pruebas():
+        async with sesiones() as db:
+            yield db
+
+    app.dependency_overrides[obtener_bd_async] = bd_pruebas
+    yield ruta, sesiones
+    app.dependency_overrides.clear()
+    asyncio.run(motor_async.dispose())
+
+
+async def _lag_maximo(corrutina):
+    """Corre 'corrutina' mientras un latido mide cuánto llega tarde el event loop"""
+    lag, activo = [0.0], [True]
+
+    async def latir():
+        while activo[0]:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag[0] = max(lag[0], time.perf_counter() - t0 - 0.01)
+
+    latido = asyncio.create_task(latir())
+    await asyncio.sleep(0)
+    try:
+        resultado = await corrutina
+    finally:
+        activo[0] = False
+        await latido
+    return resultado, lag[0]
+
+
+def _bloquear_bd(ruta, segundos):
+    """Otra conexión toma la BD en exclusiva y la suelta a los 'segundos'"""
+    conexion = sqlite3.connect(ruta, check_same_thread=False)
+    conexion.execute("BEGIN EXCLUSIVE")
+    threading.Timer(segundos, conexion.rollback).start()
+    return conexion
+
+
+# ==========================================
+# TEST 1: Registro y login de punta a punta
+# ==========================================
+def test_registro_y_login(bd):
+    cliente = TestClient(app)
+    datos = {"nombre": "Ana", "email": "ana.ingreso@test.com", "password": "clave-segura"}
+
+    assert cliente.post("/registro", json=datos).status_code == 201
+    assert cliente.post("/registro", json=datos).status_code == 400
+
+    resp = cliente.post("/login", json={"email": datos["email"], "password": datos["password"]})
+    assert resp.status_code == 200
+    assert resp.json()["usuario"] == "Ana"
+    assert cliente.post("/login", json={"email": datos["email"], "password": "otra"}).status_code == 400
+
+
+# ==========================================
+# TEST 2: Esperar a la BD no bloquea el event loop
+# ==========================================
+def test_ingreso_no_bloquea_el_bucle(bd, monkeypatch):
+    ruta, sesiones = bd
+
+    # Argon2 ya corre en su pool; acá interesa solo la espera a la BD
+    async def hash_rapido(password):
+        return "hash"
+
+    async def verificar_rapido(password, guardado):
+        return password == "clave-segura", None
+
+    monkeypatch.setattr(ingreso, "encriptar_password_async", hash_rapido)
+    monkeypatch.setattr(ingreso, "verificar_y_actualizar_async", verificar_rapido)
+
+    async def prueba():
+        async with sesiones() as db:
+            conexion = _bloquear_bd(ruta, 0.3)
+            t0 = time.perf_counter()
+            creado, lag_registro = await _lag_maximo(ingreso.registrar_usuario(
+                UsuarioRegistro(nombre="Luis", email="luis.ingreso@test.com", password="clave-segura"), db
+            ))
+            esperado = time.perf_counter() - t0
+            conexion.close()
+
+        async with sesiones() as db:
+            conexion = _bloquear_bd(ruta, 0.3)
+            token, lag_login = await _lag_maximo(ingreso.login_usuario(
+                UsuarioLogin(email="luis.ingreso@test.com", password="clave-segura"), db
+            ))
+            conexion.close()
+        return creado, esperado, lag_registro, token, lag_login
+
+    creado, esperado, lag_registro, token, lag_login = asyncio.run(prueba())
+
+    assert creado["id"] and token["usuario"] == "Luis"
+    assert esperado >= 0.25  # de verdad esperó al bloqueo...
+    assert lag_registro < 0.1  # ...sin frenar al resto de peticiones
+    assert lag_login < 0.1
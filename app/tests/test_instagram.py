@@ -0,0 +1,87 @@
+# Ubicación: app/tests/test_instagram.py
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.plataformas.instagram import Instagram
+from app.servicios.http import ClienteHTTP
+
+
+class _HostingFalso:
+    def obtener_url(self, dato):
+        return "https://cdn/foto.jpg"
+
+
+def _instagram(estados):
+    """Instagram contra una API de Meta falsa que responde 'estados' en orden"""
+    consultas = []
+
+    def responder(request):
+        if request.url.path.endswith("/media"):
+            return httpx.Response(200, json={"id": "contenedor"})
+        if request.url.path.endswith("/contenedor"):
+            consultas.append(request.url.params["fields"])
+            return httpx.Response(200, json={"status_code": estados[min(len(consultas), len(estados)) - 1]})
+        return httpx.Response(200, json={"id": "post-1"})
+
+    http = ClienteHTTP()
+    http.sync = httpx.Client(transport=httpx.MockTransport(responder))
+    http.asincrono = httpx.AsyncClient(transport=httpx.MockTransport(responder))
+
+    servicio = Instagram(http=http, hosting=_HostingFalso())
+    servicio.poll_min, servicio.poll_max, servicio.espera_max = 0.01, 0.02, 1
+    return servicio, consultas
+
+
+# ==========================================
+# TEST 1: Publica apenas el contenedor queda FINISHED
+# ==========================================
+def test_publica_cuando_contenedor_listo():
+    servicio, consultas = _instagram(["IN_PROGRESS", "IN_PROGRESS", "FINISHED"])
+    assert servicio.publicar_foto(b"foto", "hola") == "post-1"
+    assert consultas == ["status_code"] * 3
+
+    servicio, consultas = _instagram(["IN_PROGRESS", "FINISHED"])
+    assert asyncio.run(servicio.publicar_foto_async(b"foto", "hola")) == "post-1"
+    assert len(consultas) == 2
+
+
+# ==========================================
+# TEST 2: Contenedor con error no se publica
+# ==========================================
+def test_contenedor_con_error():
+    servicio, _ = _instagram(["IN_PROGRESS", "ERROR"])
+    with pytest.raises(Exception, match="ERROR"):
+        servicio.publicar_foto(b"foto", "hola")
+
+
+# ==========================================
+# TEST 3: Las esperas suman justo el techo y antes de rendirse se consulta otra vez
+# ==========================================
+def test_ultima_consulta_al_agotar_el_techo():
+    servicio, _ = _instagram(["IN_PROGRESS"])
+    servicio.poll_min, servicio.poll_max, servicio.espera_max = 0.25, 0.5, 1.5
+    assert list(servicio._intervalos_espera()) == [0.25, 0.5, 0.5, 0.25]
+
+    # 3 esperas (1/64 + 1/32 + 1/64): el contenedor termina durante la última
+    estados = ["IN_PROGRESS"] * 3 + ["FINISHED"]
+    servicio, consultas = _instagram(estados)
+    servicio.poll_min, servicio.poll_max, servicio.espera_max = 1 / 64, 1 / 32, 1 / 16
+    assert servicio.publicar_foto(b"foto", "hola") == "post-1"
+    assert len(consultas) == 4
+
+    servicio, consultas = _instagram(estados)
+    servicio.poll_min, servicio.poll_max, servicio.espera_max = 1 / 64, 1 / 32, 1 / 16
+    assert asyncio.run(servicio.publicar_foto_async(b"foto", "hola")) == "post-1"
+    assert len(consultas) == 4
+
+    servicio, consultas = _instagram(["IN_PROGRESS"])
+    servicio.poll_min, servicio.poll_max, servicio.espera_max = 1 / 64, 1 / 32, 1 / 16
+    with pytest.raises(Exception, match="no terminó"):
+        servicio.publicar_foto(b"foto", "hola")
+    assert len(consultas) == 4
@@ -0,0 +1,47 @@
+# Ubicación: app/tests/test_medios.py
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.utilidades.medios import BufferMedio
+
+
+# ==========================================
+# TEST 1: Chico en memoria, grande con mmap, mismo contenido
+# ==========================================
+def test_buffer_memoria_y_mmap(tmp_path):
+    ruta = tmp_path / "video.mp4"
+    ruta.write_bytes(b"0123456789" * 1000)
+
+    chico = BufferMedio.desde_archivo(str(ruta), umbral_mmap=1024 * 1024)
+    grande = BufferMedio.desde_archivo(str(ruta), umbral_mmap=1)
+
+    assert isinstance(chico._datos, bytes)
+    assert not isinstance(grande._datos, bytes)
+    assert chico.tipo_mime == "video/mp4"
+
+    lector = grande.lector()
+    lector.seek(9990)
+    assert lector.read() == b"0123456789"
+    assert bytes(grande.vista) == bytes(chico.vista)
+
+    chico.soltar()
+    grande.soltar()
+
+
+# ==========================================
+# TEST 2: El temporal se borra al soltar el último uso
+# ==========================================
+def test_buffer_borra_temporal_al_final(tmp_path):
+    ruta = tmp_path / "temp_subida.jpg"
+    ruta.write_bytes(b"imagen")
+
+    medio = BufferMedio.desde_archivo(str(ruta), borrar_al_liberar=True)
+    medio.tomar()  # una red publicando
+
+    medio.soltar()  # el endpoint ya respondió
+    assert ruta.exists()
+
+    medio.soltar()  # terminó la red
+    assert not ruta.exists()
@@ -0,0 +1,63 @@
+# Ubicación: app/tests/test_metricas.py
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from main import app
+from app.config.configuracion import obtener_configuracion
+from app.rutas import metricas
+from app.utilidades import dependencia
+from app.utilidades.dependencia import UsuarioActual, obtener_usuario_actual
+from app.utilidades.monitor_bucle import MonitorBucle
+
+cliente = TestClient(app)
+
+
+@pytest.fixture
+def admins(monkeypatch):
+    monkeypatch.setattr(dependencia.config, "METRICAS_ADMINS", ["admin@correo.com"])
+    yield
+    app.dependency_overrides.clear()
+
+
+def _como(email):
+    app.dependency_overrides[obtener_usuario_actual] = lambda: UsuarioActual(1, email, "Prueba")
+
+
+# ==========================================
+# TEST 1: Sin token no hay métricas
+# ==========================================
+@pytest.mark.parametrize("ruta", ["/metricas/cache", "/metricas/http", "/metricas/bd", "/metricas/bucle"])
+def test_metricas_sin_token(ruta, admins):
+    assert cliente.get(ruta).status_code == 401
+
+
+# ==========================================
+# TEST 2: Solo los administradores configurados las ven
+# ==========================================
+def test_metricas_solo_admins(admins):
+    _como("ana@correo.com")
+    assert cliente.get("/metricas/http").status_code == 403
+
+    _como("Admin@Correo.com")
+    assert cliente.get("/metricas/http").status_code == 200
+
+
+# ==========================================
+# TEST 3: Las pilas de los bloqueos no salen por la API salvo que se pida
+# ==========================================
+def test_bucle_sin_pilas_por_defecto(admins, monkeypatch):
+    monitor = MonitorBucle(intervalo_seg=0.1, umbral_seg=0.25)
+    monitor._bloqueos.append({"pila": 'File "/srv/app/secreto.py"', "lag_ms": 300.0, "fecha": "2026-01-01"})
+    monkeypatch.setattr(metricas, "obtener_monitor_bucle", lambda: monitor)
+    _como("admin@correo.com")
+
+    bloqueo = cliente.get("/metricas/bucle").json()["ultimos_bloqueos"][0]
+    assert bloqueo == {"lag_ms": 300.0, "fecha": "2026-01-01"}
+
+    monkeypatch.setattr(obtener_configuracion(), "MONITOR_BUCLE_EXPONER_PILAS", True)
+    assert "secreto.py" in cliente.get("/metricas/bucle").json()["ultimos_bloqueos"][0]["pila"]
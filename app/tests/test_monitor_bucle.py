@@ -0,0 +1,56 @@
+# Ubicación: app/tests/test_monitor_bucle.py
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.utilidades.monitor_bucle import MonitorBucle
+
+
+def _llamada_bloqueante():
+    time.sleep(0.3)
+
+
+# ==========================================
+# TEST 1: Un bloqueo largo queda registrado con la pila culpable
+# ==========================================
+def test_detecta_bloqueo_con_pila():
+    monitor = MonitorBucle(intervalo_seg=0.02, umbral_seg=0.1)
+
+    async def escenario():
+        monitor.iniciar()
+        await asyncio.sleep(0.1)
+        _llamada_bloqueante()
+        await asyncio.sleep(0.1)
+        monitor.detener()
+
+    asyncio.run(escenario())
+    datos = monitor.estadisticas()
+
+    assert datos["bloqueos"] == 1
+    assert datos["lag_max_ms"] >= 250
+    assert datos["lag_p50_ms"] < 100
+    bloqueo = datos["ultimos_bloqueos"][0]
+    assert bloqueo["lag_ms"] >= 250
+    assert "_llamada_bloqueante" in bloqueo["pila"]
+
+
+# ==========================================
+# TEST 2: Sin bloqueos no hay nada que reportar
+# ==========================================
+def test_sin_bloqueos():
+    monitor = MonitorBucle(intervalo_seg=0.01, umbral_seg=0.2)
+
+    async def escenario():
+        monitor.iniciar()
+        await asyncio.sleep(0.1)
+        monitor.detener()
+
+    asyncio.run(escenario())
+    datos = monitor.estadisticas()
+
+    assert datos["muestras"] > 0
+    assert datos["bloqueos"] == 0
+    assert not datos["activo"]
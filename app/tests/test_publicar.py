@@ -0,0 +1,138 @@
+# Ubicación: app/tests/test_publicar.py
+import io
+import os
+import sys
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from main import app
+from app.rutas import contenido
+from app.utilidades.dependencia import UsuarioActual, obtener_usuario_actual
+
+
+@pytest.fixture
+def publicar(monkeypatch):
+    """/publicar con redes falsas: cada una tarda lo indicado en 'demoras' (segundos)"""
+    demoras = {}
+    publicados = {}
+    liberar = threading.Event()
+
+    def red_falsa(red, user_id, texto_final, lista_hashtags, medio):
+        publicados[red] = (texto_final, medio.lector().read())
+        liberar.wait(demoras.get(red, 0))
+        return {"status": "ok", "red": red}
+
+    monkeypatch.setattr(contenido, "_publicar_en_red", red_falsa)
+    app.dependency_overrides[obtener_usuario_actual] = lambda: UsuarioActual(1, "ana@correo.com", "Ana")
+    cliente = TestClient(app)
+
+    def enviar(redes, text="Hola", archivo=b"imagen", usar_cache=False):
+        data = {"red_social": redes, "usar_cache": str(usar_cache).lower()}
+        if text is not None:
+            data["text"] = text
+        files = {"archivo": ("foto.jpg", io.BytesIO(archivo), "image/jpeg")} if archivo is not None else None
+        t0 = time.perf_counter()
+        resp = cliente.post("/publicar", data=data, files=files)
+        return resp, time.perf_counter() - t0
+
+    yield demoras, enviar, publicados
+    liberar.set()  # que los hilos abandonados terminen
+    app.dependency_overrides.clear()
+
+
+# ==========================================
+# TEST 1: Una red lenta agota su plazo sin frenar a las demás
+# ==========================================
+def test_red_lenta_no_frena_a_las_demas(publicar, monkeypatch):
+    demoras, enviar, _ = publicar
+    monkeypatch.setattr(contenido.config, "PUBLICAR_TIMEOUT_RED_SEG", 0.2)
+    monkeypatch.setattr(contenido.config, "PUBLICAR_TIMEOUT_TOTAL_SEG", 5)
+    demoras.update({"facebook": 2, "whatsapp": 0.05, "linkedin": 0.05})
+
+    resp, duracion = enviar("facebook,whatsapp,linkedin")
+    detalles = resp.json()["detalles"]
+
+    assert resp.status_code == 200
+    assert list(detalles) == ["facebook", "whatsapp", "linkedin"]
+    # Sin respuesta no es "error": el hilo sigue y el post puede salir igual
+    assert detalles["facebook"]["status"] == "pendiente"
+    assert detalles["facebook"]["detalle"].startswith("Tiempo agotado")
+    assert "antes de reintentar" in detalles["facebook"]["detalle"]
+    assert detalles["whatsapp"]["status"] == "ok"
+    assert detalles["linkedin"]["status"] == "ok"
+    assert duracion < 1
+
+
+# ==========================================
+# TEST 2: El plazo total corta aunque la red tenga un plazo propio mayor
+# ==========================================
+def test_plazo_total(publicar, monkeypatch):
+    demoras, enviar, _ = publicar
+    monkeypatch.setattr(contenido.config, "PUBLICAR_TIMEOUT_TIKTOK_SEG", 5)
+    monkeypatch.setattr(contenido.config, "PUBLICAR_TIMEOUT_TOTAL_SEG", 0.3)
+    demoras.update({"tiktok": 2, "whatsapp": 0.05})
+
+    resp, duracion = enviar("tiktok,whatsapp")
+    detalles = resp.json()["detalles"]
+
+    assert detalles["whatsapp"]["status"] == "ok"
+    assert detalles["tiktok"]["status"] == "pendiente"
+    assert detalles["tiktok"]["detalle"].startswith("Tiempo total agotado")
+    assert duracion < 1
+
+
+class _CacheResultadosFalsa:
+    def __init__(self, generacion):
+        self.generacion = generacion
+        self.pedidos = []
+
+    def obtener_usuario(self, user_id):
+        self.pedidos.append(user_id)
+        return self.generacion
+
+
+# ==========================================
+# TEST 3: Sin texto ni archivo se reutiliza la última generación en caché
+# ==========================================
+def test_reutiliza_generacion_en_cache(publicar, monkeypatch, tmp_path):
+    _, enviar, publicados = publicar
+    imagen = tmp_path / "1_facebook.png"
+    imagen.write_bytes(b"png generado")
+    cache = _CacheResultadosFalsa({"facebook": {"text": "Texto IA", "hashtags": ["promo"], "image_path": str(imagen)}})
+    monkeypatch.setattr(contenido.servicio_ia, "cache_contenido", cache)
+
+    resp, _ = enviar("facebook", text=None, archivo=None, usar_cache=True)
+
+    assert resp.status_code == 200
+    assert resp.json()["detalles"]["facebook"]["status"] == "ok"
+    assert cache.pedidos == ["1"]
+    assert publicados["facebook"] == ("Texto IA\n\n#promo", b"png generado")
+    assert imagen.exists()  # el archivo de la generación no es un temporal: no se borra
+
+
+# ==========================================
+# TEST 4: Sin texto o archivo y sin generación en caché -> 400
+# ==========================================
+def test_falta_texto_o_archivo(publicar, monkeypatch):
+    _, enviar, publicados = publicar
+    cache = _CacheResultadosFalsa(None)
+    monkeypatch.setattr(contenido.servicio_ia, "cache_contenido", cache)
+
+    resp, _ = enviar("facebook", text=None, usar_cache=True)
+    assert resp.status_code == 400
+    assert "text" in resp.json()["detail"]
+
+    resp, _ = enviar("facebook", archivo=None, usar_cache=True)
+    assert resp.status_code == 400
+    assert "archivo" in resp.json()["detail"]
+
+    # usar_cache=false no consulta la caché aunque falte el archivo
+    resp, _ = enviar("facebook", archivo=None, usar_cache=False)
+    assert resp.status_code == 400
+    assert len(cache.pedidos) == 2
+    assert publicados == {}
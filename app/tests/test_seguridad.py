@@ -0,0 +1,46 @@
+# Ubicación: app/tests/test_seguridad.py
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+from passlib.context import CryptContext
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.utilidades import seguridad
+
+
+# ==========================================
+# TEST 1: Hash con parámetros viejos -> se re-hashea al verificar
+# ==========================================
+def test_rehash_con_parametros_nuevos():
+    viejo = CryptContext(schemes=["argon2"], argon2__rounds=1, argon2__memory_cost=8192).hash("clave-segura")
+
+    valida, nuevo = asyncio.run(seguridad.verificar_y_actualizar_async("clave-segura", viejo))
+    assert valida and nuevo and nuevo != viejo
+
+    valida, otra_vez = asyncio.run(seguridad.verificar_y_actualizar_async("clave-segura", nuevo))
+    assert valida and otra_vez is None
+
+
+# ==========================================
+# TEST 2: Con la cola llena se rechaza al instante
+# ==========================================
+def test_pool_saturado(monkeypatch):
+    pool = seguridad._PoolHash(max_hilos=1, max_en_cola=1)
+    monkeypatch.setattr(seguridad, "_pool_hash", pool)
+    liberar = threading.Event()
+
+    async def rafaga():
+        bloqueantes = [asyncio.ensure_future(pool.ejecutar(liberar.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(seguridad.HashSaturado):
+            await seguridad.encriptar_password_async("otra")
+        liberar.set()
+        await asyncio.gather(*bloqueantes)
+        # Al terminar se liberan los cupos
+        assert await seguridad.encriptar_password_async("otra")
+
+    asyncio.run(rafaga())
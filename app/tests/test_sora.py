@@ -0,0 +1,120 @@
+# Ubicación: app/tests/test_sora.py
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.servicios.ia import ServicioIA
+from app.servicios.sora import PollerVideos, _VideoPendiente
+
+
+class _SoraFalsa:
+    """client.videos.retrieve que devuelve los estados indicados en orden"""
+
+    def __init__(self, estados):
+        self.estados = list(estados)
+        self.consultas = 0
+        self.videos = self
+
+    def retrieve(self, video_id):
+        self.consultas += 1
+        estado = self.estados[min(self.consultas, len(self.estados)) - 1]
+        if isinstance(estado, Exception):
+            raise estado
+        status, progreso = estado
+        return SimpleNamespace(id=video_id, status=status, progress=progreso)
+
+
+# ==========================================
+# TEST 1: El Future se resuelve con el video terminado
+# ==========================================
+def test_resuelve_video_completado():
+    sora = _SoraFalsa([("queued", 0), ("in_progress", 50), ("completed", 100)])
+    poller = PollerVideos(sora, intervalo_min=0.01, intervalo_max=0.05)
+
+    video = poller.registrar("video-1").result(timeout=2)
+
+    assert video.status == "completed"
+    assert sora.consultas == 3
+    assert poller.pendientes() == 0
+
+
+# ==========================================
+# TEST 2: Backoff: sin progreso el intervalo crece hasta el máximo
+# ==========================================
+def test_backoff_sin_progreso():
+    poller = PollerVideos(client=None, intervalo_min=1.0, intervalo_max=3.0, factor=1.5)
+    pendiente = _VideoPendiente("video-1", 1.0)
+
+    intervalos = []
+    for _ in range(4):
+        poller._reprogramar(pendiente, avanzo=False)
+        intervalos.append(pendiente.intervalo)
+    assert intervalos == [1.5, 2.25, 3.0, 3.0]
+
+    # Si avanza, mantiene el ritmo actual
+    poller._reprogramar(pendiente, avanzo=True)
+    assert pendiente.intervalo == 3.0
+
+
+# ==========================================
+# TEST 3: Trabajo fallido y errores repetidos de la API
+# ==========================================
+def test_trabajo_fallido():
+    poller = PollerVideos(_SoraFalsa([("in_progress", 10), ("failed", 10)]), intervalo_min=0.01)
+    assert poller.registrar("video-1").result(timeout=2).status == "failed"
+
+    caida = _SoraFalsa([RuntimeError("503")])
+    poller = PollerVideos(caida, intervalo_min=0.01, intervalo_max=0.01, max_errores=3)
+    with pytest.raises(RuntimeError, match="503"):
+        poller.registrar("video-2").result(timeout=2)
+    assert caida.consultas == 3
+
+
+# ==========================================
+# TEST 4: Un video abandonado deja de consultarse
+# ==========================================
+def test_cancelar_deja_de_consultar():
+    sora = _SoraFalsa([("in_progress", 10)])
+    poller = PollerVideos(sora, intervalo_min=0.01, intervalo_max=0.01)
+
+    futuro = poller.registrar("video-1")
+    time.sleep(0.05)
+    poller.cancelar("video-1")
+    consultas = sora.consultas
+    time.sleep(0.05)
+
+    assert futuro.cancelled()
+    assert poller.pendientes() == 0
+    assert sora.consultas <= consultas + 1
+
+    # Cancelar el Future desde afuera (como hace wait_for) también lo saca
+    futuro = poller.registrar("video-2")
+    futuro.cancel()
+    time.sleep(0.05)
+    assert poller.pendientes() == 0
+
+
+# ==========================================
+# TEST 5: La espera síncrona ocupa su hilo como mucho timeout_video y suelta el trabajo
+# ==========================================
+def test_espera_sincrona_acotada(tmp_path):
+    sora = _SoraFalsa([("in_progress", 10)])
+    sora.create = lambda **kwargs: SimpleNamespace(id="video-1", status="queued")
+
+    servicio = object.__new__(ServicioIA)
+    servicio.client = sora
+    servicio.modelo_video = "sora-2"
+    servicio.timeout_video = 0.2
+    servicio.poller_videos = PollerVideos(sora, intervalo_min=0.01, intervalo_max=0.01)
+
+    t0 = time.perf_counter()
+    ruta = servicio.generar_video("hook", ruta_salida=str(tmp_path / "video.mp4"))
+
+    assert ruta == ""
+    assert 0.2 <= time.perf_counter() - t0 < 0.5
+    assert servicio.poller_videos.pendientes() == 0
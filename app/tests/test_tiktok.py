@@ -0,0 +1,66 @@
+# Ubicación: app/tests/test_tiktok.py
+import io
+import os
+import sys
+from unittest.mock import patch
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.plataformas.tiktok import TikTok, planificar_chunks, CHUNK_MIN_BYTES
+
+MB = 1024 * 1024
+
+
+class _HTTPFalso:
+    """Registra los PUT y falla la primera vez en los rangos indicados"""
+
+    def __init__(self, fallar_una_vez=()):
+        self.puts = []
+        self.pendientes_de_fallo = set(fallar_una_vez)
+
+    def put(self, url, headers=None, content=None):
+        rango = headers["Content-Range"]
+        self.puts.append((rango, len(content)))
+        if rango in self.pendientes_de_fallo:
+            self.pendientes_de_fallo.discard(rango)
+            raise httpx.ConnectError("conexión cortada")
+        return httpx.Response(206)
+
+
+# ==========================================
+# TEST 1: Plan de chunks según límites de TikTok
+# ==========================================
+def test_planificar_chunks():
+    # Video chico: un solo chunk del tamaño exacto
+    assert planificar_chunks(3 * MB, 10 * MB) == (3 * MB, 1)
+    # El sobrante va en el último chunk (no se crea un chunk extra)
+    assert planificar_chunks(25 * MB, 10 * MB) == (10 * MB, 2)
+    # Nunca por debajo del mínimo permitido
+    assert planificar_chunks(20 * MB, 1 * MB) == (CHUNK_MIN_BYTES, 4)
+
+
+# ==========================================
+# TEST 2: Subida por rangos con reintento por chunk
+# ==========================================
+@patch("app.plataformas.tiktok.time.sleep")
+def test_subir_video_por_chunks(mock_sleep):
+    tamano = 12 * MB
+    http = _HTTPFalso(fallar_una_vez={f"bytes {5 * MB}-{tamano - 1}/{tamano}"})
+    servicio = TikTok(http=http)
+
+    chunk_size, total = planificar_chunks(tamano, 5 * MB)
+    archivo = io.BytesIO(b"\0" * tamano)
+
+    assert servicio._subir_video("https://subida", archivo, tamano, chunk_size, total)
+
+    rangos = [rango for rango, _ in http.puts]
+    assert rangos == [
+        f"bytes 0-{5 * MB - 1}/{tamano}",
+        f"bytes {5 * MB}-{tamano - 1}/{tamano}",
+        f"bytes {5 * MB}-{tamano - 1}/{tamano}",
+    ]
+    # Ningún PUT carga más que un chunk (el último absorbe el sobrante)
+    assert max(n for _, n in http.puts) == 7 * MB
+    assert mock_sleep.call_count == 1
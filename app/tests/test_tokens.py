@@ -0,0 +1,204 @@
+# Ubicación: app/tests/test_tokens.py
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from app.config.bd import Base, _url_async
+from app.modelos.tablas import TokenRedSocial
+from app.repositorios import tokens
+from app.rutas import oauth
+from app.repositorios.tokens import GestorTokens
+from app.servicios.cache import AlmacenMemoria, CacheJSON
+from app.utilidades.dependencia import UsuarioActual
+
+
+async def _con_sesion(prueba, consultas=None):
+    """Corre 'prueba(db)' sobre un SQLite en memoria con el driver async (aiosqlite)"""
+    motor = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with motor.begin() as conexion:
+        await conexion.run_sync(Base.metadata.create_all)
+    if consultas is not None:
+        event.listen(motor.sync_engine, "before_cursor_execute", lambda *args: consultas.append(args[2]))
+    try:
+        async with async_sessionmaker(motor, expire_on_commit=False)() as db:
+            return await prueba(db)
+    finally:
+        await motor.dispose()
+
+
+# ==========================================
+# TEST 1: Guardar, actualizar y consultar sin bloquear el event loop
+# ==========================================
+def test_tokens_async():
+    async def prueba(db):
+        assert not await GestorTokens.usuario_tiene_token_async(db, 1, "tiktok")
+
+        await GestorTokens.guardar_token_async(db, 1, "tiktok", "acceso-1", "refresh-1", expires_in=60)
+        # Un token nuevo sin refresh conserva el anterior
+        guardado = await GestorTokens.guardar_token_async(db, 1, "tiktok", "acceso-2")
+
+        assert guardado["access_token"] == "acceso-2"
+        assert guardado["refresh_token"] == "refresh-1"
+        assert await GestorTokens.usuario_tiene_token_async(db, 1, "tiktok")
+        assert not await GestorTokens.usuario_tiene_token_async(db, 1, "facebook")
+        assert (await GestorTokens.obtener_token_async(db, 1, "tiktok"))["access_token"] == "acceso-2"
+        assert await GestorTokens.obtener_token_async(db, 2, "tiktok") is None
+
+    asyncio.run(_con_sesion(prueba))
+
+
+# ==========================================
+# TEST 2: La URL async apunta a la misma BD con otro driver
+# ==========================================
+def test_url_async():
+    assert _url_async("sqlite:///./contenido.db") == "sqlite+aiosqlite:///./contenido.db"
+    assert _url_async("postgresql://u:clave@bd:5432/redes").startswith("postgresql+asyncpg://u:clave@bd")
+
+
+# ==========================================
+# TEST 3: Estado de todas las redes en una consulta, en caché hasta guardar un token
+# ==========================================
+def test_estado_redes_en_cache(monkeypatch):
+    cache = CacheJSON(AlmacenMemoria(), ttl=60, nombre="estado_tokens")
+    monkeypatch.setattr(tokens, "obtener_cache_estado_tokens", lambda: cache)
+    consultas = []
+
+    async def prueba(db):
+        db.add_all([
+            TokenRedSocial(usuario_id=1, red_social="facebook", token_acceso="fb"),
+            TokenRedSocial(
+                usuario_id=1, red_social="linkedin", token_acceso="li",
+                fecha_expiracion=datetime.now() - timedelta(days=1)
+            ),
+            TokenRedSocial(usuario_id=2, red_social="whatsapp", token_acceso="wa"),
+        ])
+        await db.commit()
+        consultas.clear()
+
+        estado = await GestorTokens.estado_redes_async(db, 1)
+        assert set(estado) == {"facebook", "linkedin"}
+        assert estado["facebook"]["estado"] == "sin_vencimiento"
+        assert estado["linkedin"]["estado"] == "vencido"
+        assert not estado["linkedin"]["renovable"]
+        assert len(consultas) == 1
+
+        # Segunda lectura: desde caché, sin ir a la BD
+        await GestorTokens.estado_redes_async(db, 1)
+        assert len(consultas) == 1
+
+        # Guardar un token invalida y la próxima lectura lo ve
+        await GestorTokens.guardar_token_async(db, 1, "tiktok", "tt", "refresh", expires_in=3600)
+        estado = await GestorTokens.estado_redes_async(db, 1)
+        assert estado["tiktok"] == {"expira": estado["tiktok"]["expira"], "renovable": True, "estado": "vigente"}
+
+    asyncio.run(_con_sesion(prueba, consultas))
+
+
+# ==========================================
+# TEST 4: Una invalidación durante la consulta no deja en caché el estado viejo
+# ==========================================
+def test_invalidar_durante_la_consulta(monkeypatch):
+    cache = CacheJSON(AlmacenMemoria(), ttl=60, nombre="estado_tokens")
+    monkeypatch.setattr(tokens, "obtener_cache_estado_tokens", lambda: cache)
+    consultas = []
+
+    def consulta_lenta(*args):
+        consultas.append(args[2])
+        if len(consultas) == 1:
+            # Otro worker guarda un token mientras esta lectura está en la BD
+            GestorTokens.invalidar_estado(1)
+
+    async def prueba(db):
+        db.add(TokenRedSocial(usuario_id=1, red_social="facebook", token_acceso="fb"))
+        await db.commit()
+        event.listen(db.bind.sync_engine, "before_cursor_execute", consulta_lenta)
+
+        await GestorTokens.estado_redes_async(db, 1)
+        await GestorTokens.estado_redes_async(db, 1)  # la copia de antes no vale: vuelve a la BD
+        await GestorTokens.estado_redes_async(db, 1)  # ésta sí quedó en caché
+        return len(consultas)
+
+    assert asyncio.run(_con_sesion(prueba)) == 2
+
+
+class _AlmacenLento(AlmacenMemoria):
+    """Almacén de verifiers que tarda como un SQLite esperando su busy timeout"""
+
+    def guardar(self, clave, valor, ttl=None):
+        time.sleep(0.2)
+        super().guardar(clave, valor, ttl)
+
+    def obtener(self, clave):
+        time.sleep(0.2)
+        return super().obtener(clave)
+
+    def eliminar(self, clave):
+        time.sleep(0.2)
+        super().eliminar(clave)
+
+
+class _TikTokFalso:
+    def obtener_url_oauth_con_verifier(self, user_id):
+        return f"https://tiktok/auth?state={user_id}", "verifier-7"
+
+    def intercambiar_codigo_por_token(self, code, verifier):
+        time.sleep(0.2)
+        return {"access_token": f"token-{verifier}"}
+
+
+class _SesionFalsa:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *args):
+        return False
+
+
+# ==========================================
+# TEST 5: El flujo OAuth espera al almacén de verifiers sin frenar el event loop
+# ==========================================
+def test_oauth_no_bloquea_el_bucle(monkeypatch):
+    almacen = _AlmacenLento()
+    guardados = []
+
+    async def guardar_token(db, user_id, red_social, access_token, **kwargs):
+        guardados.append((user_id, red_social, access_token))
+
+    monkeypatch.setattr(tokens, "obtener_almacen_verifiers", lambda: almacen)
+    monkeypatch.setattr(GestorTokens, "guardar_token_async", guardar_token)
+    monkeypatch.setattr(oauth, "TikTok", _TikTokFalso)
+    monkeypatch.setattr(oauth, "SessionLocalAsync", _SesionFalsa)
+
+    async def prueba():
+        lag, activo = [0.0], [True]
+
+        async def latir():
+            while activo[0]:
+                t0 = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lag[0] = max(lag[0], time.perf_counter() - t0 - 0.01)
+
+        latido = asyncio.create_task(latir())
+        await asyncio.sleep(0)
+        try:
+            await oauth.conectar_tiktok(usuario_actual=UsuarioActual(7, "ana@correo.com", "Ana"))
+            respuesta = await oauth.callback_tiktok(code="codigo", state="7")
+        finally:
+            activo[0] = False
+            await latido
+        return respuesta, lag[0]
+
+    respuesta, lag = asyncio.run(prueba())
+
+    assert respuesta.status_code == 307
+    assert guardados == [(7, "tiktok", "token-verifier-7")]
+    assert almacen.obtener("7:tiktok") is None  # el verifier usado se borró
+    assert lag < 0.1
@@ -0,0 +1,97 @@
+import base64
+import json
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+# Múltiplo de 3: ningún chunk intermedio lleva relleno '=' y se pueden concatenar
+CHUNK_BASE64 = 3 * 64 * 1024
+
+
+def longitud_base64(tamano: int) -> int:
+    """Largo exacto del base64 (con relleno) de 'tamano' bytes"""
+    return 4 * ((tamano + 2) // 3)
+
+
+def base64_en_chunks(vista: memoryview, tamano_chunk: int = CHUNK_BASE64) -> Iterator[bytes]:
+    """Codifica en base64 por tramos; en memoria solo vive un tramo a la vez"""
+    if tamano_chunk % 3:
+        raise ValueError("tamano_chunk debe ser múltiplo de 3")
+    for inicio in range(0, vista.nbytes, tamano_chunk):
+        yield base64.b64encode(vista[inicio:inicio + tamano_chunk])
+
+
+class CuerpoStreaming:
+    """
+    Cuerpo HTTP que se arma por partes al enviarse, con Content-Length exacto.
+
+    Se pasa como content= al cliente HTTP. Se puede iterar más de una vez
+    (reintentos): cada iteración vuelve a generar las partes.
+    """
+
+    def __init__(self, tipo_contenido: str):
+        self.tipo_contenido = tipo_contenido
+        self._partes: List[Tuple[int, Callable[[], Iterator[bytes]]]] = []
+
+    def agregar(self, datos: bytes) -> "CuerpoStreaming":
+        self._partes.append((len(datos), lambda: iter((datos,))))
+        return self
+
+    def agregar_base64(self, vista: memoryview) -> "CuerpoStreaming":
+        self._partes.append((longitud_base64(vista.nbytes), lambda: base64_en_chunks(vista)))
+        return self
+
+    @property
+    def longitud(self) -> int:
+        return sum(longitud for longitud, _ in self._partes)
+
+    def headers(self) -> Dict[str, str]:
+        return {"Content-Type": self.tipo_contenido, "Content-Length": str(self.longitud)}
+
+    def __iter__(self) -> Iterator[bytes]:
+        for _, generar in self._partes:
+            yield from generar()
+
+
+# ==================== CUERPOS USADOS POR LOS ADAPTADORES ====================
+
+def cuerpo_json_data_uri(
+    campo: str,
+    vista: memoryview,
+    tipo_mime: str,
+    nombre: str,
+    extras: Dict[str, Any]
+) -> CuerpoStreaming:
+    """
+    JSON {campo: "data:<mime>;name=<nombre>;base64,<...>", **extras}
+    sin construir nunca el string base64 completo.
+    """
+    # json.dumps escapa el encabezado; se quita la comilla de cierre para seguir con el base64
+    inicio = "{" + json.dumps(campo) + ": " + json.dumps(f"data:{tipo_mime};name={nombre};base64,")[:-1]
+    resto = "".join(f", {json.dumps(clave)}: {json.dumps(valor)}" for clave, valor in extras.items())
+
+    return (
+        CuerpoStreaming("application/json")
+        .agregar(inicio.encode("utf-8"))
+        .agregar_base64(vista)
+        .agregar(('"' + resto + "}").encode("utf-8"))
+    )
+
+
+def cuerpo_multipart_base64(
+    campos: Dict[str, str],
+    campo_archivo: str,
+    vista: memoryview
+) -> CuerpoStreaming:
+    """multipart/form-data con 'campo_archivo' como texto base64 (lo que acepta ImgBB)"""
+    limite = uuid.uuid4().hex
+    cuerpo = CuerpoStreaming(f"multipart/form-data; boundary={limite}")
+
+    for nombre, valor in campos.items():
+        cuerpo.agregar(
+            f'--{limite}\r\nContent-Disposition: form-data; name="{nombre}"\r\n\r\n{valor}\r\n'.encode("utf-8")
+        )
+
+    cuerpo.agregar(f'--{limite}\r\nContent-Disposition: form-data; name="{campo_archivo}"\r\n\r\n'.encode("utf-8"))
+    cuerpo.agregar_base64(vista)
+    cuerpo.agregar(f"\r\n--{limite}--\r\n".encode("utf-8"))
+    return cuerpo
@@ -1,23 +1,59 @@
 # app/utilidades/dependencias.py
+import json
+from dataclasses import asdict, dataclass
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
 
 # Importamos configuración y modelos
 from app.config.bd import obtener_bd
+from app.config.configuracion import obtener_configuracion
 from app.modelos.tablas import Usuario
+from app.servicios.cache import AlmacenMemoria
 from app.utilidades.seguridad import SECRET_KEY, ALGORITHM
 
 # Esto le dice a Swagger que el login está en /auth/login
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def obtener_usuario_actual(token: str = Depends(oauth2_scheme), db: Session = Depends(obtener_bd)):
+config = obtener_configuracion()
+
+
+@dataclass(frozen=True)
+class UsuarioActual:
+    """Lo que las rutas necesitan del usuario autenticado, sin la fila ORM ni el hash"""
+    id: int
+    email: str
+    nombre: str
+
+
+# Usuarios ya resueltos, por 'sub' del token. TTL corto: un cambio sin invalidar dura poco.
+_usuarios_resueltos = AlmacenMemoria(max_entradas=config.AUTH_CACHE_MAX_ENTRADAS)
+
+
+def invalidar_usuario(email: str) -> None:
+    """Saca al usuario de la caché (llamar cuando cambian sus datos o se elimina)"""
+    _usuarios_resueltos.eliminar(email)
+
+
+@event.listens_for(Usuario, "after_update")
+@event.listens_for(Usuario, "after_delete")
+def _invalidar_al_cambiar(mapper, connection, usuario: Usuario) -> None:
+    # Si cambió el email, también se invalida el anterior
+    anteriores = inspect(usuario).attrs.email.history.deleted or []
+    for email in [usuario.email, *anteriores]:
+        invalidar_usuario(email)
+
+
+def obtener_usuario_actual(token: str = Depends(oauth2_scheme), db: Session = Depends(obtener_bd)) -> UsuarioActual:
     """
     El 'Portero':
     1. Recibe el token.
     2. Lo decodifica.
-    3. Busca al usuario en la BD.
+    3. Busca al usuario (primero en caché, si no en la BD por su id).
     4. Si todo está bien, deja pasar y entrega el usuario.
     """
     credentials_exception = HTTPException(
@@ -25,20 +61,45 @@ def obtener_usuario_actual(token: str = Depends(oauth2_scheme), db: Session = De
         detail="No se pudieron validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
     try:
         # Decodificar el Token
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
+        uid: Optional[int] = payload.get("uid")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    # Buscar usuario en la Base de Datos PostgreSQL
-    user = db.query(Usuario).filter(Usuario.email == email).first()
-    
+
+    # Camino común: usuario resuelto hace poco, sin ir a la BD
+    # (si el token trae 'uid' tiene que ser el del usuario en caché: un email
+    # reasignado a otra cuenta no hereda la sesión de la anterior)
+    guardado = _usuarios_resueltos.obtener(email)
+    if guardado is not None:
+        usuario = UsuarioActual(**json.loads(guardado))
+        if uid is None or usuario.id == uid:
+            return usuario
+
+    # Buscar usuario en la Base de Datos: por clave primaria si el token trae 'uid'
+    # (tokens antiguos sin 'uid' siguen funcionando por email)
+    if uid is not None:
+        user = db.get(Usuario, uid)
+        if user is not None and user.email != email:
+            user = None
+    else:
+        user = db.query(Usuario).filter(Usuario.email == email).first()
+
     if user is None:
         raise credentials_exception
-        
-    return user
\ No newline at end of file
+
+    usuario = UsuarioActual(id=user.id, email=user.email, nombre=user.nombre)
+    _usuarios_resueltos.guardar(email, json.dumps(asdict(usuario)), config.AUTH_CACHE_TTL_SEG)
+    return usuario
+
+
+def obtener_admin_metricas(usuario: UsuarioActual = Depends(obtener_usuario_actual)) -> UsuarioActual:
+    """Solo los emails de METRICAS_ADMINS pasan a /metricas"""
+    if usuario.email.lower() not in config.METRICAS_ADMINS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Sin permiso para ver las métricas")
+    return usuario
@@ -0,0 +1,174 @@
+import hashlib
+import io
+import logging
+import mimetypes
+import mmap
+import os
+import threading
+from typing import Any, BinaryIO, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DatosMedio = Union["BufferMedio", bytes, bytearray, memoryview]
+
+
+class BufferMedio:
+    """
+    Archivo de medios leído UNA sola vez y compartido (solo lectura) entre redes.
+
+    - Archivos chicos: se cargan como bytes.
+    - Archivos grandes: se mapean con mmap, el SO pagina bajo demanda y nadie copia.
+
+    Cada consumidor usa 'vista' (memoryview) o 'lector()' (archivo de solo
+    lectura sobre la misma memoria). Cuenta sus usuarios igual que un archivo
+    temporal: se libera (y opcionalmente borra el archivo) al soltar el último.
+    """
+
+    def __init__(
+        self,
+        datos: Union[bytes, mmap.mmap],
+        nombre: str,
+        ruta: Optional[str] = None,
+        borrar_al_liberar: bool = False
+    ):
+        self._datos = datos
+        self.vista = memoryview(datos)
+        self.nombre = nombre
+        self.ruta = ruta
+        self.tipo_mime = mimetypes.guess_type(nombre)[0] or "application/octet-stream"
+        self._borrar_al_liberar = borrar_al_liberar
+        self._huella: Optional[str] = None
+        self._usos = 1  # quien lo creó
+        self._lock = threading.Lock()
+
+    @classmethod
+    def desde_archivo(
+        cls,
+        ruta: str,
+        nombre: Optional[str] = None,
+        umbral_mmap: int = 8 * 1024 * 1024,
+        borrar_al_liberar: bool = False
+    ) -> "BufferMedio":
+        nombre = nombre or os.path.basename(ruta)
+        with open(ruta, "rb") as archivo:
+            tamano = os.fstat(archivo.fileno()).st_size
+            if tamano and tamano >= umbral_mmap:
+                # El mapeo sobrevive al cierre del descriptor
+                datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                datos = archivo.read()
+        logger.info(f"📦 Medio cargado una vez: {nombre} ({tamano} bytes, {'mmap' if isinstance(datos, mmap.mmap) else 'memoria'})")
+        return cls(datos, nombre, ruta=ruta, borrar_al_liberar=borrar_al_liberar)
+
+    @property
+    def tamano(self) -> int:
+        return self.vista.nbytes
+
+    @property
+    def huella(self) -> str:
+        """sha256 del contenido (se calcula una sola vez)"""
+        if self._huella is None:
+            self._huella = hashlib.sha256(self.vista).hexdigest()
+        return self._huella
+
+    def lector(self) -> BinaryIO:
+        """Archivo de solo lectura sobre el buffer, sin copiarlo"""
+        return _LectorBuffer(self.vista, self.nombre)
+
+    # ==================== CICLO DE VIDA ====================
+
+    def tomar(self) -> "BufferMedio":
+        with self._lock:
+            self._usos += 1
+        return self
+
+    def soltar(self) -> None:
+        with self._lock:
+            self._usos -= 1
+            if self._usos > 0:
+                return
+        self._liberar()
+
+    def _liberar(self) -> None:
+        if isinstance(self._datos, mmap.mmap):
+            try:
+                self.vista.release()
+                self._datos.close()
+            except BufferError:
+                # Algún lector olvidado aún apunta al mapeo: lo libera el GC
+                logger.debug(f"Mapeo de {self.nombre} aún referenciado, se libera después")
+
+        if self._borrar_al_liberar and self.ruta and os.path.exists(self.ruta):
+            try:
+                os.remove(self.ruta)
+            except OSError:
+                pass
+
+    def __enter__(self) -> "BufferMedio":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.soltar()
+
+
+class _LectorBuffer(io.RawIOBase):
+    """Archivo binario (read/seek/tell) sobre un memoryview"""
+
+    def __init__(self, vista: memoryview, nombre: str):
+        super().__init__()
+        self._vista = vista
+        self._pos = 0
+        self.name = nombre
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = self._vista.nbytes + offset
+        self._pos = max(0, self._pos)
+        return self._pos
+
+    def read(self, n: int = -1) -> bytes:
+        fin = self._vista.nbytes if n is None or n < 0 else min(self._pos + n, self._vista.nbytes)
+        datos = bytes(self._vista[self._pos:fin])
+        self._pos = max(self._pos, fin)
+        return datos
+
+    def readall(self) -> bytes:
+        return self.read(-1)
+
+    def readinto(self, destino) -> int:
+        fin = min(self._pos + len(destino), self._vista.nbytes)
+        n = max(0, fin - self._pos)
+        destino[:n] = self._vista[self._pos:fin]
+        self._pos += n
+        return n
+
+
+# ==================== HELPERS PARA ADAPTADORES ====================
+
+def vista_de(dato: DatosMedio) -> memoryview:
+    """Bytes del medio sin copiar, venga como BufferMedio o como bytes"""
+    if isinstance(dato, BufferMedio):
+        return dato.vista
+    return memoryview(dato)
+
+
+def lector_de(dato: DatosMedio) -> BinaryIO:
+    """Archivo de solo lectura para subir el medio (multipart, PUT por chunks)"""
+    if isinstance(dato, BufferMedio):
+        return dato.lector()
+    if isinstance(dato, (bytes, bytearray, memoryview)):
+        return _LectorBuffer(memoryview(dato), "upload")
+    return dato
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.config.configuracion import obtener_configuracion
+
+logger = logging.getLogger(__name__)
+
+
+def _percentil(ordenados: List[float], p: float) -> float:
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+class MonitorBucle:
+    """
+    Mide el retraso (lag) del event loop y atrapa las llamadas que lo bloquean.
+
+    - Un latido async duerme 'intervalo' y anota cuánto despertó tarde.
+    - Un hilo vigía revisa el último latido: si el loop lleva más de 'umbral'
+      sin latir, está bloqueado, y guarda la pila del hilo del loop en ese
+      momento (ahí aparece la llamada sync culpable: OpenAI, BD, requests...).
+    - estadisticas() da percentiles del lag y los últimos bloqueos con su pila.
+    """
+
+    def __init__(
+        self,
+        intervalo_seg: float = 0.1,
+        umbral_seg: float = 0.25,
+        max_muestras: int = 1000,
+        max_bloqueos: int = 20
+    ):
+        self.intervalo_seg = intervalo_seg
+        self.umbral_seg = umbral_seg
+        self._muestras = deque(maxlen=max_muestras)
+        self._bloqueos = deque(maxlen=max_bloqueos)
+        self.total_bloqueos = 0
+        self.lag_max = 0.0
+
+        self._lock = threading.Lock()
+        self._ultimo_latido = time.perf_counter()
+        self._latido_capturado: Optional[float] = None  # latido cuyo bloqueo ya tiene pila
+        self._pendiente: Optional[Dict[str, Any]] = None  # bloqueo en curso, sin duración aún
+        self._hilo_bucle: Optional[int] = None
+        self._tarea: Optional[asyncio.Task] = None
+        self._vigia: Optional[threading.Thread] = None
+        self._detener = threading.Event()
+
+    # ==================== CICLO DE VIDA ====================
+    def iniciar(self) -> None:
+        """Llamar desde el event loop (startup de FastAPI)"""
+        if self._tarea is not None:
+            return
+        self._hilo_bucle = threading.get_ident()
+        self._ultimo_latido = time.perf_counter()
+        self._detener.clear()
+        self._tarea = asyncio.get_running_loop().create_task(self._latir())
+        self._vigia = threading.Thread(target=self._vigilar, name="monitor-bucle", daemon=True)
+        self._vigia.start()
+        logger.info(f"🫀 Monitor del event loop activo (umbral {self.umbral_seg * 1000:.0f}ms)")
+
+    def detener(self) -> None:
+        self._detener.set()
+        if self._tarea is not None:
+            self._tarea.cancel()
+            self._tarea = None
+
+    # ==================== LATIDO (event loop) ====================
+    async def _latir(self) -> None:
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(self.intervalo_seg)
+            ahora = time.perf_counter()
+            self._registrar(max(ahora - t0 - self.intervalo_seg, 0.0), ahora)
+
+    def _registrar(self, lag: float, ahora: float) -> None:
+        with self._lock:
+            self._ultimo_latido = ahora
+            self._muestras.append(lag)
+            self.lag_max = max(self.lag_max, lag)
+            if lag < self.umbral_seg:
+                return
+
+            self.total_bloqueos += 1
+            # El vigía ya tomó la pila durante el bloqueo: ahora sabemos cuánto duró
+            bloqueo = self._pendiente or {"pila": None}
+            bloqueo["lag_ms"] = round(lag * 1000, 1)
+            bloqueo["fecha"] = time.strftime("%Y-%m-%d %H:%M:%S")
+            self._bloqueos.append(bloqueo)
+            self._pendiente = None
+
+        logger.warning(f"🐢 Event loop bloqueado {lag * 1000:.0f}ms")
+
+    # ==================== VIGÍA (hilo aparte) ====================
+    def _vigilar(self) -> None:
+        espera = min(self.intervalo_seg, self.umbral_seg) / 2
+        while not self._detener.wait(espera):
+            with self._lock:
+                latido = self._ultimo_latido
+                bloqueado = time.perf_counter() - latido > self.umbral_seg + self.intervalo_seg
+                if not bloqueado or self._latido_capturado == latido:
+                    continue
+                self._latido_capturado = latido
+
+            # Un bloqueo por latido: la pila se toma mientras el loop sigue trabado
+            marco = sys._current_frames().get(self._hilo_bucle)
+            if marco is None:
+                continue
+            pila = "".join(traceback.format_stack(marco))
+            with self._lock:
+                if self._ultimo_latido == latido:
+                    self._pendiente = {"pila": pila}
+                elif self._bloqueos and self._bloqueos[-1]["pila"] is None:
+                    # El loop se destrabó mientras tomábamos la pila
+                    self._bloqueos[-1]["pila"] = pila
+            logger.warning(f"🐢 Event loop bloqueado, pila del hilo del loop:\n{pila}")
+
+    # ==================== MÉTRICAS ====================
+    def estadisticas(self, incluir_pilas: bool = True) -> Dict[str, Any]:
+        with self._lock:
+            ordenadas = sorted(self._muestras)
+            bloqueos = list(self._bloqueos)
+        if not incluir_pilas:
+            bloqueos = [{k: v for k, v in b.items() if k != "pila"} for b in bloqueos]
+
+        return {
+            "activo": self._tarea is not None,
+            "intervalo_ms": round(self.intervalo_seg * 1000, 1),
+            "umbral_ms": round(self.umbral_seg * 1000, 1),
+            "muestras": len(ordenadas),
+            "lag_p50_ms": round(_percentil(ordenadas, 50) * 1000, 2),
+            "lag_p90_ms": round(_percentil(ordenadas, 90) * 1000, 2),
+            "lag_p99_ms": round(_percentil(ordenadas, 99) * 1000, 2),
+            "lag_max_ms": round(self.lag_max * 1000, 2),
+            "bloqueos": self.total_bloqueos,
+            "ultimos_bloqueos": bloqueos[::-1]
+        }
+
+
+@lru_cache()
+def obtener_monitor_bucle() -> MonitorBucle:
+    config = obtener_configuracion()
+    return MonitorBucle(
+        intervalo_seg=config.MONITOR_BUCLE_INTERVALO_MS / 1000,
+        umbral_seg=config.MONITOR_BUCLE_UMBRAL_MS / 1000
+    )
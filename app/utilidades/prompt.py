@@ -1,3 +1,5 @@
+import hashlib
+
 PROMPT_SISTEMA = """# QUIÉN ERES
 Eres un experto generador de contenido para redes sociales especializado en CONTENIDO UNIVERSITARIO.
 
@@ -117,4 +119,9 @@ IMPORTANTE:
 
 
 def obtener_prompt() -> str:
-    return PROMPT_SISTEMA
\ No newline at end of file
+    return PROMPT_SISTEMA
+
+
+def version_prompt() -> str:
+    """Huella corta del prompt: si se edita, las cachés de texto se invalidan solas"""
+    return hashlib.sha256(PROMPT_SISTEMA.encode("utf-8")).hexdigest()[:12]
\ No newline at end of file
@@ -2,19 +2,62 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import jwt
+import asyncio
 import os
-from typing import Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, Union
+
+from app.config.configuracion import obtener_configuracion
 
 # Configuración
 SECRET_KEY = os.getenv("SECRET_KEY", "clave_super_secreta_indescifrable_123")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 
 
+config = obtener_configuracion()
+
 # --- CAMBIO CLAVE AQUÍ ---
 # Cambiamos "bcrypt" por "argon2" para evitar el error de los 72 bytes
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Con deprecated="auto", un hash con otros parámetros queda marcado para re-hashear
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=config.ARGON2_TIME_COST,
+    argon2__memory_cost=config.ARGON2_MEMORY_KIB,
+    argon2__parallelism=config.ARGON2_PARALELISMO
+)
+
+
+class HashSaturado(Exception):
+    """Ya hay demasiados hashes en espera; la ruta responde 503"""
+
+
+class _PoolHash:
+    """
+    Hilos dedicados a Argon2 (argon2-cffi suelta el GIL mientras hashea).
+    Como mucho 'max_en_cola' operaciones entre ejecutándose y esperando:
+    las que sobran se rechazan al instante en vez de acumularse.
+    """
+
+    def __init__(self, max_hilos: int, max_en_cola: int):
+        self._pool = ThreadPoolExecutor(max_workers=max_hilos, thread_name_prefix="argon2")
+        self._cupos = threading.BoundedSemaphore(max_hilos + max_en_cola)
+
+    async def ejecutar(self, funcion, *args):
+        if not self._cupos.acquire(blocking=False):
+            raise HashSaturado("Demasiadas solicitudes de autenticación en curso")
+        try:
+            futuro = self._pool.submit(funcion, *args)
+        except Exception:
+            self._cupos.release()
+            raise
+        futuro.add_done_callback(lambda _: self._cupos.release())
+        return await asyncio.wrap_future(futuro)
+
+
+_pool_hash = _PoolHash(config.HASH_MAX_HILOS, config.HASH_MAX_EN_COLA)
 
-# ... (El resto de funciones sigue IGUAL) ...
 
 def encriptar_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -22,6 +65,17 @@ def encriptar_password(password: str) -> str:
 def verificar_password(password_plana: str, password_hasheada: str) -> bool:
     return pwd_context.verify(password_plana, password_hasheada)
 
+def verificar_y_actualizar(password_plana: str, password_hasheada: str) -> Tuple[bool, Optional[str]]:
+    """(es_valida, hash_nuevo): hash_nuevo viene si el guardado usa parámetros viejos"""
+    return pwd_context.verify_and_update(password_plana, password_hasheada)
+
+# Versiones para rutas async: corren en el pool de Argon2 (pueden lanzar HashSaturado)
+async def encriptar_password_async(password: str) -> str:
+    return await _pool_hash.ejecutar(encriptar_password, password)
+
+async def verificar_y_actualizar_async(password_plana: str, password_hasheada: str) -> Tuple[bool, Optional[str]]:
+    return await _pool_hash.ejecutar(verificar_y_actualizar, password_plana, password_hasheada)
+
 def crear_token_acceso(data: dict, expires_delta: Union[timedelta, None] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -30,4 +84,4 @@ def crear_token_acceso(data: dict, expires_delta: Union[timedelta, None] = None)
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
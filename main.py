@@ -3,10 +3,15 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
+from app.config.bd import crear_tablas_locales, engine_async
+from app.config.configuracion import obtener_configuracion
+from app.utilidades.monitor_bucle import obtener_monitor_bucle
+
 from app.rutas.ingreso import router as ingreso_router
 from app.rutas.contenido import router as contenido_router
 from app.rutas.oauth import router as oauth_router
 from app.rutas.historial import router as historial_router
+from app.rutas.metricas import router as metricas_router
 
 app = FastAPI(title="API Redes Sociales", version="1.0.0")
 
@@ -21,6 +26,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # El frontend lee el cursor de la página siguiente del historial
+    expose_headers=["X-Siguiente-Cursor"],
 )
 
 # 2. SERVIR ARCHIVOS ESTÁTICOS (PARA VER LAS FOTOS/VIDEOS)
@@ -29,11 +36,32 @@ os.makedirs("outputs", exist_ok=True)
 os.makedirs("temp", exist_ok=True) # Crear si no existe
 app.mount("/temp", StaticFiles(directory="temp"), name="temp")
 
+# En desarrollo con SQLite las tablas se crean solas
+@app.on_event("startup")
+def preparar_bd():
+    crear_tablas_locales()
+
+@app.on_event("shutdown")
+async def cerrar_bd():
+    # Cierra las conexiones del pool async dentro de su propio event loop
+    await engine_async.dispose()
+
+# Lag del event loop y pilas de las llamadas que lo bloquean (ver /metricas/bucle)
+@app.on_event("startup")
+async def iniciar_monitor_bucle():
+    if obtener_configuracion().MONITOR_BUCLE_ACTIVO:
+        obtener_monitor_bucle().iniciar()
+
+@app.on_event("shutdown")
+async def detener_monitor_bucle():
+    obtener_monitor_bucle().detener()
+
 # Incluir las rutas
 app.include_router(ingreso_router)
 app.include_router(contenido_router)
 app.include_router(oauth_router)
 app.include_router(historial_router)
+app.include_router(metricas_router)
 app.mount("/outputs", StaticFiles(directory="outputs"), name="outputs")
 
 if __name__ == "__main__":